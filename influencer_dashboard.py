@@ -1,67 +1,18 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import random
-import json
-import base64
-from io import StringIO
-
-# --- Data Ingestion Manager Class  ---
-class DataIngestionManager:
-    """Handles data upload, validation, and processing for the dashboard"""
-    
-    def __init__(self):
-        self.required_schemas = {
-            'influencers': ['influencer_id', 'name', 'category', 'gender', 'follower_count', 'platform', 'tier'],
-            'posts': ['influencer_id', 'platform', 'date', 'reach', 'likes', 'comments', 'brand', 'product', 'campaign_type'],
-            'tracking_data': ['influencer_id', 'campaign', 'orders', 'revenue', 'date', 'campaign_type'],
-            'payouts': ['influencer_id', 'basis', 'rate', 'total_payout']
-        }
-    
-    def validate_schema(self, df, data_type):
-        """Validate if uploaded data matches required schema"""
-        required_cols = self.required_schemas.get(data_type, [])
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        
-        if missing_cols:
-            return False, f"Missing required columns: {missing_cols}"
-        
-        return True, "Schema validation passed"
-    
-    def clean_data(self, df, data_type):
-        """Clean and standardize uploaded data"""
-        df_clean = df.copy()
-        
-        # Common cleaning steps
-        df_clean = df_clean.dropna(subset=self.required_schemas[data_type])
-        
-        # Type-specific cleaning
-        if data_type == 'influencers':
-            df_clean['follower_count'] = pd.to_numeric(df_clean['follower_count'], errors='coerce')
-            df_clean = df_clean.dropna(subset=['follower_count'])
-            
-        elif data_type == 'posts':
-            df_clean['date'] = pd.to_datetime(df_clean['date'], errors='coerce')
-            numeric_cols = ['reach', 'likes', 'comments']
-            for col in numeric_cols:
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-            df_clean = df_clean.dropna(subset=['date'] + numeric_cols)
-            
-        elif data_type == 'tracking_data':
-            df_clean['date'] = pd.to_datetime(df_clean['date'], errors='coerce')
-            df_clean['orders'] = pd.to_numeric(df_clean['orders'], errors='coerce')
-            df_clean['revenue'] = pd.to_numeric(df_clean['revenue'], errors='coerce')
-            df_clean = df_clean.dropna(subset=['date', 'orders', 'revenue'])
-            
-        elif data_type == 'payouts':
-            df_clean['rate'] = pd.to_numeric(df_clean['rate'], errors='coerce')
-            df_clean['total_payout'] = pd.to_numeric(df_clean['total_payout'], errors='coerce')
-            df_clean = df_clean.dropna(subset=['rate', 'total_payout'])
-        
-        return df_clean
+import io
+import os
+import time
+import uuid
+
+from roi_engine import (
+    ATTRIBUTION_WINDOW_DAYS, TABLE_COLUMNS, CampaignTable, DatasetRegistry, DatasetStore, DataIngestionManager,
+    JobRunner, MetricsEngine, BUNDLE_EXTENSIONS, DEFAULT_SATURATION, Profiler, ValidationReport, cohort_decay,
+    daily_roas, encode_dimensions, generate_sample_data, ingest_bundle, lag_distribution, plan_summary,
+    share_dimensions, span, weekly_roas
+)
+from roi_engine import charts
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # --- Dashboard Code  ---
 # Set page configuration
@@ -103,286 +54,259 @@ if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
     st.session_state.influencers_df = pd.DataFrame()
     st.session_state.posts_df = pd.DataFrame()
-    st.session_state.tracking_df = pd.DataFrame()
+    st.session_state.tracking_data_df = pd.DataFrame()
     st.session_state.payouts_df = pd.DataFrame()
+    # Handle to this session's dataset in the process-wide registry
+    st.session_state.dataset = None
+    # Handle to the dataset the dashboard shows: the newest one whose metrics are built
+    st.session_state.snapshot = None
+    # Background jobs: ingestion by data type, 'bundle', 'tracking_append' and 'snapshot' (metric builds)
+    st.session_state.jobs = {}
+    # Names this session's private store of uploads, published once they form a complete dataset
+    st.session_state.staging_key = uuid.uuid4().hex
+    # store.version() right after this session's dataset was last published to the store
+    st.session_state.stored_version = None
 
-@st.cache_data
-def generate_sample_data():
-    """Generate comprehensive sample data for the dashboard with test/control groups"""
-    
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    random.seed(42)
-    
-    # Brands and products
-    brands = ['MuscleBlaze', 'HKVitals', 'Gritzo']
-    products = {
-        'MuscleBlaze': ['Whey Protein', 'Creatine', 'Mass Gainer', 'BCAA'],
-        'HKVitals': ['Multivitamin', 'Omega-3', 'Vitamin D', 'Calcium'],
-        'Gritzo': ['Kids Protein', 'Kids Multivitamin', 'Growth Formula']
-    }
-    
-    platforms = ['Instagram', 'YouTube', 'Twitter', 'TikTok']
-    categories = ['Fitness', 'Nutrition', 'Lifestyle', 'Health', 'Sports']
-    genders = ['Male', 'Female', 'Other']
-    
-    # Generate influencers data
-    influencers_data = []
-    for i in range(50):
-        follower_count = random.randint(10000, 2000000)
-        tier = 'Micro' if follower_count < 100000 else 'Macro' if follower_count < 500000 else 'Mega'
-        influencer = {
-            'influencer_id': f'INF_{i+1:03d}',
-            'name': f'Influencer_{i+1}',
-            'category': random.choice(categories),
-            'gender': random.choice(genders),
-            'follower_count': follower_count,
-            'platform': random.choice(platforms),
-            'tier': tier
-        }
-        influencers_data.append(influencer)
-    
-    influencers_df = pd.DataFrame(influencers_data)
-    
-    # Generate posts data
-    posts_data = []
-    for i in range(200):
-        influencer = random.choice(influencers_data)
-        brand = random.choice(brands)
-        product = random.choice(products[brand])
-        
-        # Assign campaign type
-        campaign_type = 'Test' if random.random() > 0.2 else 'Control'
-        
-        base_reach = min(influencer['follower_count'] * random.uniform(0.1, 0.3), influencer['follower_count'])
-        
-        post = {
-            'post_id': f'POST_{i+1:03d}',
-            'influencer_id': influencer['influencer_id'],
-            'platform': influencer['platform'],
-            'brand': brand,
-            'product': product,
-            'campaign_type': campaign_type,
-            'date': datetime.now() - timedelta(days=random.randint(1, 90)),
-            'url': f'https://{influencer["platform"].lower()}.com/post/{i+1}',
-            'caption': f'Check out this amazing {product} from {brand}! #sponsored',
-            'reach': int(base_reach),
-            'likes': int(base_reach * random.uniform(0.02, 0.08)),
-            'comments': int(base_reach * random.uniform(0.005, 0.02)),
-            'shares': int(base_reach * random.uniform(0.001, 0.01))
-        }
-        posts_data.append(post)
-    
-    posts_df = pd.DataFrame(posts_data)
-    
-    # Generate tracking data (conversion data)
-    tracking_data = []
-    for i in range(500):
-        post = random.choice(posts_data)
-        
-        conversion_rate = random.uniform(0.001, 0.005)
-        orders = max(1, int(post['reach'] * conversion_rate))
-        
-        for order in range(orders):
-            tracking = {
-                'tracking_id': f'TRK_{len(tracking_data)+1:04d}',
-                'source': 'influencer',
-                'campaign': f'{post["brand"]}_{post["product"]}_campaign',
-                'influencer_id': post['influencer_id'],
-                'user_id': f'USER_{random.randint(1000, 9999)}',
-                'brand': post['brand'],
-                'product': post['product'],
-                'date': post['date'] + timedelta(days=random.randint(0, 7)),
-                'orders': 1,
-                'revenue': random.uniform(500, 3000),
-                'platform': post['platform'],
-                'campaign_type': post['campaign_type']
-            }
-            tracking_data.append(tracking)
-    
-    tracking_df = pd.DataFrame(tracking_data)
-    
-    # Generate payouts data
-    payouts_data = []
-    for influencer in influencers_data:
-        basis = random.choice(['post', 'order'])
-        
-        if basis == 'post':
-            if influencer['follower_count'] < 100000:
-                rate = random.uniform(5000, 15000)
-            elif influencer['follower_count'] < 500000:
-                rate = random.uniform(15000, 50000)
-            else:
-                rate = random.uniform(50000, 150000)
-            
-            posts_count = len(posts_df[posts_df['influencer_id'] == influencer['influencer_id']])
-            total_payout = rate * posts_count
-            orders = len(tracking_df[tracking_df['influencer_id'] == influencer['influencer_id']])
-            
-        else:  # per order
-            rate = random.uniform(100, 500)
-            orders = len(tracking_df[tracking_df['influencer_id'] == influencer['influencer_id']])
-            total_payout = rate * orders
-        
-        payout = {
-            'influencer_id': influencer['influencer_id'],
-            'basis': basis,
-            'rate': rate,
-            'orders': orders,
-            'total_payout': total_payout,
-            'posts_count': len(posts_df[posts_df['influencer_id'] == influencer['influencer_id']])
-        }
-        payouts_data.append(payout)
-    
-    payouts_df = pd.DataFrame(payouts_data)
-    
-    return influencers_df, posts_df, tracking_df, payouts_df
+DATA_TYPES = DatasetStore.DATA_TYPES
 
-def calculate_roas_metrics(posts_df, tracking_df, payouts_df):
-    """Calculate ROAS and other key metrics"""
-    
-    # Merge data for comprehensive analysis
-    performance_df = posts_df.merge(tracking_df.groupby('influencer_id').agg({
-        'revenue': 'sum',
-        'orders': 'sum',
-        'campaign_type': 'first'
-    }).reset_index(), on='influencer_id', how='left')
-    
-    performance_df = performance_df.merge(payouts_df[['influencer_id', 'total_payout']], 
-                                        on='influencer_id', how='left')
-    
-    # Fill NaN values
-    performance_df['revenue'] = performance_df['revenue'].fillna(0)
-    performance_df['orders'] = performance_df['orders'].fillna(0)
-    performance_df['total_payout'] = performance_df['total_payout'].fillna(0)
-    
-    # Calculate metrics
-    performance_df['roas'] = np.where(performance_df['total_payout'] > 0, 
-                                    performance_df['revenue'] / performance_df['total_payout'], 0)
-    performance_df['cpo'] = np.where(performance_df['orders'] > 0,
-                                   performance_df['total_payout'] / performance_df['orders'], 0)
-    performance_df['engagement_rate'] = (performance_df['likes'] + performance_df['comments'] + performance_df['shares']) / performance_df['reach']
-    
-    return performance_df
+# Seconds between reruns while a background job is running
+JOB_POLL_SECONDS = 0.5
+
+# ROAS series offered in the Trends section and the column each one charts
+TREND_SERIES = {'7-day rolling': 'roas_7d', '28-day rolling': 'roas_28d', 'Daily': 'roas', 'Weekly': 'roas'}
 
-def calculate_incremental_roas(tracking_df, payouts_df):
+@st.cache_resource
+def load_sample_data():
+    """Simulated dataset, built once per process and shared by every session"""
+    return generate_sample_data()
+
+@st.cache_resource
+def get_metrics_engine():
     """
-    Calculates incremental ROAS based on Test vs. Control groups.
-    Assumes campaigns are properly tagged in tracking_df.
+    Process-wide metrics engine shared by every session, caching up to
+    ROI_CACHE_BUDGET_MB of results. ROI_WORKERS > 1 (or 0 for one per core)
+    runs full recomputes in a process pool, partitioned by ROI_PARTITION_BY
+    ('month' or 'brand').
     """
-    test_revenue = tracking_df[tracking_df['campaign_type'] == 'Test']['revenue'].sum()
-    control_revenue = tracking_df[tracking_df['campaign_type'] == 'Control']['revenue'].sum()
-    
-    test_spend = payouts_df.merge(
-        tracking_df[tracking_df['campaign_type'] == 'Test'][['influencer_id']].drop_duplicates(),
-        on='influencer_id'
-    )['total_payout'].sum()
-    
-    if control_revenue > 0:
-        incremental_lift = (test_revenue / control_revenue) - 1
-    else:
-        incremental_lift = 0
-    
-    if test_spend > 0:
-        incremental_roas = (test_revenue - control_revenue) / test_spend
-    else:
-        incremental_roas = 0
-    
-    return incremental_roas, incremental_lift
+    return MetricsEngine(
+        max_bytes=int(os.environ.get('ROI_CACHE_BUDGET_MB', 1024)) * 2**20,
+        workers=int(os.environ.get('ROI_WORKERS', 1)),
+        partition_by=os.environ.get('ROI_PARTITION_BY', 'month')
+    )
+
+# Columns each dashboard view reads; the store never pages in the others
+DASHBOARD_COLUMNS = {
+    'influencers': ['influencer_id', 'name', 'category', 'gender', 'follower_count', 'platform', 'tier'],
+    'posts': ['post_id', 'influencer_id', 'platform', 'date', 'reach', 'likes', 'comments', 'shares',
+              'brand', 'product', 'campaign_type'],
+    'tracking_data': ['tracking_id', 'influencer_id', 'brand', 'product', 'date', 'orders', 'revenue',
+                      'campaign_type'],
+    'payouts': ['influencer_id', 'basis', 'rate', 'total_payout']
+}
+
+@st.cache_resource
+def get_job_runner():
+    """Process-wide thread pool (ROI_JOB_WORKERS threads) for ingestion and metric builds"""
+    return JobRunner(max_workers=int(os.environ.get('ROI_JOB_WORKERS', 2)))
+
+@st.cache_resource
+def get_dataset_store():
+    store = DatasetStore()
+    # Uploads of sessions that never completed a dataset
+    store.prune_sessions()
+    return store
+
+def session_store():
+    """This session's private store: uploads wait here until they complete a dataset"""
+    return get_dataset_store().session(st.session_state.staging_key)
 
-def generate_ai_insights(filtered_df, influencers_df):
+@st.cache_resource(max_entries=2)
+def load_stored_dataset(version):
+    """Dashboard frames from the on-disk store, shared by every session until version changes"""
+    return get_dataset_store().load_dataset(DASHBOARD_COLUMNS)
+
+@st.cache_resource
+def get_dataset_registry():
     """
-    Generates dynamic, AI-like insights based on the filtered data.
+    Uploaded datasets shared by every session: identical uploads are held
+    once, and beyond ROI_REGISTRY_BUDGET_MB the least recently used ones are
+    spilled to disk and memory-mapped back when a session needs them again.
     """
-    insights = []
-    
-    # Insight 1: Compare ROAS by Influencer Tier
-    tier_roas = filtered_df.merge(
-        influencers_df[['influencer_id', 'tier']],
-        on='influencer_id'
-    ).groupby('tier').agg(
-        total_revenue=('revenue', 'sum'),
-        total_payout=('total_payout', 'sum')
+    return DatasetRegistry(
+        memory_budget=int(os.environ.get('ROI_REGISTRY_BUDGET_MB', 2048)) * 2**20,
+        fingerprint=get_metrics_engine().fingerprint
     )
-    tier_roas['roas'] = np.where(tier_roas['total_payout'] > 0, tier_roas['total_revenue'] / tier_roas['total_payout'], 0)
-    
-    if not tier_roas.empty:
-        best_tier = tier_roas['roas'].idxmax()
-        worst_tier = tier_roas['roas'].idxmin()
-        if best_tier != worst_tier:
-            roas_best = tier_roas.loc[best_tier, 'roas']
-            roas_worst = tier_roas.loc[worst_tier, 'roas']
-            
-            # Simple simulation of a recommendation
-            if roas_best > roas_worst * 1.5:
-                insights.append(
-                    f"**Performance Optimization:** {best_tier}-influencers show {roas_best:.2f}x ROAS vs {roas_worst:.2f}x for {worst_tier}-influencers. "
-                    "Recommend reallocating budget to the {best_tier}-tier for optimal ROI."
+
+def session_frames():
+    """This session's frames by data type: its registered dataset overlaid with pending uploads"""
+    frames = {data_type: pd.DataFrame() for data_type in DATA_TYPES}
+    if st.session_state.dataset is not None:
+        frames.update(zip(DATA_TYPES, st.session_state.dataset.frames()))
+    for data_type in DATA_TYPES:
+        if not st.session_state[f'{data_type}_df'].empty:
+            frames[data_type] = st.session_state[f'{data_type}_df']
+    return frames
+
+def set_session_dataset(frames, persist=True):
+    """
+    Register a complete dataset process-wide; the session keeps only the
+    handle. With persist, the dataset then replaces the stored one, all data
+    types together, so other sessions never see a partial upload.
+    """
+    handle = get_dataset_registry().register(frames)
+    if st.session_state.dataset is not None:
+        st.session_state.dataset.close()
+    st.session_state.dataset = handle
+    for data_type in DATA_TYPES:
+        st.session_state[f'{data_type}_df'] = pd.DataFrame()
+    st.session_state.data_loaded = True
+    staged = None
+    if persist:
+        # The build publishes the staged uploads; later uploads stage into a fresh store
+        staged = session_store()
+        st.session_state.staging_key = uuid.uuid4().hex
+    start_snapshot_build(handle, staged)
+    return handle.frames()
+
+def start_snapshot_build(handle, staged=None):
+    """
+    Build the metrics of handle's dataset in the background; the dashboard
+    switches to it when done. With staged (the session store its uploads went
+    to), the dataset is first published to the shared store.
+    """
+    previous = st.session_state.jobs.pop('snapshot', None)
+    if previous is not None:
+        previous['job'].cancel()
+        previous['handle'].close()
+    # The build holds its own reference, so a newer upload cannot release the dataset under it
+    snapshot = handle.clone()
+    engine = get_metrics_engine()
+    store = get_dataset_store()
+    published = {}
+    
+    def build(job):
+        if staged is not None:
+            # Checking for cancellation under the lock keeps a superseded build from publishing after a newer one
+            with store.lock:
+                job.update(0.0, "Saving dataset")
+                frames = dict(zip(DATA_TYPES, snapshot.frames()))
+                store.apply(
+                    replace={data_type: df for data_type, df in frames.items() if not staged.parts(data_type)},
+                    staged=staged
                 )
+                published['version'] = store.version()
+        engine.warm(*snapshot.frames(), progress_callback=job.update)
     
-    # Insight 2: Platform Intelligence
-    platform_roas = filtered_df.groupby('platform').agg(
-        total_revenue=('revenue', 'sum'),
-        total_payout=('total_payout', 'sum')
-    )
-    platform_roas['roas'] = np.where(platform_roas['total_payout'] > 0, platform_roas['total_revenue'] / platform_roas['total_payout'], 0)
-    
-    if not platform_roas.empty and len(platform_roas) > 1:
-        top_platform = platform_roas.nlargest(1, 'roas').index[0]
-        top_roas = platform_roas.loc[top_platform, 'roas']
-        
-        insights.append(
-            f"**Platform Intelligence:** **{top_platform}** is the highest performing platform with a ROAS of {top_roas:.2f}x. "
-            "Consider increasing budget allocation to this platform to maximize returns."
-        )
-    
-    # Insight 3: Product Strategy
-    product_roas = filtered_df.groupby('product').agg(
-        total_revenue=('revenue', 'sum'),
-        total_payout=('total_payout', 'sum')
-    )
-    product_roas['roas'] = np.where(product_roas['total_payout'] > 0, product_roas['total_revenue'] / product_roas['total_payout'], 0)
-    
-    if not product_roas.empty and len(product_roas) > 1:
-        top_product = product_roas.nlargest(1, 'roas').index[0]
-        top_product_roas = product_roas.loc[top_product, 'roas']
-        
-        insights.append(
-            f"**Product Strategy:** **{top_product}** campaigns demonstrate the highest ROAS at {top_product_roas:.2f}x. "
-            "Focus marketing efforts on this product for optimal ROI."
-        )
-    
-    if not insights:
-        insights.append("No specific insights generated for the current filtered data.")
-        
-    return insights
+    st.session_state.jobs['snapshot'] = {
+        'label': "Preparing dashboard data", 'job': get_job_runner().submit('snapshot', build), 'handle': snapshot,
+        'published': published
+    }
+
+def sync_snapshot():
+    """Promote the newest dataset to the dashboard once its background build has finished"""
+    entry = st.session_state.jobs.get('snapshot')
+    if entry is None or entry['job'].active:
+        return
+    del st.session_state.jobs['snapshot']
+    if 'version' in entry['published']:
+        st.session_state.stored_version = entry['published']['version']
+    job = entry['job']
+    if job.status != 'done':
+        entry['handle'].close()
+        if job.status == 'failed':
+            st.sidebar.error(f"Preparing the new dataset failed: {job.error}")
+        return
+    if st.session_state.snapshot is not None:
+        st.session_state.snapshot.close()
+    st.session_state.snapshot = entry['handle']
+
+def displayed_dataset():
+    """
+    The frames the dashboard shows: the last of this session's datasets whose
+    metrics are built, so a build in progress never blocks a rerun
+    """
+    if st.session_state.snapshot is not None:
+        return st.session_state.snapshot.frames()
+    return fallback_dataset()
+
+def fallback_dataset():
+    """The stored dataset, or sample data, for sessions without a dataset of their own"""
+    store = get_dataset_store()
+    if store.has_dataset():
+        # Reopen a dataset uploaded in an earlier session
+        return load_stored_dataset(store.version())
+    # Use simulated data if none is uploaded
+    return load_sample_data()
 
 # --- Main Dashboard Application ---
 def main():
-    
+
     st.sidebar.title("Configuration")
+    sync_snapshot()
     
     page_selection = st.sidebar.radio(
         "Go to",
         ("Dashboard", "Data Upload")
     )
+    profiling = st.sidebar.checkbox(
+        "Profiling mode", value=os.environ.get('ROI_PROFILE', '') not in ('', '0'), key='profiling',
+        help="Time every stage of this page and log the spans to ROI_PROFILE_LOG."
+    )
+    
+    # Module-level span() calls (here and in the engine) report to the active profiler
+    profiler = Profiler(enabled=profiling)
+    with profiler.activate():
+        with span(page_selection):
+            if page_selection == "Data Upload":
+                data_upload_page()
+            else:
+                dashboard_page()
+    
+    if profiling:
+        profiling_overlay(profiler)
+        ctx = get_script_run_ctx()
+        profiler.export(page=page_selection, session=ctx.session_id if ctx is not None else None)
+    
+    # Poll until the session's background jobs finish; any widget interaction reruns sooner
+    if background_jobs_sidebar():
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
 
-    if page_selection == "Data Upload":
-        data_upload_page()
-    else:
-        dashboard_page()
+def background_jobs_sidebar():
+    """Progress and a cancel button per running job of this session; returns whether any are running"""
+    running = [(key, entry) for key, entry in st.session_state.jobs.items() if entry['job'].active]
+    if running:
+        st.sidebar.subheader("Background jobs")
+    for key, entry in running:
+        job = entry['job']
+        st.sidebar.progress(min(job.fraction, 1.0), text=f"{entry['label']}: {job.message or job.status}")
+        if st.sidebar.button("Cancel", key=f'cancel_job_{key}', disabled=job.cancel_requested):
+            job.cancel()
+    return bool(running)
+
+def profiling_overlay(profiler):
+    """Collapsible breakdown of this rerun's spans, indented by nesting depth"""
+    with st.sidebar.expander(f"Rerun timing ({profiler.total_seconds() * 1000:,.0f} ms)", expanded=True):
+        timings = pd.DataFrame({
+            'stage': ['\u2003' * record['depth'] + record['name'] for record in profiler.spans],
+            'ms': [(record['seconds'] or 0) * 1000 for record in profiler.spans],
+            'MB': [record['memory_delta_mb'] for record in profiler.spans]
+        })
+        st.dataframe(timings.round(1), use_container_width=True, hide_index=True)
 
 def data_upload_page():
     st.markdown('<h1 class="main-header"> Data Upload Interface</h1>', unsafe_allow_html=True)
     manager = DataIngestionManager()
+    store = get_dataset_store()
     
     st.info("Upload your campaign data files to use them in the dashboard.")
     
+    # Bundles can fill several data types at once; an upload in a tab below replaces its type
+    uploaded_dfs, ingested_now = bulk_upload_section(manager)
+    
     # File upload section
     upload_tabs = st.tabs(["Influencers", "Posts", "Tracking Data", "Payouts"])
-    
-    uploaded_dfs = {}
-    for i, data_type in enumerate(['influencers', 'posts', 'tracking_data', 'payouts']):
+    for i, data_type in enumerate(DATA_TYPES):
         with upload_tabs[i]:
             uploaded_file = st.file_uploader(
                 f"Upload {data_type} CSV file",
@@ -392,27 +316,67 @@ def data_upload_page():
             )
             
             if uploaded_file is not None:
-                try:
-                    df = pd.read_csv(uploaded_file)
-                    is_valid, message = manager.validate_schema(df, data_type)
-                    
-                    if is_valid:
-                        st.success(f" Schema validation passed for {data_type}.")
-                        df_clean = manager.clean_data(df, data_type)
-                        uploaded_dfs[data_type] = df_clean
-                        st.dataframe(df_clean.head(5))
-                        st.session_state[f'{data_type}_df'] = df_clean
+                # Widget reruns keep the file attached; only ingest each upload once
+                entry = st.session_state.jobs.get(data_type)
+                if entry is None or entry['file_id'] != uploaded_file.file_id:
+                    if entry is not None:
+                        entry['job'].cancel()
+                    entry = start_ingest(manager, data_type, uploaded_file)
+                job = entry['job']
+                
+                if job.active:
+                    st.progress(min(job.fraction, 1.0), text=job.message or f"Ingesting {data_type}...")
+                    st.caption("Ingesting in the background; the dashboard keeps showing the current data.")
+                elif job.status == 'cancelled':
+                    st.info(f"Ingesting {data_type} was cancelled. Remove the file and upload it again to retry.")
+                elif job.status == 'failed':
+                    if isinstance(job.error, ValueError):
+                        st.error(f" {str(job.error)}")
                     else:
-                        st.error(f" {message}")
-                except Exception as e:
-                    st.error(f"Error processing {data_type} file: {str(e)}")
-                    
+                        st.error(f"Error processing {data_type} file: {str(job.error)}")
+                else:
+                    if not entry['applied']:
+                        # Evict metrics derived from a pending frame being replaced (registered
+                        # frames may still be shown to other sessions)
+                        get_metrics_engine().invalidate(st.session_state[f'{data_type}_df'])
+                        st.session_state[f'{data_type}_df'] = job.result
+                        entry['applied'] = True
+                        ingested_now = True
+                    df_clean = session_frames()[data_type]
+                    uploaded_dfs[data_type] = df_clean
+                    st.success(f" Schema validation passed for {data_type}.")
+                    validation_report_section(entry['report'])
+                    st.dataframe(df_clean.head(5))
+            
+            if data_type == 'tracking_data':
+                tracking_append_section(manager, store)
+    
     if uploaded_dfs:
-        st.session_state.data_loaded = True
-        st.success("All required files uploaded and validated. You can now switch to the Dashboard.")
+        frames = list(session_frames().values())
+        if all(not df.empty for df in frames):
+            if ingested_now:
+                # Align category dictionaries so cross-frame joins stay on integer codes
+                with span('register dataset'):
+                    set_session_dataset(share_dimensions(frames))
+            build = st.session_state.jobs.get('snapshot')
+            if build is not None and build['job'].active:
+                st.info("All required files uploaded and validated. The dashboard switches to them as soon as "
+                        "their metrics are built; until then it shows the previous data.")
+            else:
+                st.success("All required files uploaded and validated. You can now switch to the Dashboard.")
+        else:
+            missing = [data_type for data_type, df in session_frames().items() if df.empty]
+            st.info(f"Upload {', '.join(missing)} to complete the dataset.")
+        registry = get_dataset_registry()
+        st.caption(
+            f"Shared dataset cache: {len(registry.stats())} dataset(s), "
+            f"{registry.resident_bytes() / 2**20:,.0f} MB resident of {registry.memory_budget / 2**20:,.0f} MB"
+        )
+    elif store.has_dataset():
+        st.info("No files uploaded in this session. The dashboard will use the previously stored dataset.")
     else:
         st.warning("No files uploaded yet. The dashboard will use sample data.")
-        
+    
     st.subheader(" Download Templates")
     templates = {
         'influencers': pd.DataFrame({
@@ -448,21 +412,225 @@ def data_upload_page():
                 mime='text/csv'
             )
 
+def start_ingest(manager, data_type, uploaded_file):
+    """Validate and clean an uploaded CSV into the session store on the job runner"""
+    report = ValidationReport(data_type, influencer_ids=known_influencer_ids())
+    
+    staging = session_store()
+    
+    def ingest(job):
+        def report_progress(rows_read, rows_kept, fraction):
+            job.update(fraction, f"{rows_read:,} rows read, {rows_kept:,} kept")
+        
+        # Cleaned chunks stream straight into the session's store until the dataset is complete
+        return manager.ingest_csv(
+            uploaded_file, data_type, sink=staging.writer(data_type), progress_callback=report_progress, report=report
+        )
+    
+    entry = {
+        'label': f"Ingesting {data_type}", 'file_id': uploaded_file.file_id, 'report': report, 'applied': False,
+        'job': get_job_runner().submit(f'ingest {data_type}', ingest)
+    }
+    st.session_state.jobs[data_type] = entry
+    return entry
+
+def bulk_upload_section(manager):
+    """
+    Zip bundles, workbooks and CSV files of any data types, ingested on the
+    job runner. Returns (frames by data type, whether they were applied in this rerun).
+    """
+    uploaded_files = st.file_uploader(
+        "Upload a bundle (zip of CSV/XLSX files, workbooks or CSV files)",
+        type=[extension.lstrip('.') for extension in BUNDLE_EXTENSIONS],
+        accept_multiple_files=True,
+        key='uploader_bundle',
+        help="Each CSV file or sheet is matched to a data type by its columns; "
+             "files of the same type (e.g. one per month) are combined."
+    )
+    if not uploaded_files:
+        return {}, False
+    
+    file_id = tuple(uploaded_file.file_id for uploaded_file in uploaded_files)
+    entry = st.session_state.jobs.get('bundle')
+    if entry is None or entry['file_id'] != file_id:
+        if entry is not None:
+            entry['job'].cancel()
+        entry = start_bundle_ingest(manager, uploaded_files)
+    job = entry['job']
+    
+    if job.active:
+        st.progress(min(job.fraction, 1.0), text=job.message or "Ingesting bundle...")
+        st.caption("Ingesting in the background; the dashboard keeps showing the current data.")
+        return {}, False
+    if job.status == 'cancelled':
+        st.info("Ingesting the bundle was cancelled. Remove the files and upload them again to retry.")
+        return {}, False
+    if job.status == 'failed':
+        if isinstance(job.error, ValueError):
+            st.error(f" {str(job.error)}")
+        else:
+            st.error(f"Error processing the bundle: {str(job.error)}")
+        return {}, False
+    
+    frames, reports, parts = job.result
+    applied_now = not entry['applied']
+    if applied_now:
+        for data_type, df in frames.items():
+            get_metrics_engine().invalidate(st.session_state[f'{data_type}_df'])
+            st.session_state[f'{data_type}_df'] = df
+        entry['applied'] = True
+    
+    st.success(f" Bundle ingested: {', '.join(f'{len(df):,} {data_type}' for data_type, df in frames.items())} rows.")
+    with st.expander(f"Bundle contents ({len(parts)} parts)"):
+        st.caption("Validation sample rows count from a part's first_row within its data type.")
+        st.dataframe(parts, use_container_width=True, hide_index=True)
+    for report in reports.values():
+        validation_report_section(report)
+    return {data_type: session_frames()[data_type] for data_type in frames}, applied_now
+
+def start_bundle_ingest(manager, uploaded_files):
+    """Parse, route and clean an uploaded bundle on the job runner, then stage each data type"""
+    influencer_ids = known_influencer_ids()
+    staging = session_store()
+    
+    def ingest(job):
+        def report_progress(done, total, name):
+            job.update(0.8 * done / total, f"{done} of {total} files parsed")
+        
+        frames, reports, parts = ingest_bundle(
+            uploaded_files, manager, influencer_ids=influencer_ids, progress_callback=report_progress
+        )
+        for data_type in list(frames):
+            job.update(message=f"Storing {data_type}")
+            frames[data_type] = encode_dimensions(staging.write(data_type, frames[data_type]))
+        return frames, reports, parts
+    
+    entry = {
+        'label': "Ingesting bundle", 'file_id': tuple(uploaded_file.file_id for uploaded_file in uploaded_files),
+        'report': None, 'applied': False, 'job': get_job_runner().submit('ingest bundle', ingest)
+    }
+    st.session_state.jobs['bundle'] = entry
+    return entry
+
+def known_influencer_ids():
+    """influencer_ids of this session's influencers frame, or None before one is uploaded"""
+    influencers_df = session_frames()['influencers']
+    return None if influencers_df.empty else influencers_df['influencer_id']
+
+def validation_report_section(report):
+    """Counts and sample rows of the checks an upload violated"""
+    if report is None or not report.violations:
+        return
+    with st.expander(f"Validation report: {report.rows_dropped:,} of {report.rows_read:,} rows dropped"):
+        st.caption("Dropped rows had a missing or unparseable value; flagged rows were kept. "
+                   "Sample rows count data rows from 0, after the header.")
+        st.dataframe(report.to_frame(), use_container_width=True, hide_index=True)
+
+def tracking_append_section(manager, store):
+    """Append a daily tracking export to the current dataset on the job runner, without rebuilding it"""
+    batch_file = st.file_uploader(
+        "Append a daily tracking export",
+        type=['csv'],
+        key='uploader_tracking_append',
+        help="Rows are deduplicated on tracking_id and merged into the current dataset."
+    )
+    if batch_file is None:
+        return
+    
+    # Widget reruns keep the file attached; only append each export once
+    entry = st.session_state.jobs.get('tracking_append')
+    if entry is None or entry['file_id'] != batch_file.file_id:
+        if not st.session_state.data_loaded and not store.has_dataset():
+            st.warning("Upload a full dataset before appending tracking exports.")
+            return
+        build = st.session_state.jobs.get('snapshot')
+        if build is not None and build['job'].active:
+            st.info("The current dataset is still being prepared; the export is appended once it is ready.")
+            return
+        if entry is not None:
+            entry['job'].cancel()
+        entry = start_tracking_append(manager, store, batch_file)
+    job = entry['job']
+    
+    if job.active:
+        st.progress(min(job.fraction, 1.0), text=job.message or "Appending tracking export...")
+        st.caption("Appending in the background; the dashboard keeps showing the current data.")
+        return
+    if job.status == 'cancelled':
+        st.info("Appending the export was cancelled. Remove the file and upload it again to retry.")
+        return
+    if job.status == 'failed':
+        if isinstance(job.error, ValueError):
+            st.error(f" {str(job.error)}")
+        else:
+            st.error(f"Error appending tracking export: {str(job.error)}")
+        return
+    
+    merged, new_rows, stored_version = job.result
+    if not entry['applied']:
+        set_session_dataset(merged, persist=False)
+        st.session_state.stored_version = stored_version
+        entry['applied'] = True
+    st.success(f" Appended {len(new_rows):,} new tracking rows.")
+    validation_report_section(entry['report'])
+
+def start_tracking_append(manager, store, batch_file):
+    """
+    Validate, deduplicate and merge a tracking export on the job runner, roll
+    the cached metrics forward and only then save tracking and payouts together
+    """
+    # Every column of the dataset the export extends; the stored one is read unpruned
+    version = store.version()
+    if st.session_state.dataset is not None:
+        frames = st.session_state.dataset.frames()
+        in_store = st.session_state.stored_version == version
+    else:
+        frames = store.load_dataset()
+        in_store = True
+    influencers_df, posts_df, tracking_df, payouts_df = frames
+    engine = get_metrics_engine()
+    report = ValidationReport('tracking_data', influencer_ids=influencers_df['influencer_id'])
+    
+    def append(job):
+        def report_progress(rows_read, rows_kept, fraction):
+            job.update(None if fraction is None else 0.6 * fraction, f"{rows_read:,} rows read, {rows_kept:,} kept")
+        
+        merged_tracking_df, new_rows = manager.append_tracking(
+            batch_file, tracking_df, engine.tracking_id_index(tracking_df), progress_callback=report_progress,
+            report=report
+        )
+        job.update(0.6, "Rolling metrics forward")
+        new_payouts_df = engine.append_tracking(
+            influencers_df, posts_df, tracking_df, payouts_df, merged_tracking_df, new_rows
+        )
+        merged = (influencers_df, posts_df, merged_tracking_df, new_payouts_df)
+        stored_version = version if in_store else None
+        if len(new_rows):
+            with store.lock:
+                # Cancelling stops here at the latest, before anything is saved
+                job.update(0.9, "Saving tracking data and payouts")
+                if in_store and store.version() == version:
+                    store.apply(append={'tracking_data': new_rows}, replace={'payouts': new_payouts_df})
+                else:
+                    store.apply(replace=dict(zip(DATA_TYPES, merged)))
+                stored_version = store.version()
+        return merged, new_rows, stored_version
+    
+    entry = {
+        'label': "Appending tracking export", 'file_id': batch_file.file_id, 'report': report, 'applied': False,
+        'job': get_job_runner().submit('append tracking', append)
+    }
+    st.session_state.jobs['tracking_append'] = entry
+    return entry
+
 def dashboard_page():
     st.markdown('<h1 class="main-header"> HealthKart Influencer ROI Dashboard</h1>', unsafe_allow_html=True)
     
     # Load data
-    with st.spinner('Loading campaign data...'):
-        if st.session_state.data_loaded:
-            influencers_df = st.session_state.influencers_df
-            posts_df = st.session_state.posts_df
-            tracking_df = st.session_state.tracking_df
-            payouts_df = st.session_state.payouts_df
-        else:
-            # Use simulated data if none is uploaded
-            influencers_df, posts_df, tracking_df, payouts_df = generate_sample_data()
-        
-        performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    with st.spinner('Loading campaign data...'), span('load data'):
+        influencers_df, posts_df, tracking_df, payouts_df = displayed_dataset()
+        metrics_engine = get_metrics_engine()
+        performance_filter = metrics_engine.performance_filter(influencers_df, posts_df, tracking_df, payouts_df)
     
     # Sidebar filters
     st.sidebar.header(" Filters")
@@ -483,31 +651,36 @@ def dashboard_page():
     tiers = ['All'] + list(influencers_df['tier'].unique())
     selected_tier = st.sidebar.selectbox('Influencer Tier', tiers)
     
-    # Apply filters
-    filtered_df = performance_df.copy()
-    
-    if selected_brand != 'All':
-        filtered_df = filtered_df[filtered_df['brand'] == selected_brand]
-    
-    if selected_platform != 'All':
-        filtered_df = filtered_df[filtered_df['platform'] == selected_platform]
-    
-    if len(date_range) == 2:
-        filtered_df = filtered_df[
-            (filtered_df['date'].dt.date >= date_range[0]) & 
-            (filtered_df['date'].dt.date <= date_range[1])
-        ]
+    with span('filter'):
+        # Slice the pre-aggregated cube for tiles, charts and insights
+        cube = metrics_engine.cube(influencers_df, posts_df, tracking_df, payouts_df)
+        cube_filters = {
+            'brand': None if selected_brand == 'All' else selected_brand,
+            'platform': None if selected_platform == 'All' else selected_platform,
+            'tier': None if selected_tier == 'All' else selected_tier
+        }
+        if len(date_range) == 2:
+            cube_filters['start'], cube_filters['end'] = date_range
+        filtered_cube = cube.slice(**cube_filters)
+        
+        # Post-level rows for the scatters and the table: binary search on the
+        # date index, then one composed mask for brand, platform and tier
+        tier_influencers = None
+        if cube_filters['tier'] is not None:
+            tier_influencers = influencers_df.loc[influencers_df['tier'] == cube_filters['tier'], 'influencer_id']
+        filtered_positions = performance_filter.positions(
+            cube_filters.get('start'), cube_filters.get('end'),
+            brand=cube_filters['brand'], platform=cube_filters['platform'], influencer_id=tier_influencers
+        )
     
-    if selected_tier != 'All':
-        tier_influencers = influencers_df[influencers_df['tier'] == selected_tier]['influencer_id'].tolist()
-        filtered_df = filtered_df[filtered_df['influencer_id'].isin(tier_influencers)]
-
     # --- New Metrics and Sections ---
     st.header(" Campaign Overview")
     
     col1, col2, col3, col4 = st.columns(4)
-    total_revenue = filtered_df['revenue'].sum()
-    total_spend = filtered_df['total_payout'].sum()
+    with span('kpis'):
+        totals = cube.totals(filtered_cube)
+    total_revenue = totals['revenue']
+    total_spend = totals['total_payout']
     overall_roas = total_revenue / total_spend if total_spend > 0 else 0
     
     with col1:
@@ -517,68 +690,294 @@ def dashboard_page():
     with col3:
         st.metric(label="ROAS", value=f"{overall_roas:.2f}x")
     with col4:
-        st.metric(label="Total Orders", value=f"{filtered_df['orders'].sum():,.0f}")
+        st.metric(label="Total Orders", value=f"{totals['orders']:,.0f}")
+    
+    unattributed = metrics_engine.unattributed(influencers_df, posts_df, tracking_df, payouts_df)
+    if unattributed['revenue'] or unattributed['total_payout']:
+        st.caption(
+            f"Not in these totals (whole dataset): ₹{unattributed['revenue']:,.0f} of revenue "
+            f"({unattributed['orders']:,.0f} orders) with no post in the {ATTRIBUTION_WINDOW_DAYS}-day attribution "
+            f"window, and ₹{unattributed['total_payout']:,.0f} paid to influencers without posts."
+        )
     
     # Incremental ROAS Section
     st.header(" Incremental ROAS Analysis")
     
-    incremental_roas, incremental_lift = calculate_incremental_roas(tracking_df, payouts_df)
+    with span('incremental roas'):
+        incremental_roas, incremental_lift = metrics_engine.incremental_roas(
+            influencers_df, posts_df, tracking_df, payouts_df
+        )
     
     col1, col2 = st.columns(2)
     with col1:
         st.metric(label="Incremental ROAS", value=f"{incremental_roas:.2f}x")
     with col2:
         st.metric(label="Incremental Revenue Lift", value=f"{incremental_lift:.1%}")
-
+    
+    with st.expander("Confidence intervals (bootstrap over influencers)"):
+        col1, col2 = st.columns(2)
+        with col1:
+            confidence = int(st.selectbox('Confidence level', ['90%', '95%', '99%'], index=1)[:-1]) / 100
+        with col2:
+            stratify_by = st.selectbox('Stratify resamples by', ['None', 'brand', 'platform'])
+        with span('bootstrap intervals'):
+            intervals = metrics_engine.incremental_roas_intervals(
+                influencers_df, posts_df, tracking_df, payouts_df, n_resamples=2000, confidence=confidence,
+                stratify_by=None if stratify_by == 'None' else stratify_by
+            )
+        st.caption("Like the tiles above, these compare per-influencer means, so Test and Control groups of "
+                   "different sizes are comparable.")
+        st.dataframe(
+            intervals.rename(index={'lift': 'Revenue Lift', 'incremental_roas': 'Incremental ROAS'}),
+            use_container_width=True
+        )
+    
     # Charts
     st.header(" Performance Analytics")
     col1, col2 = st.columns(2)
     
-    with col1:
-        brand_roas = filtered_df.groupby('brand').agg(
-            revenue=('revenue', 'sum'),
-            total_payout=('total_payout', 'sum')
-        ).reset_index()
-        brand_roas['roas'] = brand_roas['revenue'] / brand_roas['total_payout']
-        fig_brand_roas = px.bar(
-            brand_roas, x='brand', y='roas', title='ROAS by Brand', color='roas', color_continuous_scale='Greens'
+    # Figures are cached per dataset and filter state, and every trace is
+    # reduced to a fixed point budget before it is built
+    frames = (influencers_df, posts_df, tracking_df, payouts_df)
+    filter_state = tuple(sorted((key, str(value)) for key, value in cube_filters.items()))
+    with span('charts'):
+        with col1:
+            st.plotly_chart(
+                metrics_engine.figure('brand_roas', frames, filter_state,
+                                      lambda: charts.brand_roas_figure(filtered_cube)),
+                use_container_width=True
+            )
+        
+        with col2:
+            st.plotly_chart(
+                metrics_engine.figure('platform_revenue', frames, filter_state,
+                                      lambda: charts.platform_revenue_figure(filtered_cube)),
+                use_container_width=True
+            )
+        
+        st.plotly_chart(
+            metrics_engine.figure('revenue_trend', frames, filter_state,
+                                  lambda: charts.revenue_trend_figure(filtered_cube)),
+            use_container_width=True
         )
-        st.plotly_chart(fig_brand_roas, use_container_width=True)
+        
+        def scatter_posts():
+            return charts.post_scatter_frame(
+                performance_filter.frame, filtered_positions, ['reach', 'revenue', 'engagement_rate', 'roas']
+            )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(
+                metrics_engine.figure('reach_revenue', frames, filter_state, lambda: charts.scatter_figure(
+                    scatter_posts(), 'reach', 'revenue', 'Reach vs Revenue per Post', log_x=True
+                )),
+                use_container_width=True
+            )
+        with col2:
+            st.plotly_chart(
+                metrics_engine.figure('engagement_roas', frames, filter_state, lambda: charts.scatter_figure(
+                    scatter_posts(), 'engagement_rate', 'roas', 'Engagement Rate vs ROAS per Post'
+                )),
+                use_container_width=True
+            )
     
+    # Trends
+    st.header(" Trends")
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.selectbox('ROAS series', list(TREND_SERIES), key='trend_series')
     with col2:
-        platform_metrics = filtered_df.groupby('platform').agg(
-            revenue=('revenue', 'sum'),
-            total_payout=('total_payout', 'sum')
-        ).reset_index()
-        fig_platform = go.Figure()
-        fig_platform.add_trace(go.Bar(name='Revenue', x=platform_metrics['platform'], y=platform_metrics['revenue']))
-        fig_platform.add_trace(go.Bar(name='Spend', x=platform_metrics['platform'], y=platform_metrics['total_payout']))
-        fig_platform.update_layout(title='Revenue vs Spend by Platform', barmode='group')
-        st.plotly_chart(fig_platform, use_container_width=True)
+        compare_by = st.selectbox('Compare by', ['None', 'brand', 'platform', 'tier'], key='trend_compare_by')
+    series_by = None if compare_by == 'None' else compare_by
+    
+    def roas_series():
+        if granularity == 'Weekly':
+            return weekly_roas(filtered_cube, series_by)
+        return daily_roas(filtered_cube, series_by)
+    
+    def filtered_lags():
+        lag_filter = metrics_engine.order_lags(influencers_df, posts_df, tracking_df)
+        return lag_filter.select(
+            cube_filters.get('start'), cube_filters.get('end'),
+            brand=cube_filters['brand'], platform=cube_filters['platform'], tier=cube_filters['tier']
+        )
+    
+    with span('trends'):
+        st.plotly_chart(
+            metrics_engine.figure(f'roas_series:{granularity}:{series_by}', frames, filter_state, lambda: (
+                charts.roas_series_figure(roas_series(), TREND_SERIES[granularity], series_by)
+            )),
+            use_container_width=True
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(
+                metrics_engine.figure(f'lag_distribution:{series_by}', frames, filter_state, lambda: (
+                    charts.lag_distribution_figure(lag_distribution(filtered_lags(), series_by))
+                )),
+                use_container_width=True
+            )
+        with col2:
+            st.plotly_chart(
+                metrics_engine.figure('cohort_decay', frames, filter_state,
+                                      lambda: charts.cohort_decay_figure(cohort_decay(filtered_lags()))),
+                use_container_width=True
+            )
     
     # AI Insights Engine
     st.header(" AI-Powered Insights")
     st.markdown('<div class="insight-box">', unsafe_allow_html=True)
-    insights = generate_ai_insights(filtered_df, influencers_df)
+    with span('insights'):
+        insights = metrics_engine.insights(frames, filter_state, filtered_cube)
     for insight in insights:
         st.markdown(f"**- {insight}**")
     st.markdown('</div>', unsafe_allow_html=True)
-
+    
+    # Budget Optimizer
+    st.header(" Budget Reallocation")
+    with span('budget optimizer'):
+        budget_optimizer_section(metrics_engine, frames)
+    
     # Detailed Data Table
     st.header(" Detailed Campaign Data")
-    detailed_view = filtered_df.merge(
-        influencers_df[['influencer_id', 'name', 'follower_count', 'category', 'tier']], 
-        on='influencer_id'
-    )
-    display_columns = [
-        'name', 'tier', 'brand', 'product', 'platform', 'date', 
-        'reach', 'revenue', 'orders', 'total_payout', 'roas'
-    ]
+    
+    with span('campaign table'):
+        campaign_table_section(CampaignTable(performance_filter.frame, influencers_df, filtered_positions))
+
+def budget_optimizer_section(metrics_engine, frames):
+    """Scenario form for the budget optimizer and the resulting plan; plans are cached per scenario"""
+    influencers_df, posts_df, tracking_df, payouts_df = frames
+    current_spend = float(payouts_df['total_payout'].sum())
+    brands = [str(brand) for brand in posts_df['brand'].unique()]
+    tiers = [str(tier) for tier in influencers_df['tier'].unique()]
+    
+    with st.form('budget_scenario'):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            budget = st.number_input('Total budget (₹)', min_value=0.0, value=round(current_spend, -3), step=100000.0,
+                                     key='budget_total')
+        with col2:
+            min_marginal_roas = st.number_input('Minimum marginal ROAS', min_value=0.0, value=1.0, step=0.1,
+                                                key='budget_min_roas')
+        with col3:
+            saturation = st.slider('Revenue kept by each extra post', min_value=0.5, max_value=1.0,
+                                   value=DEFAULT_SATURATION, step=0.05, key='budget_saturation')
+        with st.expander("Constraints"):
+            st.caption("Brand caps in ₹ (0 = no cap); tier mix as min-max share of the budget.")
+            brand_columns = st.columns(len(brands) or 1)
+            brand_caps = {}
+            for column, brand in zip(brand_columns, brands):
+                with column:
+                    cap = st.number_input(f'{brand} cap', min_value=0.0, value=0.0, step=100000.0,
+                                          key=f'budget_cap_{brand}')
+                if cap > 0:
+                    brand_caps[brand] = cap
+            tier_columns = st.columns(len(tiers) or 1)
+            tier_mix = {}
+            for column, tier in zip(tier_columns, tiers):
+                with column:
+                    low, high = st.slider(f'{tier} share (%)', 0, 100, (0, 100), key=f'budget_mix_{tier}')
+                if (low, high) != (0, 100):
+                    tier_mix[tier] = (low / 100, high / 100)
+        st.form_submit_button('Optimize')
+    
+    try:
+        plan = metrics_engine.budget_plan(
+            influencers_df, posts_df, tracking_df, payouts_df, budget, brand_caps, tier_mix,
+            min_marginal_roas, saturation
+        )
+    except ValueError as e:
+        st.error(f"Invalid scenario: {str(e)}")
+        return
+    
+    planned_spend = plan['planned_spend'].sum()
+    expected_revenue = plan['expected_revenue'].sum()
+    current_roas = plan['revenue'].sum() / current_spend if current_spend > 0 else 0
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Planned Spend", value=f"₹{planned_spend:,.0f}")
+    with col2:
+        st.metric(label="Expected Revenue", value=f"₹{expected_revenue:,.0f}")
+    with col3:
+        expected_roas = expected_revenue / planned_spend if planned_spend > 0 else 0
+        st.metric(label="Expected ROAS", value=f"{expected_roas:.2f}x", delta=f"{expected_roas - current_roas:+.2f}x")
+    with col4:
+        st.metric(label="Unallocated", value=f"₹{max(budget - planned_spend, 0):,.0f}")
+    st.caption("Posts below the minimum marginal ROAS, beyond twice a creator's current volume or past a cap "
+               "are not bought, so part of the budget can stay unallocated. Sidebar filters do not apply here.")
+    for tier, (minimum, spent) in plan.attrs.get('unmet_tier_minimums', {}).items():
+        st.warning(f"{tier} minimum not met: ₹{spent:,.0f} of ₹{minimum:,.0f}. Too few {tier} posts clear the "
+                   f"minimum marginal ROAS within twice their current volume (or a brand cap stops them).")
+    binding = [f"{brand} (₹{cap:,.0f})" for brand, cap in plan.attrs.get('binding_brand_caps', {}).items()]
+    binding += [f"{tier} tier (₹{cap:,.0f})" for tier, cap in plan.attrs.get('binding_tier_caps', {}).items()]
+    if binding:
+        st.info(f"Spending up to its cap: {', '.join(binding)}. Raising these caps would fund more of the best posts.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(plan_summary(plan, 'tier').round(2), use_container_width=True, hide_index=True)
+    with col2:
+        st.dataframe(plan_summary(plan, 'brand').round(2), use_container_width=True, hide_index=True)
+    
+    # Only the largest allocations are sent to the browser
+    top = plan.nlargest(50, 'planned_spend')
     st.dataframe(
-        detailed_view[display_columns].round(2),
-        use_container_width=True,
-        height=400
+        top[['influencer_id', 'brand', 'tier', 'current_spend', 'planned_spend', 'planned_posts',
+             'expected_revenue', 'marginal_roas']].round(2),
+        use_container_width=True, hide_index=True
     )
-    
+
+def campaign_table_section(table):
+    """Searchable, sortable table that only materializes and sends the visible page"""
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search = st.text_input('Search', placeholder='Influencer, brand, product or platform', key='table_search')
+    with col2:
+        sort_column = st.selectbox('Sort by', ['date'] + [col for col in TABLE_COLUMNS if col != 'date'],
+                                   key='table_sort')
+    with col3:
+        descending = st.checkbox('Descending', value=True, key='table_descending')
+    with col4:
+        page_size = st.selectbox('Rows per page', [25, 50, 100, 250], index=1, key='table_page_size')
+    
+    with span('search'):
+        table = table.search(search)
+    page_count = table.page_count(page_size)
+    # No key: a new page count (e.g. after a search) resets the page to 1
+    page = st.number_input(f'Page (of {page_count:,})', min_value=1, max_value=page_count, value=1, step=1)
+    # Only the rows up to the end of this page have to be fully ordered
+    page = min(page, page_count) - 1
+    with span('sort'):
+        visible = table.sort(sort_column, ascending=not descending, limit=(page + 1) * page_size)
+    
+    first_row = page * page_size
+    st.caption(f"Showing rows {min(first_row + 1, len(table)):,}-{min(first_row + page_size, len(table)):,} "
+               f"of {len(table):,}")
+    with span('render page'):
+        st.dataframe(visible.page(page, page_size).round(2), use_container_width=True, hide_index=True)
+    
+    # Export the full filtered result in chunks instead of one merged frame
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.selectbox('Export format', ['CSV', 'Parquet'], key='table_export_format')
+    with col2:
+        st.write('')
+        prepare = st.button(f"Prepare {export_format} export ({len(table):,} rows)", key='table_export')
+    if prepare:
+        ordered = table.sort(sort_column, ascending=not descending)
+        buffer = io.BytesIO()
+        with st.spinner('Writing export...'), span(f'export {export_format}'):
+            if export_format == 'CSV':
+                ordered.write_csv(buffer)
+            else:
+                ordered.write_parquet(buffer)
+        st.download_button(
+            f"Download {export_format}",
+            data=buffer.getvalue(),
+            file_name=f"campaign_data.{export_format.lower()}",
+            mime='text/csv' if export_format == 'CSV' else 'application/octet-stream'
+        )
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Headless analytics engine behind the influencer ROI dashboard.
+
+Importing this package has no side effects and does not require Streamlit,
+so batch jobs can compute the dashboard KPIs directly (see ``python -m roi_engine``).
+Plotly figure builders live in ``roi_engine.charts`` and are imported explicitly.
+"""
+from .attribution import ATTRIBUTION_WINDOW_DAYS, allocate_payouts, attribute_tracking_to_posts
+from .bulk import BUNDLE_EXTENSIONS, bundle_members, ingest_bundle, parse_member
+from .cube import CUBE_DIMENSIONS, CUBE_MEASURES, INFLUENCER_DIMENSIONS, MetricsCube, rollup_roas
+from .downsample import DEFAULT_POINT_BUDGET, binned_density, bucket_width, lttb, time_buckets
+from .engine import DEFAULT_CACHE_BYTES, LRUCache, MetricsEngine, frame_fingerprint, result_nbytes
+from .filters import FrameFilter, day_number, day_numbers
+from .ingestion import (
+    DIMENSION_COLUMNS, DataIngestionManager, FrameSink, ValidationReport, encode_dimensions, share_dimensions
+)
+from .insights import INSIGHT_RULES, InsightEngine, InsightRule, generate_ai_insights
+from .jobs import Job, JobCancelled, JobRunner
+from .metrics import (
+    TrackingIdIndex, apply_order_payouts, attributed_sums, calculate_incremental_roas, calculate_roas_metrics,
+    extend_roas_metrics, incremental_roas_from_summary, post_level_metrics, summarize_tracking, unattributed_totals
+)
+from .optimizer import (
+    DEFAULT_MAX_SCALE, DEFAULT_SATURATION, optimize_budget, plan_summary, response_curves, scenario_key
+)
+from .parallel import PARTITION_KEYS, calculate_metrics_parallel, combine_aggregates, compute_partitioned
+from .profiling import DEFAULT_PROFILE_LOG, Profiler, load_profile_log, span
+from .registry import DatasetHandle, DatasetRegistry
+from .sample_data import generate_sample_data
+from .significance import bootstrap_incremental_roas, bootstrap_resamples
+from .store import DEFAULT_STORE_ROOT, ArrowFileSink, DatasetStore
+from .table import TABLE_COLUMNS, CampaignTable
+from .timeseries import (
+    LAG_DIMENSIONS, LAG_MEASURES, ROLLING_WINDOWS, SERIES_MEASURES, OrderLagPartitions, cohort_decay, daily_matrix,
+    daily_roas, day_digests, lag_distribution, order_lag_rows, post_dimensions, rolling_sums, weekly_roas
+)
+
+__all__ = [
+    'ATTRIBUTION_WINDOW_DAYS', 'BUNDLE_EXTENSIONS', 'CUBE_DIMENSIONS', 'CUBE_MEASURES', 'DEFAULT_CACHE_BYTES',
+    'DEFAULT_MAX_SCALE', 'DEFAULT_POINT_BUDGET', 'DEFAULT_PROFILE_LOG', 'DEFAULT_SATURATION',
+    'DEFAULT_STORE_ROOT', 'DIMENSION_COLUMNS', 'INFLUENCER_DIMENSIONS', 'INSIGHT_RULES', 'LAG_DIMENSIONS',
+    'LAG_MEASURES', 'PARTITION_KEYS', 'ROLLING_WINDOWS', 'SERIES_MEASURES', 'TABLE_COLUMNS', 'ArrowFileSink',
+    'CampaignTable', 'DataIngestionManager', 'DatasetHandle', 'DatasetRegistry', 'DatasetStore', 'FrameFilter',
+    'FrameSink', 'InsightEngine', 'InsightRule', 'Job', 'JobCancelled', 'JobRunner', 'LRUCache', 'MetricsCube',
+    'MetricsEngine', 'OrderLagPartitions', 'Profiler', 'TrackingIdIndex', 'ValidationReport',
+    'allocate_payouts', 'apply_order_payouts', 'attribute_tracking_to_posts', 'attributed_sums',
+    'binned_density', 'bootstrap_incremental_roas', 'bootstrap_resamples', 'bucket_width', 'bundle_members',
+    'calculate_incremental_roas', 'calculate_metrics_parallel', 'calculate_roas_metrics', 'cohort_decay',
+    'combine_aggregates', 'compute_partitioned', 'daily_matrix', 'daily_roas', 'day_digests', 'day_number',
+    'day_numbers', 'encode_dimensions', 'extend_roas_metrics', 'frame_fingerprint', 'generate_ai_insights',
+    'generate_sample_data', 'incremental_roas_from_summary', 'ingest_bundle', 'lag_distribution',
+    'load_profile_log', 'lttb', 'optimize_budget', 'order_lag_rows', 'parse_member', 'plan_summary',
+    'post_dimensions', 'post_level_metrics', 'response_curves', 'result_nbytes', 'rolling_sums', 'rollup_roas',
+    'scenario_key', 'share_dimensions', 'span', 'summarize_tracking', 'time_buckets', 'unattributed_totals',
+    'weekly_roas'
+]
@@ -0,0 +1,75 @@
+"""Attribution of tracking rows and payouts to individual posts"""
+import numpy as np
+import pandas as pd
+
+ATTRIBUTION_WINDOW_DAYS = 7
+
+def _shared_codes(left, right):
+    """Integer codes for two columns drawn from one dictionary (-1 for missing values)"""
+    if (isinstance(left.dtype, pd.CategoricalDtype) and isinstance(right.dtype, pd.CategoricalDtype)
+            and left.cat.categories.equals(right.cat.categories)):
+        return left.cat.codes.to_numpy(np.int64), right.cat.codes.to_numpy(np.int64)
+    codes, _ = pd.factorize(pd.concat([left.astype(object), right.astype(object)], ignore_index=True))
+    return codes[:len(left)].astype(np.int64), codes[len(left):].astype(np.int64)
+
+def attribution_keys(posts_df, tracking_df):
+    """Columns a tracking row must share with a post: influencer, plus brand/product when tracked"""
+    return ['influencer_id'] + [col for col in ('brand', 'product') if col in tracking_df.columns and col in posts_df.columns]
+
+def attribute_tracking_to_posts(posts_df, tracking_df, window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    Allocate each tracking row to the latest post by the same influencer (and
+    brand/product when tracked) published at most window_days before the order,
+    using one sorted merge_asof over a combined integer key.
+    Returns an array with the matched post position per tracking row (-1 if none).
+    """
+    keys = attribution_keys(posts_df, tracking_df)
+    tracking_key = np.zeros(len(tracking_df), dtype=np.int64)
+    post_key = np.zeros(len(posts_df), dtype=np.int64)
+    for col in keys:
+        tracking_codes, post_codes = _shared_codes(tracking_df[col], posts_df[col])
+        width = max(tracking_codes.max(initial=0), post_codes.max(initial=0)) + 2
+        # Re-factorize after each column so the combined key cannot overflow
+        combined, _ = pd.factorize(np.concatenate([tracking_key * width + tracking_codes + 1,
+                                                   post_key * width + post_codes + 1]))
+        tracking_key, post_key = combined[:len(tracking_df)], combined[len(tracking_df):]
+    
+    tracking_order = np.argsort(tracking_df['date'].to_numpy(), kind='stable')
+    post_order = np.argsort(posts_df['date'].to_numpy(), kind='stable')
+    matched = pd.merge_asof(
+        pd.DataFrame({'date': tracking_df['date'].to_numpy()[tracking_order], 'key': tracking_key[tracking_order]}),
+        pd.DataFrame({'date': posts_df['date'].to_numpy()[post_order], 'key': post_key[post_order], 'post': post_order}),
+        on='date', by='key', direction='backward', tolerance=pd.Timedelta(days=window_days)
+    )
+    
+    post_position = np.full(len(tracking_df), -1, dtype=np.int64)
+    post_position[tracking_order] = matched['post'].fillna(-1).to_numpy(np.int64)
+    return post_position
+
+def allocate_payouts(posts_df, post_orders, payouts_df):
+    """
+    Spread each influencer's total_payout over their posts: evenly for per-post
+    contracts, in proportion to attributed orders for per-order contracts (evenly
+    when none of their orders were attributed). Returns the payout per post.
+    """
+    payout_totals = payouts_df.groupby('influencer_id', observed=True)['total_payout'].sum()
+    contracts = payouts_df.drop_duplicates('influencer_id').set_index('influencer_id')
+    if 'basis' in contracts.columns:
+        per_order = contracts['basis'].astype(str).eq('order')
+    else:
+        per_order = pd.Series(False, index=contracts.index)
+    
+    influencer_codes, _ = pd.factorize(posts_df['influencer_id'])
+    posts_per_influencer = np.bincount(influencer_codes, minlength=influencer_codes.max(initial=-1) + 1)
+    orders_per_influencer = np.bincount(influencer_codes, weights=post_orders, minlength=len(posts_per_influencer))
+    
+    influencer_payout = posts_df['influencer_id'].map(payout_totals).astype(float).fillna(0).to_numpy()
+    influencer_per_order = posts_df['influencer_id'].map(per_order).astype(object).fillna(False).to_numpy(bool)
+    influencer_orders = orders_per_influencer[influencer_codes]
+    
+    share = np.where(
+        influencer_per_order & (influencer_orders > 0),
+        post_orders / np.where(influencer_orders > 0, influencer_orders, 1),
+        1.0 / posts_per_influencer[influencer_codes]
+    )
+    return influencer_payout * share
@@ -0,0 +1,235 @@
+"""
+Scaling benchmarks for the analytics functions.
+
+Runs each benchmark at several synthetic dataset sizes (tracking rows), then
+records best-of-N wall time, peak traced memory and rows/sec in a JSON
+report. With --baseline it compares against an earlier report and exits
+non-zero on regressions:
+
+    python -m roi_engine.benchmarks --sizes 1k,100k,1M --output report.json
+    python -m roi_engine.benchmarks --baseline report.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .cube import MetricsCube
+from .ingestion import DataIngestionManager
+from .insights import generate_ai_insights
+from .metrics import calculate_incremental_roas, calculate_roas_metrics
+from .optimizer import optimize_budget, response_curves
+from .sample_data import generate_sample_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500"""
+    text = text.strip().lower().replace('_', '')
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+def dataset_shape(size):
+    """Influencers, posts and tracking rows of the synthetic dataset for a benchmark size"""
+    return {'n_influencers': max(50, size // 1000), 'n_posts': max(200, size // 100), 'n_tracking': size}
+
+def raw_tracking(tracking_df):
+    """The tracking frame as it arrives from a CSV: plain strings instead of categoricals and dates"""
+    raw = tracking_df.copy()
+    for col in raw.columns:
+        if isinstance(raw[col].dtype, pd.CategoricalDtype):
+            raw[col] = raw[col].astype(object)
+    raw['date'] = raw['date'].dt.strftime('%Y-%m-%d')
+    return raw
+
+# Each benchmark: (setup(size) -> state, run(state)); setup time is not measured
+def _sample_setup(size):
+    return dataset_shape(size)
+
+def _sample_run(shape):
+    generate_sample_data(**shape)
+
+def _dataset_setup(size):
+    return generate_sample_data(**dataset_shape(size))
+
+def _clean_setup(size):
+    return DataIngestionManager(), raw_tracking(_dataset_setup(size)[2])
+
+def _clean_run(state):
+    manager, raw = state
+    manager.clean_data(raw, 'tracking_data')
+
+def _roas_run(frames):
+    influencers_df, posts_df, tracking_df, payouts_df = frames
+    calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+
+def _incremental_run(frames):
+    influencers_df, posts_df, tracking_df, payouts_df = frames
+    calculate_incremental_roas(tracking_df, payouts_df)
+
+def _insights_setup(size):
+    influencers_df, posts_df, tracking_df, payouts_df = _dataset_setup(size)
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    return MetricsCube.from_performance(performance_df, influencers_df).frame, influencers_df
+
+def _insights_run(state):
+    generate_ai_insights(*state)
+
+def _optimizer_setup(size):
+    influencers_df, posts_df, tracking_df, payouts_df = _dataset_setup(size)
+    curves = response_curves(calculate_roas_metrics(posts_df, tracking_df, payouts_df), payouts_df, influencers_df)
+    return curves, curves['current_spend'].sum()
+
+def _optimizer_run(state):
+    curves, budget = state
+    optimize_budget(curves, budget, tier_mix={'Micro': (0.1, None), 'Mega': (None, 0.5)})
+
+BENCHMARKS = {
+    'generate_sample_data': (_sample_setup, _sample_run),
+    'clean_data': (_clean_setup, _clean_run),
+    'calculate_roas_metrics': (_dataset_setup, _roas_run),
+    'calculate_incremental_roas': (_dataset_setup, _incremental_run),
+    'generate_ai_insights': (_insights_setup, _insights_run),
+    'optimize_budget': (_optimizer_setup, _optimizer_run)
+}
+
+def measure(run, state, repeat=3):
+    """Best wall time over repeat runs, then peak traced memory (MB) of one more run"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+    
+    # Tracing slows Python-level code, so memory is measured on a separate run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak / 2**20
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, repeat=3, log=None):
+    """Run the selected benchmarks at every size; returns the report as a dict"""
+    results = []
+    for size in sizes:
+        setups = {}
+        for name in names or BENCHMARKS:
+            setup, run = BENCHMARKS[name]
+            # Benchmarks sharing a setup at this size share its state
+            if setup not in setups:
+                setups.clear()
+                gc.collect()
+                setups[setup] = setup(size)
+            seconds, peak_mb = measure(run, setups[setup], repeat)
+            result = {
+                'benchmark': name,
+                'size': size,
+                'seconds': seconds,
+                'peak_mb': peak_mb,
+                'rows_per_sec': size / seconds if seconds > 0 else None
+            }
+            results.append(result)
+            if log is not None:
+                log(result)
+        setups.clear()
+    
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare_reports(report, baseline, tolerance=0.25, min_seconds=0.05):
+    """
+    Regressions of report against baseline: a benchmark/size pair whose time
+    or peak memory grew by more than tolerance (a fraction). Timings below
+    min_seconds in both reports are too noisy to compare.
+    """
+    previous = {(row['benchmark'], row['size']): row for row in baseline['results']}
+    regressions = []
+    for row in report['results']:
+        base = previous.get((row['benchmark'], row['size']))
+        if base is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if metric == 'seconds' and max(row[metric], base[metric]) < min_seconds:
+                continue
+            if base[metric] > 0 and row[metric] > base[metric] * (1 + tolerance):
+                regressions.append({
+                    'benchmark': row['benchmark'], 'size': row['size'], 'metric': metric,
+                    'baseline': base[metric], 'current': row[metric], 'ratio': row[metric] / base[metric]
+                })
+    return regressions
+
+def format_result(result):
+    rate = result['rows_per_sec']
+    return (f"{result['benchmark']:<28} {result['size']:>12,} rows {result['seconds']:>10.4f} s "
+            f"{result['peak_mb']:>10.1f} MB {rate or 0:>14,.0f} rows/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m roi_engine.benchmarks',
+        description='Measure how the analytics functions scale with dataset size.'
+    )
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma-separated tracking-row counts, e.g. 1k,100k,10M (default: 1k..1M)')
+    parser.add_argument('--benchmarks', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark; the best counts')
+    parser.add_argument('--output', '-o', default='benchmark_report.json', help='where to write the JSON report')
+    parser.add_argument('--baseline', help='earlier report to compare against; exits 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown or memory growth as a fraction (default: 0.25)')
+    args = parser.parse_args(argv)
+    
+    names = args.benchmarks.split(',') if args.benchmarks else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    baseline = None
+    if args.baseline:
+        # Writing the report over its own baseline would leave nothing to compare against next time
+        if os.path.abspath(args.baseline) == os.path.abspath(args.output):
+            parser.error("--output must differ from --baseline")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    
+    report = run_benchmarks(names, sizes, args.repeat, log=lambda result: print(format_result(result), flush=True))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    
+    if baseline is not None:
+        regressions = compare_reports(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} @ {regression['size']:,} rows: {regression['metric']} "
+                  f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['ratio']:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Bulk ingestion: zip bundles, XLSX workbooks and CSV files parsed in parallel and routed by columns"""
+import io
+import os
+import zipfile
+
+import pandas as pd
+
+from .ingestion import DataIngestionManager, ValidationReport, encode_dimensions
+from .parallel import process_pool, resolve_workers
+
+BUNDLE_EXTENSIONS = ['.zip', '.xlsx', '.xlsm', '.csv']
+PART_COLUMNS = ['file', 'sheet', 'data_type', 'rows', 'first_row', 'note']
+
+def _extension(name):
+    return os.path.splitext(name)[1].lower()
+
+def bundle_members(source, name=None):
+    """
+    (name, bytes) of every CSV and XLSX file in source, a path or file-like
+    object (e.g. a Streamlit upload). A zip archive expands to its members,
+    skipping folders, hidden files and macOS metadata; any other source is one member.
+    """
+    name = name or getattr(source, 'name', None) or os.fspath(source)
+    if _extension(name) != '.zip':
+        if hasattr(source, 'read'):
+            return [(name, source.read())]
+        with open(source, 'rb') as f:
+            return [(name, f.read())]
+    
+    members = []
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            base = os.path.basename(info.filename)
+            if info.is_dir() or base.startswith(('.', '~$')) or info.filename.startswith('__MACOSX/'):
+                continue
+            if _extension(base) in BUNDLE_EXTENSIONS[1:]:
+                members.append((f'{os.path.basename(name)}/{info.filename}', archive.read(info)))
+    return members
+
+def _sheet_frame(rows):
+    """Frame from worksheet rows: the first non-empty row is the header, empty rows and unnamed columns go"""
+    rows = iter(rows)
+    header = next((row for row in rows if any(value is not None for value in row)), None)
+    if header is None:
+        return pd.DataFrame()
+    keep = [i for i, column in enumerate(header) if column is not None]
+    df = pd.DataFrame.from_records(list(rows), columns=range(len(header)))
+    df = df[keep].dropna(how='all')
+    df.columns = [str(header[i]).strip() for i in keep]
+    return df.reset_index(drop=True)
+
+def parse_member(name, payload, required_schemas, read_dtypes):
+    """
+    Parse one file into [(sheet, data_type, frame)], routing each sheet (or
+    the CSV) to the data type its columns carry; data_type is None when no
+    schema matches. Runs in worker processes, so it only takes plain data.
+    """
+    manager = DataIngestionManager()
+    manager.required_schemas = required_schemas
+    if _extension(name) == '.csv':
+        header = pd.read_csv(io.BytesIO(payload), nrows=0).columns
+        data_type = manager.detect_data_type(header)
+        if data_type is None:
+            return [(None, None, pd.DataFrame(columns=header))]
+        return [(None, data_type, pd.read_csv(io.BytesIO(payload), dtype=read_dtypes[data_type]))]
+    
+    # Read-only mode streams rows instead of building the whole workbook in memory
+    import openpyxl
+    workbook = openpyxl.load_workbook(io.BytesIO(payload), read_only=True, data_only=True)
+    parsed = []
+    try:
+        for sheet in workbook.worksheets:
+            df = _sheet_frame(sheet.iter_rows(values_only=True))
+            data_type = manager.detect_data_type(df.columns)
+            if data_type is not None:
+                # Cells keep their Excel types; text columns are made str like read_csv(dtype=str) does
+                for col, dtype in read_dtypes[data_type].items():
+                    if col in df.columns:
+                        df[col] = df[col].where(df[col].isna(), df[col].astype(dtype))
+            parsed.append((sheet.title, data_type, df))
+    finally:
+        workbook.close()
+    return parsed
+
+def _parse_task(task):
+    return parse_member(*task)
+
+def ingest_bundle(sources, manager=None, workers=None, influencer_ids=None, progress_callback=None):
+    """
+    Ingest zip bundles, workbooks and CSV files (e.g. one per month) in one
+    go. Files are parsed on a process pool (workers defaults to ROI_WORKERS,
+    else 1, which parses in-process; 0 uses one process per core), each
+    sheet or CSV is routed to the data type whose required columns it has,
+    and the parts of each data type are concatenated once and then cleaned.
+    Returns (frames, reports, parts): cleaned frames and ValidationReports
+    by data type, and a frame listing every part, where report sample rows
+    count from the part's first_row. progress_callback(done, total, name) is
+    called after each parsed file.
+    """
+    manager = manager or DataIngestionManager()
+    if isinstance(sources, (str, os.PathLike)) or hasattr(sources, 'read'):
+        sources = [sources]
+    members = [member for source in sources for member in bundle_members(source)]
+    if not members:
+        raise ValueError("No CSV or XLSX files found in the upload")
+    
+    read_dtypes = {data_type: manager.read_dtypes(data_type) for data_type in manager.required_schemas}
+    tasks = [(name, payload, manager.required_schemas, read_dtypes) for name, payload in members]
+    workers = min(resolve_workers(workers), len(tasks))
+    pool = process_pool(workers) if workers > 1 else None
+    parsed = {}
+    parts = []
+    try:
+        results = pool.map(_parse_task, tasks) if pool is not None else map(_parse_task, tasks)
+        for done, ((name, _), sheets) in enumerate(zip(members, results), start=1):
+            for sheet, data_type, df in sheets:
+                part = {'file': name, 'sheet': sheet, 'data_type': data_type, 'rows': len(df), 'first_row': None,
+                        'note': ''}
+                if data_type is None:
+                    part['note'] = 'no matching schema'
+                elif df.empty:
+                    part['note'] = 'no rows'
+                else:
+                    # Row offset of this part once the data type's parts are concatenated
+                    part['first_row'] = sum(len(earlier) for earlier in parsed.get(data_type, []))
+                    parsed.setdefault(data_type, []).append(df)
+                parts.append(part)
+            if progress_callback is not None:
+                progress_callback(done, len(members), name)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    if not parsed:
+        raise ValueError("None of the uploaded files has the columns of a known data type")
+    
+    # Influencers first, so the other types' influencer_ids are checked against the bundle's own
+    frames, reports = {}, {}
+    for data_type in sorted(parsed, key=lambda data_type: data_type != 'influencers'):
+        known_ids = frames['influencers']['influencer_id'] if 'influencers' in frames else influencer_ids
+        reports[data_type] = ValidationReport(data_type, influencer_ids=known_ids)
+        combined = pd.concat(parsed.pop(data_type), ignore_index=True, copy=False)
+        frames[data_type] = encode_dimensions(manager.clean_data(combined, data_type, reports[data_type]))
+        reports[data_type].finish()
+    return frames, reports, pd.DataFrame(parts, columns=PART_COLUMNS)
@@ -0,0 +1,114 @@
+"""Plotly figures for the dashboard, reduced to a fixed point budget before they are built"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from .cube import rollup_roas
+from .downsample import DEFAULT_POINT_BUDGET, binned_density, lttb, time_buckets
+
+def brand_roas_figure(cells):
+    """ROAS by brand from cube cells"""
+    brand_roas = rollup_roas(cells, 'brand')
+    return px.bar(
+        brand_roas, x='brand', y='roas', title='ROAS by Brand', color='roas', color_continuous_scale='Greens'
+    )
+
+def platform_revenue_figure(cells):
+    """Revenue vs spend by platform from cube cells"""
+    platform_metrics = rollup_roas(cells, 'platform')
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Revenue', x=platform_metrics['platform'], y=platform_metrics['revenue']))
+    fig.add_trace(go.Bar(name='Spend', x=platform_metrics['platform'], y=platform_metrics['total_payout']))
+    fig.update_layout(title='Revenue vs Spend by Platform', barmode='group')
+    return fig
+
+def revenue_trend_figure(cells, budget=DEFAULT_POINT_BUDGET):
+    """
+    Revenue and spend over time, summed into calendar buckets that fit the
+    budget, with daily ROAS on a second axis decimated by LTTB (a ratio
+    cannot be re-summed into wider buckets without losing its peaks).
+    """
+    buckets = time_buckets(cells['day'], {'revenue': cells['revenue'], 'spend': cells['total_payout']}, budget)
+    daily = cells.groupby('day')[['revenue', 'total_payout']].sum()
+    spend = daily['total_payout'].to_numpy()
+    daily_roas = np.where(spend > 0, daily['revenue'].to_numpy() / np.where(spend > 0, spend, 1), 0)
+    kept = lttb(daily.index.to_numpy(np.int64), daily_roas, budget)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(name='Revenue', x=buckets['date'], y=buckets['revenue'], mode='lines'))
+    fig.add_trace(go.Scatter(name='Spend', x=buckets['date'], y=buckets['spend'], mode='lines'))
+    fig.add_trace(go.Scatter(
+        name='Daily ROAS', x=daily.index[kept], y=daily_roas[kept], mode='lines',
+        yaxis='y2', line={'dash': 'dot'}
+    ))
+    fig.update_layout(
+        title='Revenue, Spend and ROAS over Time',
+        yaxis={'title': 'Amount'},
+        yaxis2={'title': 'ROAS', 'overlaying': 'y', 'side': 'right', 'showgrid': False},
+        legend={'orientation': 'h'}
+    )
+    return fig
+
+def scatter_figure(frame, x, y, title, budget=DEFAULT_POINT_BUDGET, log_x=False, log_y=False, hover_name=None):
+    """
+    Scatter of two columns of frame. Up to budget rows are drawn as points;
+    beyond that the rows are binned into a density heatmap of at most budget
+    cells, so the payload no longer grows with the number of rows.
+    """
+    if len(frame) <= budget:
+        return px.scatter(frame, x=x, y=y, title=title, log_x=log_x, log_y=log_y, hover_name=hover_name,
+                          opacity=0.7)
+    
+    x_centers, y_centers, counts = binned_density(frame[x], frame[y], budget, log_x, log_y)
+    fig = go.Figure(go.Heatmap(
+        x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan),
+        colorscale='Viridis', colorbar={'title': 'Posts'},
+        hovertemplate=f'{x}: %{{x:.3s}}<br>{y}: %{{y:.3s}}<br>posts: %{{z}}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'{title} ({len(frame):,} posts, binned)',
+        xaxis={'title': x, 'type': 'log' if log_x else 'linear'},
+        yaxis={'title': y, 'type': 'log' if log_y else 'linear'}
+    )
+    return fig
+
+def post_scatter_frame(performance_df, positions, columns):
+    """The given columns of the selected performance rows, without touching the rest"""
+    return pd.DataFrame({column: performance_df[column].array.take(positions) for column in columns})
+
+def roas_series_figure(series, column, by=None, budget=DEFAULT_POINT_BUDGET):
+    """
+    One line of column (e.g. roas_7d from timeseries.daily_roas, or roas from
+    weekly_roas) per by-group, each decimated by LTTB to its share of the budget.
+    """
+    groups = list(series.groupby(by, observed=True, sort=False)) if by else [(column, series)]
+    fig = go.Figure()
+    for name, group in groups:
+        kept = lttb(group['date'].to_numpy(np.int64), group[column].to_numpy(float), max(3, budget // len(groups)))
+        fig.add_trace(go.Scatter(
+            name=str(name), x=group['date'].to_numpy()[kept],
+            y=group[column].to_numpy()[kept], mode='lines'
+        ))
+    fig.update_layout(title=f'{column} over Time', yaxis={'title': 'ROAS'}, legend={'orientation': 'h'})
+    return fig
+
+def lag_distribution_figure(distribution):
+    """Share of orders by days from post to order, one bar group per row of timeseries.lag_distribution"""
+    fig = go.Figure()
+    for name, shares in distribution.iterrows():
+        fig.add_trace(go.Bar(name=str(name), x=shares.index, y=shares.to_numpy()))
+    fig.update_layout(
+        title='Orders by Days after Post', barmode='group',
+        xaxis={'title': 'Days from post to order', 'dtick': 1}, yaxis={'title': 'Share', 'tickformat': '.0%'}
+    )
+    return fig
+
+def cohort_decay_figure(decay):
+    """Heatmap of timeseries.cohort_decay: post cohorts down, days after post across"""
+    fig = go.Figure(go.Heatmap(
+        x=decay.columns, y=decay.index, z=decay.to_numpy(), colorscale='Greens', colorbar={'title': 'Share'},
+        hovertemplate='cohort %{y|%Y-%m-%d}<br>day %{x}: %{z:.1%}<extra></extra>'
+    ))
+    fig.update_layout(title='Order Decay by Weekly Post Cohort', xaxis={'title': 'Days from post to order', 'dtick': 1})
+    return fig
@@ -0,0 +1,189 @@
+"""Command-line entry point: compute the dashboard KPIs from files on disk"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from .attribution import ATTRIBUTION_WINDOW_DAYS
+from .bulk import ingest_bundle
+from .cube import MetricsCube, rollup_roas
+from .ingestion import DataIngestionManager, ValidationReport, encode_dimensions, share_dimensions
+from .insights import generate_ai_insights
+from .metrics import calculate_incremental_roas, calculate_roas_metrics, unattributed_totals
+from .parallel import PARTITION_KEYS, calculate_metrics_parallel
+from .sample_data import generate_sample_data
+from .significance import bootstrap_incremental_roas
+from .store import DatasetStore
+
+# Command-line option holding the input file of each data type
+INPUT_OPTIONS = {
+    'influencers': 'influencers',
+    'posts': 'posts',
+    'tracking_data': 'tracking',
+    'payouts': 'payouts'
+}
+
+def load_input(manager, path, data_type, report=None):
+    """Validate and clean one input file (CSV, Parquet or Arrow/Feather)"""
+    path = Path(path)
+    suffixes = path.suffixes
+    if '.csv' in suffixes:
+        return manager.ingest_csv(path, data_type, report=report)
+    if suffixes[-1:] == ['.parquet']:
+        df = pd.read_parquet(path)
+    elif suffixes[-1:] in (['.arrow'], ['.feather']):
+        df = pd.read_feather(path)
+    else:
+        raise ValueError(f"{path}: unsupported file type, expected .csv, .parquet, .arrow or .feather")
+    
+    is_valid, message = manager.validate_schema(df, data_type)
+    if not is_valid:
+        raise ValueError(f"{path}: {message}")
+    df = encode_dimensions(manager.clean_data(df, data_type, report))
+    if report is not None:
+        report.finish()
+    return df
+
+def load_frames(args):
+    """The four input frames selected by the command-line arguments"""
+    if args.sample:
+        return generate_sample_data(seed=args.seed)
+    if args.store:
+        return DatasetStore(args.store).load_dataset()
+    
+    manager = DataIngestionManager()
+    if args.bundle:
+        bundled, reports, _ = ingest_bundle(args.bundle, manager, workers=args.workers)
+        for data_type, report in reports.items():
+            if report.violations:
+                print(f"{data_type}: {report.summary()}", file=sys.stderr)
+        missing = [data_type for data_type in INPUT_OPTIONS if data_type not in bundled]
+        if missing:
+            raise ValueError(f"the bundle has no {', '.join(missing)} data")
+        return tuple(share_dimensions([bundled[data_type] for data_type in INPUT_OPTIONS]))
+    
+    frames = []
+    for data_type, option in INPUT_OPTIONS.items():
+        # Influencers load first, so the other inputs' influencer_ids are checked against them
+        known_ids = frames[0]['influencer_id'] if frames else None
+        report = ValidationReport(data_type, influencer_ids=known_ids)
+        frames.append(load_input(manager, getattr(args, option), data_type, report))
+        if report.violations:
+            print(f"{getattr(args, option)}: {report.summary()}", file=sys.stderr)
+    return tuple(share_dimensions(frames))
+
+def compute_results(influencers_df, posts_df, tracking_df, payouts_df,
+                    attribution_window_days=ATTRIBUTION_WINDOW_DAYS, workers=1, partition_by='month',
+                    n_resamples=0, stratify_by=None):
+    """The dashboard's frames and KPIs for a full, unfiltered dataset"""
+    if workers == 1:
+        performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df, attribution_window_days)
+        incremental_roas, incremental_lift = calculate_incremental_roas(tracking_df, payouts_df)
+    else:
+        performance_df, (incremental_roas, incremental_lift) = calculate_metrics_parallel(
+            posts_df, tracking_df, payouts_df, partition_by, workers, attribution_window_days
+        )
+    cube = MetricsCube.from_performance(performance_df, influencers_df)
+    totals = cube.totals(cube.frame)
+    
+    frames = {
+        'performance': performance_df,
+        'cube': cube.frame,
+        'brand_roas': rollup_roas(cube.frame, 'brand'),
+        'platform_roas': rollup_roas(cube.frame, 'platform'),
+        'tier_roas': rollup_roas(cube.frame, 'tier')
+    }
+    summary = {
+        'total_revenue': float(totals['revenue']),
+        'total_spend': float(totals['total_payout']),
+        'roas': float(totals['revenue'] / totals['total_payout']) if totals['total_payout'] > 0 else 0.0,
+        'total_orders': float(totals['orders']),
+        # Tracking rows with no post in the attribution window and payouts of influencers without posts
+        'unattributed': unattributed_totals(performance_df, tracking_df, payouts_df),
+        'incremental_roas': float(incremental_roas),
+        'incremental_lift': float(incremental_lift),
+        'attribution_window_days': attribution_window_days,
+        'row_counts': {
+            'influencers': len(influencers_df),
+            'posts': len(posts_df),
+            'tracking_data': len(tracking_df),
+            'payouts': len(payouts_df)
+        },
+        'insights': generate_ai_insights(cube.frame, influencers_df)
+    }
+    if n_resamples:
+        intervals = bootstrap_incremental_roas(tracking_df, payouts_df, n_resamples, stratify_by=stratify_by)
+        summary['confidence_intervals'] = intervals.to_dict(orient='index')
+    return frames, summary
+
+def write_results(output_dir, frames, summary, file_format='parquet'):
+    """Write each frame as Parquet or JSON records plus a summary.json; returns the written paths"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    written = []
+    for name, df in frames.items():
+        path = output_dir / f'{name}.{file_format}'
+        if file_format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_json(path, orient='records', date_format='iso')
+        written.append(path)
+    
+    summary_path = output_dir / 'summary.json'
+    summary_path.write_text(json.dumps(summary, indent=2))
+    written.append(summary_path)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m roi_engine',
+        description='Compute the influencer ROI dashboard metrics without starting the UI.'
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--store', help='read a dataset saved by the dashboard (e.g. .roi_data)')
+    source.add_argument('--sample', action='store_true', help='use the generated sample dataset')
+    source.add_argument('--bundle', nargs='+', metavar='FILE',
+                        help='zip archives, .xlsx workbooks or CSV files holding all four data types, '
+                             'routed by their columns')
+    for data_type, option in INPUT_OPTIONS.items():
+        parser.add_argument(f'--{option}', help=f'{data_type} file (.csv, .parquet, .arrow or .feather)')
+    parser.add_argument('--seed', type=int, default=42, help='seed for --sample (default: 42)')
+    parser.add_argument('--output', '-o', default='roi_output', help='output directory (default: roi_output)')
+    parser.add_argument('--format', choices=['parquet', 'json'], default='parquet',
+                        help='file format of the result frames (default: parquet)')
+    parser.add_argument('--attribution-window', type=int, default=ATTRIBUTION_WINDOW_DAYS,
+                        help=f'days after a post that orders are attributed to it (default: {ATTRIBUTION_WINDOW_DAYS})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for the recompute; 0 = one per core (default: 1)')
+    parser.add_argument('--partition-by', choices=PARTITION_KEYS, default='month',
+                        help='how the recompute is split across workers (default: month)')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                        help='add 95%% bootstrap intervals for lift/incremental ROAS from N resamples')
+    parser.add_argument('--stratify-by', choices=['brand', 'platform'],
+                        help='resample influencers within their dominant brand or platform')
+    args = parser.parse_args(argv)
+    
+    if not args.store and not args.sample and not args.bundle:
+        missing = [f'--{option}' for option in INPUT_OPTIONS.values() if getattr(args, option) is None]
+        if missing:
+            parser.error(
+                f"the following arguments are required without --store/--sample/--bundle: {', '.join(missing)}"
+            )
+    
+    try:
+        frames, summary = compute_results(
+            *load_frames(args), attribution_window_days=args.attribution_window,
+            workers=args.workers, partition_by=args.partition_by,
+            n_resamples=args.bootstrap, stratify_by=args.stratify_by
+        )
+        written = write_results(args.output, frames, summary, args.format)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    
+    for path in written:
+        print(path)
+    return 0
@@ -0,0 +1,69 @@
+"""Pre-aggregated metrics cube for interactive slicing"""
+import numpy as np
+import pandas as pd
+
+from .filters import FrameFilter
+
+CUBE_DIMENSIONS = ['brand', 'platform', 'tier', 'category', 'gender', 'product', 'day']
+
+# Creator attributes copied onto each post from the influencers table
+INFLUENCER_DIMENSIONS = ['tier', 'category', 'gender']
+CUBE_MEASURES = ['revenue', 'orders', 'total_payout', 'reach', 'engagement', 'posts']
+
+def rollup_roas(frame, by):
+    """Sum the cube measures of frame by the given dimensions and add a ROAS column"""
+    measures = [col for col in CUBE_MEASURES if col in frame.columns]
+    rolled = frame.groupby(by, observed=True)[measures].sum().reset_index()
+    rolled['roas'] = np.where(rolled['total_payout'] > 0, rolled['revenue'] / rolled['total_payout'], 0)
+    return rolled
+
+class MetricsCube:
+    """
+    Pre-aggregated sums of the post-level measures keyed by (brand, platform,
+    tier, category, gender, product, day); a post has one creator, so the
+    creator attributes never split it across cells. Built once per dataset so
+    that filter changes slice a few thousand cells instead of scanning every post.
+    """
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self.index = FrameFilter(frame, 'day')
+    
+    @classmethod
+    def from_performance(cls, performance_df, influencers_df):
+        """Aggregate the output of calculate_roas_metrics into a cube"""
+        lookup = influencers_df.drop_duplicates('influencer_id').set_index('influencer_id')
+        # Positional lookup: Series.map mislabels categorical-to-categorical maps in pandas 2.0
+        creator = lookup.index.get_indexer(performance_df['influencer_id'])
+        engagement_cols = [col for col in ['likes', 'comments', 'shares'] if col in performance_df.columns]
+        
+        base = pd.DataFrame({
+            'brand': performance_df['brand'],
+            'platform': performance_df['platform'],
+            **{dim: pd.api.extensions.take(lookup[dim].array, creator, allow_fill=True)
+               for dim in INFLUENCER_DIMENSIONS},
+            'product': performance_df['product'],
+            'day': performance_df['date'].dt.normalize(),
+            'revenue': performance_df['revenue'],
+            'orders': performance_df['orders'],
+            'total_payout': performance_df['total_payout'],
+            'reach': performance_df['reach'],
+            'engagement': performance_df[engagement_cols].sum(axis=1),
+            'posts': 1
+        })
+        
+        frame = (
+            base.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)[CUBE_MEASURES]
+            .sum()
+            .reset_index()
+            .sort_values('day', kind='stable', ignore_index=True)
+        )
+        return cls(frame)
+    
+    def slice(self, brand=None, platform=None, tier=None, start=None, end=None):
+        """Return the cube cells matching the filters; None means no filter"""
+        return self.index.select(start, end, brand=brand, platform=platform, tier=tier)
+    
+    def totals(self, cells):
+        """Grand totals of the cube measures over a slice"""
+        return cells[CUBE_MEASURES].sum()
@@ -0,0 +1,108 @@
+"""Reduce series and scatters to a fixed point budget before they are charted"""
+import numpy as np
+import pandas as pd
+
+from .filters import day_numbers
+
+# Points (or heatmap cells) a single chart trace may send to the browser
+DEFAULT_POINT_BUDGET = 2000
+
+# Bucket widths in days, smallest first; beyond the last one widths grow in whole multiples of it
+BUCKET_DAYS = [1, 7, 14, 28]
+
+def bucket_width(span_days, budget=DEFAULT_POINT_BUDGET):
+    """Smallest bucket width (days) that fits span_days into at most budget buckets"""
+    needed = max(1, -(-span_days // max(budget, 1)))
+    for width in BUCKET_DAYS:
+        if width >= needed:
+            return width
+    return -(-needed // BUCKET_DAYS[-1]) * BUCKET_DAYS[-1]
+
+def time_buckets(dates, columns, budget=DEFAULT_POINT_BUDGET):
+    """
+    Sum each array in columns into calendar buckets (days, Monday-aligned
+    weeks, ...) chosen so the result has at most budget rows. Empty buckets
+    are dropped. Returns a frame with the bucket start 'date' and the sums.
+    """
+    days = day_numbers(dates)
+    valid = days != np.iinfo(np.int64).min
+    days = days[valid]
+    if not len(days):
+        return pd.DataFrame({'date': pd.to_datetime([]), **{name: [] for name in columns}})
+    
+    width = bucket_width(int(days.max() - days.min()) + 1, budget)
+    first = days.min()
+    if width % 7 == 0:
+        # 1970-01-01 was a Thursday; align weekly buckets to Mondays
+        first -= (first + 3) % 7
+    bucket = (days - first) // width
+    n_buckets = int(bucket.max()) + 1
+    
+    sums = {
+        name: np.bincount(bucket, weights=np.asarray(values, dtype=float)[valid], minlength=n_buckets)
+        for name, values in columns.items()
+    }
+    occupied = np.bincount(bucket, minlength=n_buckets) > 0
+    starts = first + np.arange(n_buckets) * width
+    frame = pd.DataFrame({'date': starts.astype('datetime64[D]').astype('datetime64[ns]'), **sums})
+    return frame[occupied].reset_index(drop=True)
+
+def lttb(x, y, budget=DEFAULT_POINT_BUDGET):
+    """
+    Indices of at most budget points chosen by Largest-Triangle-Three-Buckets:
+    the first and last points plus, per bucket, the point forming the largest
+    triangle with the previously kept point and the next bucket's mean. Keeps
+    peaks and troughs that averaging would flatten. x must be sorted.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    # Mean of every bucket, plus the last point standing in for the bucket after the final one
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts, y[-1])
+    
+    selected = np.empty(budget, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[previous] - mean_x[i + 1]) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y[i + 1] - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+def binned_density(x, y, budget=DEFAULT_POINT_BUDGET, log_x=False, log_y=False):
+    """
+    2-D histogram of (x, y) with at most budget cells. Log axes bin positive
+    values in log10 space. Returns (x bin centers, y bin centers, counts[y, x]).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        keep &= x > 0
+    if log_y:
+        keep &= y > 0
+    x, y = x[keep], y[keep]
+    if log_x:
+        x = np.log10(x)
+    if log_y:
+        y = np.log10(y)
+    
+    side = max(1, int(np.sqrt(budget)))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=side)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    if log_x:
+        x_centers = 10 ** x_centers
+    if log_y:
+        y_centers = 10 ** y_centers
+    return x_centers, y_centers, counts.T
@@ -0,0 +1,388 @@
+"""Fingerprint-keyed cache of derived metrics"""
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .attribution import ATTRIBUTION_WINDOW_DAYS
+from .cube import MetricsCube
+from .filters import FrameFilter
+from .insights import InsightEngine
+from .metrics import (
+    TrackingIdIndex, apply_order_payouts, calculate_roas_metrics, extend_roas_metrics,
+    incremental_roas_from_summary, summarize_tracking, unattributed_totals
+)
+from .optimizer import DEFAULT_MAX_SCALE, DEFAULT_SATURATION, optimize_budget, response_curves, scenario_key
+from .parallel import compute_partitioned
+from .profiling import span
+from .significance import bootstrap_from_summary, influencer_strata
+from .timeseries import OrderLagPartitions
+
+# Default bound of the metrics LRU
+DEFAULT_CACHE_BYTES = 1024 * 2**20
+
+def frame_fingerprint(df):
+    """Content hash of a frame: column names, dtypes, shape and every value"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes], df.shape)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def result_nbytes(value, _seen=None):
+    """
+    Approximate in-memory size of a cached result: frames, arrays and the
+    containers and plain objects (e.g. FrameFilter, MetricsCube) holding them.
+    Objects reachable twice within value are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(result_nbytes(item, seen) for pair in value.items() for item in pair)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(result_nbytes(item, seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return result_nbytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps the most recently used items: at most
+    max_entries of them and, when max_bytes is set, at most max_bytes in
+    total by result_nbytes. The newest item is kept even if it alone is larger.
+    """
+    
+    def __init__(self, max_entries=8, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key, value):
+        size = result_nbytes(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.nbytes() > self.max_bytes)
+            ):
+                oldest, _ = self._entries.popitem(last=False)
+                del self._sizes[oldest]
+    
+    def nbytes(self):
+        """Total size of the cached items (0 unless max_bytes is set)"""
+        with self._lock:
+            return sum(self._sizes.values())
+    
+    def discard_where(self, predicate):
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+                del self._sizes[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+    
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class MetricsEngine:
+    """
+    Serves derived metrics from an LRU keyed on a content fingerprint of the
+    input frames, so reruns on unchanged data skip the recomputation. The LRU
+    is bounded by max_bytes rather than by a count, since one dataset alone
+    caches about ten results and several sessions' datasets must fit together.
+    Cached frames are shared between callers and must be treated as read-only.
+    With workers other than 1, full recomputes are partitioned by partition_by
+    ('month' or 'brand') and run in a process pool (0 = one worker per core).
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, workers=1, partition_by='month', max_entries=256,
+                 max_figures=32, max_insights=256, max_plans=16):
+        self.cache = LRUCache(max_entries, max_bytes)
+        self.figures = LRUCache(max_figures)
+        self.plans = LRUCache(max_plans)
+        self.insight_engine = InsightEngine(cache=LRUCache(max_insights))
+        # Per-day lag partitions outlive any one tracking frame, so appends only attribute new days
+        self.lag_partitions = LRUCache(4)
+        self.workers = workers
+        self.partition_by = partition_by
+        self._fingerprints = {}
+        self._lock = threading.RLock()
+    
+    def fingerprint(self, df):
+        """Content hash of a frame, memoized for as long as the frame object is alive"""
+        key = id(df)
+        with self._lock:
+            memo = self._fingerprints.get(key)
+            if memo is not None and memo[0]() is df:
+                return memo[1]
+        
+        return self._remember(df, frame_fingerprint(df))
+    
+    def _remember(self, df, fingerprint):
+        key = id(df)
+        with self._lock:
+            ref = weakref.ref(df, lambda ref, key=key: self._forget(key, ref))
+            self._fingerprints[key] = (ref, fingerprint)
+        return fingerprint
+    
+    def _forget(self, key, ref):
+        with self._lock:
+            memo = self._fingerprints.get(key)
+            if memo is not None and memo[0] is ref:
+                del self._fingerprints[key]
+    
+    def _key(self, name, frames):
+        return (name,) + tuple(self.fingerprint(df) for df in frames)
+    
+    def cached(self, name, frames, compute):
+        """Return compute(), reusing the cached result for identical frame contents"""
+        key = self._key(name, frames)
+        result = self.cache.get(key, self._MISSING)
+        if result is self._MISSING:
+            with span(f'compute {name}'):
+                result = compute()
+            self.cache.put(key, result)
+        return result
+    
+    def invalidate(self, *frames):
+        """
+        Drop cached results derived from the given frames, or everything when
+        called without arguments. Call this whenever stored frames are replaced.
+        """
+        if not frames:
+            with self._lock:
+                self._fingerprints.clear()
+            self.cache.clear()
+            self.figures.clear()
+            self.plans.clear()
+            self.insight_engine.cache.clear()
+            self.lag_partitions.clear()
+            return
+        
+        stale = set()
+        with self._lock:
+            for df in frames:
+                memo = self._fingerprints.pop(id(df), None)
+                if memo is not None:
+                    stale.add(memo[1])
+        self.cache.discard_where(lambda key: any(part in stale for part in key[1:]))
+        self.figures.discard_where(lambda key: any(part in stale for part in key[1]))
+        self.plans.discard_where(lambda key: any(part in stale for part in key[1]))
+        self.insight_engine.cache.discard_where(lambda key: any(part in stale for part in key[1][0]))
+        self.lag_partitions.discard_where(lambda key: any(part in stale for part in key))
+    
+    def figure(self, name, frames, filter_state, build):
+        """
+        Return build(), reusing the figure cached for the same chart, frame
+        contents and filter_state (any hashable, e.g. a tuple of filter values).
+        Figures live in their own LRU so charts never evict computed metrics.
+        """
+        key = (name, tuple(self.fingerprint(df) for df in frames), filter_state)
+        fig = self.figures.get(key)
+        if fig is None:
+            with span(f'build figure {name}'):
+                fig = build()
+            self.figures.put(key, fig)
+        return fig
+    
+    def insights(self, frames, filter_state, cells):
+        """
+        Insight messages for cells, the slice of these frames' cube selected by
+        filter_state; each rule's message is memoized per frame contents and filter_state.
+        """
+        state = (tuple(self.fingerprint(df) for df in frames), filter_state)
+        return self.insight_engine.evaluate(cells, frames[0], state)
+    
+    def budget_plan(self, influencers_df, posts_df, tracking_df, payouts_df, budget, brand_caps=None, tier_mix=None,
+                    min_marginal_roas=1.0, saturation=DEFAULT_SATURATION, max_scale=DEFAULT_MAX_SCALE):
+        """
+        optimize_budget() over the dataset's response curves. Plans live in
+        their own LRU keyed by scenario and frame contents, so trying
+        scenarios never evicts computed metrics.
+        """
+        frames = (influencers_df, posts_df, tracking_df, payouts_df)
+        key = (scenario_key(budget, brand_caps, tier_mix, min_marginal_roas, saturation, max_scale),
+               tuple(self.fingerprint(df) for df in frames))
+        plan = self.plans.get(key)
+        if plan is None:
+            with span('compute budget_plan'):
+                curves = self.cached(
+                    f'response_curves:{saturation}', frames,
+                    lambda: response_curves(self.roas_metrics(*frames), payouts_df, influencers_df, saturation)
+                )
+                plan = optimize_budget(curves, budget, brand_caps, tier_mix, min_marginal_roas, max_scale)
+            self.plans.put(key, plan)
+        return plan
+    
+    def warm(self, influencers_df, posts_df, tracking_df, payouts_df, progress_callback=None):
+        """
+        Build every result a dashboard rerun reads, e.g. in a background job
+        before a new dataset is shown. progress_callback(fraction, message) is
+        called before each stage.
+        """
+        frames = (influencers_df, posts_df, tracking_df, payouts_df)
+        stages = [
+            ('Computing ROAS metrics', self.roas_metrics),
+            ('Building metrics cube', self.cube),
+            ('Indexing posts', self.performance_filter),
+            ('Computing incremental ROAS', self.incremental_roas),
+            ('Attributing order lags', lambda *frames: self.order_lags(*frames[:3]))
+        ]
+        for i, (message, build) in enumerate(stages):
+            if progress_callback is not None:
+                progress_callback(i / len(stages), message)
+            build(*frames)
+    
+    def roas_metrics(self, influencers_df, posts_df, tracking_df, payouts_df):
+        return self.cached(
+            'roas_metrics', (influencers_df, posts_df, tracking_df, payouts_df),
+            lambda: self._compute_roas_metrics(posts_df, tracking_df, payouts_df)
+        )
+    
+    def _compute_roas_metrics(self, posts_df, tracking_df, payouts_df):
+        if self.workers == 1:
+            return calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+        
+        # The partitioned pass produces the tracking summary for free; keep it
+        performance_df, tracking_summary = compute_partitioned(
+            posts_df, tracking_df, payouts_df, self.partition_by, self.workers, ATTRIBUTION_WINDOW_DAYS
+        )
+        self.cache.put(self._key('tracking_summary', (tracking_df,)), tracking_summary)
+        return performance_df
+    
+    def cube(self, influencers_df, posts_df, tracking_df, payouts_df):
+        return self.cached(
+            'cube', (influencers_df, posts_df, tracking_df, payouts_df),
+            lambda: MetricsCube.from_performance(
+                self.roas_metrics(influencers_df, posts_df, tracking_df, payouts_df), influencers_df
+            )
+        )
+    
+    def performance_filter(self, influencers_df, posts_df, tracking_df, payouts_df):
+        """FrameFilter over roas_metrics() for date-range and dimension selection"""
+        return self.cached(
+            'performance_filter', (influencers_df, posts_df, tracking_df, payouts_df),
+            lambda: FrameFilter(self.roas_metrics(influencers_df, posts_df, tracking_df, payouts_df))
+        )
+    
+    def unattributed(self, influencers_df, posts_df, tracking_df, payouts_df):
+        """Revenue, orders and spend left out of roas_metrics() (see metrics.unattributed_totals)"""
+        return self.cached(
+            'unattributed', (influencers_df, posts_df, tracking_df, payouts_df),
+            lambda: unattributed_totals(
+                self.roas_metrics(influencers_df, posts_df, tracking_df, payouts_df), tracking_df, payouts_df
+            )
+        )
+    
+    def incremental_roas(self, influencers_df, posts_df, tracking_df, payouts_df):
+        return self.cached(
+            'incremental_roas', (influencers_df, posts_df, tracking_df, payouts_df),
+            lambda: incremental_roas_from_summary(self.tracking_summary(tracking_df), payouts_df)
+        )
+    
+    def incremental_roas_intervals(self, influencers_df, posts_df, tracking_df, payouts_df,
+                                   n_resamples=2000, confidence=0.95, stratify_by=None):
+        """Bootstrap confidence intervals for lift and incremental ROAS (see significance.py)"""
+        def compute():
+            strata = None
+            if stratify_by:
+                strata = self.cached(f'strata:{stratify_by}', (tracking_df,),
+                                     lambda: influencer_strata(tracking_df, stratify_by))
+            return bootstrap_from_summary(
+                self.tracking_summary(tracking_df), payouts_df, n_resamples, confidence, strata
+            )
+        
+        return self.cached(
+            f'incremental_roas_intervals:{n_resamples}:{confidence}:{stratify_by}',
+            (influencers_df, posts_df, tracking_df, payouts_df), compute
+        )
+    
+    def order_lags(self, influencers_df, posts_df, tracking_df):
+        """
+        FrameFilter (by post date) over the post-to-order lag rows of
+        timeseries.order_lag_rows. A new tracking frame for the same posts only
+        attributes the order days that are new or changed.
+        """
+        def compute():
+            key = (self.fingerprint(influencers_df), self.fingerprint(posts_df))
+            partitions = self.lag_partitions.get(key)
+            if partitions is None:
+                partitions = OrderLagPartitions(posts_df, influencers_df, ATTRIBUTION_WINDOW_DAYS)
+                self.lag_partitions.put(key, partitions)
+            return FrameFilter(partitions.update(tracking_df), 'post_date')
+        
+        return self.cached('order_lags', (influencers_df, posts_df, tracking_df), compute)
+    
+    def tracking_summary(self, tracking_df):
+        return self.cached('tracking_summary', (tracking_df,), lambda: summarize_tracking(tracking_df))
+    
+    def tracking_id_index(self, tracking_df):
+        return self.cached(
+            'tracking_id_index', (tracking_df,),
+            lambda: TrackingIdIndex(tracking_df['tracking_id'] if 'tracking_id' in tracking_df.columns else [])
+        )
+    
+    def append_tracking(self, influencers_df, posts_df, tracking_df, payouts_df, merged_tracking_df, new_rows):
+        """
+        Roll every cached aggregate of the dataset forward to merged_tracking_df
+        (tracking_df plus the deduplicated new_rows) from the new rows alone:
+        the tracking summary, the tracking_id index, per-order payout totals,
+        post-level attribution and the cube. Returns the updated payouts frame.
+        """
+        # Derive the merged frame's fingerprint instead of re-hashing the whole history
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.fingerprint(tracking_df).encode())
+        digest.update(self.fingerprint(new_rows).encode())
+        self._remember(merged_tracking_df, digest.hexdigest())
+        
+        batch_summary = summarize_tracking(new_rows)
+        merged_summary = self.tracking_summary(tracking_df).add(batch_summary, fill_value=0)
+        new_orders = batch_summary['orders'].groupby(level='influencer_id', observed=True).sum()
+        new_payouts = apply_order_payouts(payouts_df, new_orders)
+        
+        performance_df = extend_roas_metrics(
+            self.roas_metrics(influencers_df, posts_df, tracking_df, payouts_df), posts_df, new_rows, new_payouts
+        )
+        id_index = self.tracking_id_index(tracking_df)
+        if 'tracking_id' in new_rows.columns:
+            id_index = id_index.extended(new_rows['tracking_id'])
+        
+        frames = (influencers_df, posts_df, merged_tracking_df, new_payouts)
+        self.cache.put(self._key('tracking_summary', (merged_tracking_df,)), merged_summary)
+        self.cache.put(self._key('tracking_id_index', (merged_tracking_df,)), id_index)
+        self.cache.put(self._key('roas_metrics', frames), performance_df)
+        self.cache.put(self._key('cube', frames), MetricsCube.from_performance(performance_df, influencers_df))
+        return new_payouts
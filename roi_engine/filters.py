@@ -0,0 +1,75 @@
+"""Date-range and equality filtering over a sorted int64 day index"""
+import numpy as np
+import pandas as pd
+
+def day_number(value):
+    """Days since 1970-01-01 of a date, datetime or Timestamp"""
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype(np.int64))
+
+def day_numbers(values):
+    """Days since 1970-01-01 of a datetime column as int64 (NaT sorts first)"""
+    return np.asarray(values, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+class FrameFilter:
+    """
+    Row selector for a frame with a date column. Rows are ordered by an int64
+    day index once, so a date range is two binary searches; equality filters
+    on the other columns compare integer codes inside that range only, and
+    their masks are ANDed together before a single take().
+    """
+    
+    def __init__(self, frame, date_column='date'):
+        self.frame = frame
+        days = day_numbers(frame[date_column])
+        if len(days) and (days[1:] < days[:-1]).any():
+            self.order = np.argsort(days, kind='stable')
+            self.days = days[self.order]
+        else:
+            self.order = None
+            self.days = days
+        self._codes = {}
+    
+    def _column_codes(self, column):
+        """Integer codes of a column in day order, and the values they stand for"""
+        if column not in self._codes:
+            values = self.frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values)
+            if self.order is not None:
+                codes = codes[self.order]
+            self._codes[column] = (codes, pd.Index(uniques))
+        return self._codes[column]
+    
+    def date_bounds(self, start=None, end=None):
+        """[lo, hi) of the day-ordered rows dated from start to end inclusive"""
+        lo = 0 if start is None else np.searchsorted(self.days, day_number(start), side='left')
+        hi = len(self.days) if end is None else np.searchsorted(self.days, day_number(end), side='right')
+        return lo, max(lo, hi)
+    
+    def positions(self, start=None, end=None, **equals):
+        """
+        Positions of the matching rows, in date order. Each keyword filters a
+        column to one value or, given a list-like, to any of several values;
+        None leaves the column unfiltered.
+        """
+        lo, hi = self.date_bounds(start, end)
+        mask = np.ones(hi - lo, dtype=bool)
+        for column, value in equals.items():
+            if value is None:
+                continue
+            codes, uniques = self._column_codes(column)
+            wanted = np.zeros(len(uniques) + 1, dtype=bool)
+            values = value if pd.api.types.is_list_like(value) else [value]
+            found = uniques.get_indexer(pd.Index(values).unique())
+            wanted[found[found >= 0]] = True
+            # Code -1 (missing) indexes the trailing False slot
+            mask &= wanted[codes[lo:hi]]
+        
+        selected = np.flatnonzero(mask) + lo
+        return selected if self.order is None else self.order[selected]
+    
+    def select(self, start=None, end=None, **equals):
+        """The matching rows of the frame (see positions)"""
+        return self.frame.take(self.positions(start, end, **equals))
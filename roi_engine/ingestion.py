@@ -0,0 +1,329 @@
+"""CSV ingestion: schema validation, cleaning and compact dtypes"""
+import numpy as np
+import pandas as pd
+
+# Low-cardinality columns held as categoricals with one shared dictionary per dimension
+DIMENSION_COLUMNS = ['influencer_id', 'brand', 'product', 'platform', 'campaign_type', 'tier', 'category',
+                     'gender', 'basis', 'campaign']
+
+def encode_dimensions(df):
+    """Return df with its dimension columns as categoricals (df itself is left untouched)"""
+    columns = [
+        col for col in DIMENSION_COLUMNS
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+    ]
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for col in columns:
+        df[col] = df[col].astype('category')
+    return df
+
+def share_dimensions(frames):
+    """
+    Give every dimension column the same category dictionary across frames, so
+    merges and groupbys between them run on integer codes. Returns new frames.
+    """
+    frames = [encode_dimensions(df).copy(deep=False) for df in frames]
+    for col in DIMENSION_COLUMNS:
+        holders = [df for df in frames if col in df.columns]
+        if len(holders) < 2:
+            continue
+        shared = holders[0][col].cat.categories
+        for df in holders[1:]:
+            shared = shared.union(df[col].cat.categories)
+        for df in holders:
+            if not df[col].cat.categories.equals(shared):
+                df[col] = df[col].cat.set_categories(shared)
+    return frames
+
+class FrameSink:
+    """Collects cleaned chunks and concatenates them once at the end"""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def append(self, chunk):
+        self.chunks.append(chunk)
+    
+    def finish(self):
+        if not self.chunks:
+            return pd.DataFrame()
+        df = pd.concat(self.chunks, ignore_index=True)
+        self.chunks = []
+        return df
+    
+    def abort(self):
+        self.chunks = []
+
+class ValidationReport:
+    """
+    Row-level validation results of one ingest, accumulated chunk by chunk:
+    per (check, column), the number of violating rows and the labels of the
+    first max_samples of them. Rows failing a 'dropped' check are removed by
+    clean_data, rows failing a 'flagged' check are kept. When influencer_ids
+    is given, influencer_id values outside it are flagged as unknown.
+    """
+    
+    def __init__(self, data_type, influencer_ids=None, max_samples=5):
+        self.data_type = data_type
+        self.influencer_ids = None if influencer_ids is None else pd.Index(pd.unique(np.asarray(influencer_ids)))
+        self.max_samples = max_samples
+        self.rows_read = 0
+        self.rows_kept = 0
+        self.violations = {}
+        self._ids = {}
+    
+    @property
+    def rows_dropped(self):
+        return self.rows_read - self.rows_kept
+    
+    def add(self, check, column, mask, labels, severity='dropped'):
+        """Count the rows selected by the boolean array mask; labels are the row labels"""
+        violating = np.flatnonzero(mask)
+        if not len(violating):
+            return
+        entry = self.violations.setdefault((check, column), {'severity': severity, 'count': 0, 'sample_rows': []})
+        entry['count'] += len(violating)
+        room = self.max_samples - len(entry['sample_rows'])
+        if room > 0:
+            entry['sample_rows'].extend(labels[violating[:room]].tolist())
+    
+    def track_ids(self, column, values, labels):
+        """Hash a chunk's id values; repeats across the whole ingest are counted by finish()"""
+        hashes, rows = self._ids.setdefault(column, ([], []))
+        hashes.append(pd.util.hash_array(np.asarray(values)))
+        rows.append(labels)
+    
+    def finish(self):
+        """Flag every repeat of an id after its first row (by 64-bit hash) and return self"""
+        for column, (hashes, rows) in self._ids.items():
+            if hashes:
+                repeated = pd.Series(np.concatenate(hashes)).duplicated().to_numpy()
+                self.add('duplicate_id', column, repeated, np.concatenate(rows), severity='flagged')
+        self._ids = {}
+        return self
+    
+    def to_frame(self):
+        """One row per violated check: check, column, severity, count and sample_rows"""
+        return pd.DataFrame(
+            [{'check': check, 'column': column, **entry} for (check, column), entry in self.violations.items()],
+            columns=['check', 'column', 'severity', 'count', 'sample_rows']
+        )
+    
+    def summary(self):
+        """One line for logs and status messages"""
+        issues = [
+            f"{entry['count']:,} {check.replace('_', ' ')} {column} ({entry['severity']})"
+            for (check, column), entry in self.violations.items()
+        ]
+        text = f"{self.rows_kept:,} of {self.rows_read:,} {self.data_type} rows kept"
+        return f"{text}: {'; '.join(issues)}" if issues else text
+
+class DataIngestionManager:
+    """Handles data upload, validation, and processing for the dashboard"""
+    
+    def __init__(self, chunksize=250_000):
+        self.required_schemas = {
+            'influencers': ['influencer_id', 'name', 'category', 'gender', 'follower_count', 'platform', 'tier'],
+            'posts': ['influencer_id', 'platform', 'date', 'reach', 'likes', 'comments', 'brand', 'product', 'campaign_type'],
+            'tracking_data': ['influencer_id', 'campaign', 'orders', 'revenue', 'date', 'campaign_type'],
+            'payouts': ['influencer_id', 'basis', 'rate', 'total_payout']
+        }
+        # Canonical dtypes of the typed columns after cleaning; counts are rounded and
+        # downcast to 32 bits while money stays float64 so large sums keep their precision
+        self.numeric_dtypes = {
+            'influencers': {'follower_count': 'int32'},
+            'posts': {'reach': 'int32', 'likes': 'int32', 'comments': 'int32'},
+            'tracking_data': {'orders': 'int32', 'revenue': 'float64'},
+            'payouts': {'rate': 'float64', 'total_payout': 'float64'}
+        }
+        self.date_columns = {
+            'posts': ['date'],
+            'tracking_data': ['date']
+        }
+        # Plausibility checks; rows failing them are reported but kept
+        self.non_negative_columns = {
+            'influencers': ['follower_count'],
+            'posts': ['reach', 'likes', 'comments'],
+            'tracking_data': ['orders', 'revenue'],
+            'payouts': ['rate', 'total_payout']
+        }
+        self.upper_bounds = {
+            'posts': {'likes': 'reach', 'comments': 'reach'}
+        }
+        self.id_columns = {
+            'influencers': 'influencer_id',
+            'posts': 'post_id',
+            'tracking_data': 'tracking_id'
+        }
+        self.chunksize = chunksize
+    
+    def validate_schema(self, df, data_type):
+        """Validate if uploaded data matches required schema"""
+        required_cols = self.required_schemas.get(data_type, [])
+        missing_cols = [col for col in required_cols if col not in df.columns]
+        
+        if missing_cols:
+            return False, f"Missing required columns: {missing_cols}"
+        
+        return True, "Schema validation passed"
+    
+    def detect_data_type(self, columns):
+        """
+        The data type whose required columns are all among columns (the one
+        needing the most of them if several match), or None
+        """
+        columns = set(columns)
+        matches = [data_type for data_type, required in self.required_schemas.items() if set(required) <= columns]
+        return max(matches, key=lambda data_type: len(self.required_schemas[data_type]), default=None)
+    
+    def read_dtypes(self, data_type):
+        """Explicit read_csv dtypes: text columns as str, numeric and date columns are coerced in clean_data"""
+        typed_cols = set(self.numeric_dtypes.get(data_type, {})) | set(self.date_columns.get(data_type, []))
+        return {col: str for col in self.required_schemas[data_type] if col not in typed_cols}
+    
+    def clean_data(self, df, data_type, report=None):
+        """
+        Clean and standardize uploaded data: rows with a missing required value
+        or a value that does not parse are dropped. With a ValidationReport,
+        every violation is also counted there (see validate_rows).
+        """
+        numeric_dtypes = self.numeric_dtypes.get(data_type, {})
+        
+        # Coerce typed columns up front so every invalid row is dropped by a single filter
+        coerced = {}
+        for col in self.date_columns.get(data_type, []):
+            coerced[col] = pd.to_datetime(df[col], errors='coerce')
+        for col in numeric_dtypes:
+            coerced[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        valid = df[self.required_schemas[data_type]].notna().all(axis=1)
+        for values in coerced.values():
+            valid &= values.notna()
+        if report is not None:
+            self.validate_rows(df, data_type, coerced, valid.to_numpy(), report)
+        
+        rows = np.flatnonzero(valid.to_numpy())
+        df_clean = df.take(rows)
+        for col, values in coerced.items():
+            values = values.take(rows)
+            if col in numeric_dtypes:
+                values = self._cast_numeric(values, numeric_dtypes[col])
+            df_clean[col] = values
+        
+        return df_clean
+    
+    def validate_rows(self, df, data_type, coerced, valid, report):
+        """
+        Record one chunk's violations in report as whole-column masks: missing
+        and unparseable values (dropped), then fractional counts (rounded),
+        negative amounts, counts above their bound, unknown influencers and
+        repeated ids among the kept rows.
+        """
+        labels = df.index.to_numpy()
+        report.rows_read += len(df)
+        report.rows_kept += int(np.count_nonzero(valid))
+        
+        date_columns = self.date_columns.get(data_type, [])
+        for col in self.required_schemas[data_type]:
+            missing = df[col].isna().to_numpy()
+            report.add('missing', col, missing, labels)
+            if col in coerced:
+                unparsed = coerced[col].isna().to_numpy() & ~missing
+                report.add('invalid_date' if col in date_columns else 'invalid_number', col, unparsed, labels)
+        
+        for col, dtype in self.numeric_dtypes.get(data_type, {}).items():
+            if np.dtype(dtype).kind == 'i':
+                fractional = valid & (coerced[col] % 1 != 0).to_numpy()
+                report.add('rounded', col, fractional, labels, 'flagged')
+        for col in self.non_negative_columns.get(data_type, []):
+            report.add('negative', col, valid & (coerced[col] < 0).to_numpy(), labels, 'flagged')
+        for col, bound in self.upper_bounds.get(data_type, {}).items():
+            exceeds = valid & (coerced[col] > coerced[bound]).to_numpy()
+            report.add(f'exceeds_{bound}', col, exceeds, labels, 'flagged')
+        if report.influencer_ids is not None and data_type != 'influencers':
+            unknown = valid & ~df['influencer_id'].isin(report.influencer_ids).to_numpy()
+            report.add('unknown', 'influencer_id', unknown, labels, 'flagged')
+        
+        id_column = self.id_columns.get(data_type)
+        if id_column in df.columns:
+            keep = valid & df[id_column].notna().to_numpy()
+            report.track_ids(id_column, df[id_column].to_numpy()[keep], labels[keep])
+    
+    @staticmethod
+    def _cast_numeric(values, dtype):
+        """
+        astype that rounds values for an integer dtype (instead of truncating
+        them) and falls back to int64 when they overflow a compact one
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind == 'i' and len(values):
+            values = values.round()
+            limits = np.iinfo(dtype)
+            if values.min() < limits.min or values.max() > limits.max:
+                dtype = np.dtype('int64')
+        return values.astype(dtype)
+    
+    def iter_clean_chunks(self, source, data_type, chunksize=None, report=None):
+        """Read a CSV in chunks, yielding (cleaned_chunk, raw_row_count) per chunk"""
+        reader = pd.read_csv(source, chunksize=chunksize or self.chunksize, dtype=self.read_dtypes(data_type))
+        with reader:
+            for chunk in reader:
+                is_valid, message = self.validate_schema(chunk, data_type)
+                if not is_valid:
+                    raise ValueError(message)
+                yield self.clean_data(chunk, data_type, report), len(chunk)
+    
+    def ingest_csv(self, source, data_type, sink=None, progress_callback=None, chunksize=None, report=None):
+        """
+        Stream a CSV through validation and cleaning chunk by chunk, appending each
+        cleaned chunk to sink. Peak memory is one raw chunk plus the cleaned output.
+        progress_callback(rows_read, rows_kept, fraction) is called after every chunk,
+        with fraction estimated from the read position when the source size is known.
+        A ValidationReport passed as report collects the violations, labelled by
+        data row number (0 = first row after the header).
+        """
+        sink = sink if sink is not None else FrameSink()
+        total_bytes = getattr(source, 'size', None)
+        rows_read = rows_kept = 0
+        
+        try:
+            for chunk, raw_rows in self.iter_clean_chunks(source, data_type, chunksize, report):
+                sink.append(chunk)
+                rows_read += raw_rows
+                rows_kept += len(chunk)
+                if progress_callback is not None:
+                    fraction = min(source.tell() / total_bytes, 1.0) if total_bytes else None
+                    progress_callback(rows_read, rows_kept, fraction)
+        except Exception:
+            sink.abort()
+            raise
+        
+        if report is not None:
+            report.finish()
+        # Chunks are concatenated as strings; dimensions are encoded once on the full result
+        return encode_dimensions(sink.finish())
+    
+    def deduplicate_tracking(self, batch_df, id_index):
+        """Drop batch rows whose tracking_id repeats within the batch or is already in id_index"""
+        if 'tracking_id' not in batch_df.columns:
+            raise ValueError("Append mode needs a tracking_id column to deduplicate on")
+        batch_df = batch_df.drop_duplicates('tracking_id')
+        is_new = ~id_index.contains(batch_df['tracking_id'].to_numpy())
+        return batch_df.take(np.flatnonzero(is_new))
+    
+    def append_tracking(self, source, tracking_df, id_index, store=None, progress_callback=None, report=None):
+        """
+        Append mode for daily tracking exports: validates and cleans only the new
+        batch, drops tracking_ids already present and merges the remaining rows
+        into tracking_df (and into store as a new part, leaving stored parts as
+        they are). Returns (merged_tracking_df, new_rows).
+        """
+        batch_df = self.ingest_csv(source, 'tracking_data', progress_callback=progress_callback, report=report)
+        new_rows = self.deduplicate_tracking(batch_df, id_index)
+        if store is not None and len(new_rows):
+            store.append('tracking_data', new_rows)
+        
+        existing, new_rows = share_dimensions([tracking_df, new_rows])
+        return pd.concat([existing, new_rows], ignore_index=True), new_rows
@@ -0,0 +1,199 @@
+"""Rule-of-thumb insights over filtered performance data or cube cells"""
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+NO_INSIGHTS = "No specific insights generated for the current filtered data."
+
+class InsightRule:
+    """
+    One insight: the dimensions it rolls up by, the measures it sums, and
+    evaluate(rollup), which turns that rollup (indexed by the dimensions, with
+    a roas column when revenue and total_payout are summed) into a message or None.
+    """
+    
+    def __init__(self, name, dimensions, evaluate, measures=('revenue', 'total_payout')):
+        self.name = name
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.evaluate = evaluate
+
+# --- Rules
+def _tier_insight(tiers):
+    best_tier = tiers['roas'].idxmax()
+    worst_tier = tiers['roas'].idxmin()
+    if best_tier == worst_tier:
+        return None
+    roas_best = tiers.loc[best_tier, 'roas']
+    roas_worst = tiers.loc[worst_tier, 'roas']
+    
+    # Simple simulation of a recommendation
+    if roas_best > roas_worst * 1.5:
+        return (
+            f"**Performance Optimization:** {best_tier}-influencers show {roas_best:.2f}x ROAS vs "
+            f"{roas_worst:.2f}x for {worst_tier}-influencers. "
+            f"Recommend reallocating budget to the {best_tier}-tier for optimal ROI."
+        )
+    return None
+
+def _platform_insight(platforms):
+    if len(platforms) < 2:
+        return None
+    top_platform = platforms['roas'].idxmax()
+    return (
+        f"**Platform Intelligence:** **{top_platform}** is the highest performing platform with a ROAS of "
+        f"{platforms.loc[top_platform, 'roas']:.2f}x. "
+        "Consider increasing budget allocation to this platform to maximize returns."
+    )
+
+def _product_insight(products):
+    if len(products) < 2:
+        return None
+    top_product = products['roas'].idxmax()
+    return (
+        f"**Product Strategy:** **{top_product}** campaigns demonstrate the highest ROAS at "
+        f"{products.loc[top_product, 'roas']:.2f}x. "
+        "Focus marketing efforts on this product for optimal ROI."
+    )
+
+def _category_insight(categories):
+    if len(categories) < 2:
+        return None
+    top_category = categories['roas'].idxmax()
+    return (
+        f"**Creator Mix:** **{top_category}** creators return {categories.loc[top_category, 'roas']:.2f}x ROAS, "
+        f"the best of {len(categories)} creator categories. Prioritize them when recruiting new influencers."
+    )
+
+def _gender_insight(genders):
+    best_gender = genders['roas'].idxmax()
+    worst_gender = genders['roas'].idxmin()
+    if best_gender == worst_gender:
+        return None
+    roas_best = genders.loc[best_gender, 'roas']
+    roas_worst = genders.loc[worst_gender, 'roas']
+    if roas_best > roas_worst * 1.25:
+        return (
+            f"**Audience Fit:** posts by {best_gender} creators return {roas_best:.2f}x ROAS vs "
+            f"{roas_worst:.2f}x for {worst_gender} creators. Review creative and targeting for the latter."
+        )
+    return None
+
+def _weekday_insight(weekdays):
+    if len(weekdays) < 2:
+        return None
+    best_day = weekdays['roas'].idxmax()
+    return (
+        f"**Posting Schedule:** posts published on **{best_day}s** return {weekdays.loc[best_day, 'roas']:.2f}x "
+        f"ROAS, the best day of the week. Schedule key launches for {best_day}."
+    )
+
+INSIGHT_RULES = [
+    InsightRule('tier', ['tier'], _tier_insight),
+    InsightRule('platform', ['platform'], _platform_insight),
+    InsightRule('product', ['product'], _product_insight),
+    InsightRule('category', ['category'], _category_insight),
+    InsightRule('gender', ['gender'], _gender_insight),
+    InsightRule('weekday', ['weekday'], _weekday_insight)
+]
+
+# --- Engine
+def dimension_column(frame, influencers_df, dim):
+    """
+    The dim column for each row of frame: its own column, the weekday of its
+    'day' or 'date', or a creator attribute looked up by influencer_id.
+    Returns None when frame cannot provide it.
+    """
+    if dim in frame.columns:
+        return frame[dim]
+    if dim == 'weekday':
+        dates = frame['day'] if 'day' in frame.columns else frame.get('date')
+        if dates is None:
+            return None
+        codes = dates.dt.dayofweek.fillna(-1).to_numpy(np.int8)
+        return pd.Series(pd.Categorical.from_codes(codes, WEEKDAYS), index=frame.index)
+    if influencers_df is not None and dim in influencers_df.columns and 'influencer_id' in frame.columns:
+        lookup = influencers_df.drop_duplicates('influencer_id').set_index('influencer_id')[dim]
+        # Positional lookup: Series.map mislabels categorical-to-categorical maps in pandas 2.0
+        creator = lookup.index.get_indexer(frame['influencer_id'])
+        return pd.Series(pd.api.extensions.take(lookup.array, creator, allow_fill=True), index=frame.index)
+    return None
+
+class InsightEngine:
+    """
+    Evaluates insight rules over one frame. The rollups of all rules come
+    from a single groupby of the frame by the union of their dimensions (a
+    grouping-sets pass); each rule then re-sums that small aggregate. Given a
+    cache (anything with get/put, e.g. LRUCache) and a state key for the
+    frame, each rule's message is memoized per state, so a rerun with an
+    unchanged filter skips the pass entirely.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, rules=None, cache=None):
+        self.rules = list(INSIGHT_RULES if rules is None else rules)
+        self.cache = cache
+    
+    def rollups(self, frame, influencers_df=None, rules=None):
+        """{dimensions tuple: rollup} for every rule whose inputs frame can provide"""
+        rules = self.rules if rules is None else rules
+        columns = {}
+        measures = []
+        for rule in rules:
+            for dim in rule.dimensions:
+                if dim not in columns:
+                    columns[dim] = dimension_column(frame, influencers_df, dim)
+            measures.extend(m for m in rule.measures if m in frame.columns and m not in measures)
+        columns = {dim: column for dim, column in columns.items() if column is not None}
+        if not columns or not measures:
+            return {}
+        
+        # Nulls stay in the base pass so one dimension's gaps never drop rows from another's rollup
+        base = (
+            pd.DataFrame({**columns, **{m: frame[m] for m in measures}})
+            .groupby(list(columns), observed=True, dropna=False, sort=False)[measures]
+            .sum()
+        )
+        rollups = {}
+        for rule in rules:
+            key = tuple(rule.dimensions)
+            if key in rollups or not set(key) <= set(columns) or not set(rule.measures) <= set(measures):
+                continue
+            rolled = base.groupby(level=list(key), observed=True)[measures].sum()
+            if 'revenue' in rolled.columns and 'total_payout' in rolled.columns:
+                payout = rolled['total_payout'].to_numpy()
+                revenue = rolled['revenue'].to_numpy()
+                rolled['roas'] = np.where(payout > 0, revenue / np.where(payout > 0, payout, 1), 0)
+            rollups[key] = rolled
+        return rollups
+    
+    def evaluate(self, frame, influencers_df=None, state=None):
+        """Messages of the rules that fire on frame, in rule order"""
+        memoize = self.cache is not None and state is not None
+        messages = {}
+        if memoize:
+            for rule in self.rules:
+                message = self.cache.get((rule.name, state), self._MISSING)
+                if message is not self._MISSING:
+                    messages[rule.name] = message
+        
+        pending = [rule for rule in self.rules if rule.name not in messages]
+        if pending:
+            rollups = self.rollups(frame, influencers_df, pending)
+            for rule in pending:
+                rollup = rollups.get(tuple(rule.dimensions))
+                message = rule.evaluate(rollup) if rollup is not None and not rollup.empty else None
+                messages[rule.name] = message
+                if memoize:
+                    self.cache.put((rule.name, state), message)
+        
+        insights = [messages[rule.name] for rule in self.rules if messages[rule.name]]
+        return insights or [NO_INSIGHTS]
+
+def generate_ai_insights(filtered_df, influencers_df, rules=None):
+    """
+    Generates dynamic, AI-like insights based on the filtered data (post-level
+    rows or cube cells); creator attributes missing from it come from influencers_df.
+    """
+    return InsightEngine(rules).evaluate(filtered_df, influencers_df)
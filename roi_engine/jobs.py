@@ -0,0 +1,100 @@
+"""Background jobs with progress reporting and cooperative cancellation"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelled(Exception):
+    """Raised inside a job by update() once cancel() has been requested"""
+
+class Job:
+    """
+    Handle to one background task. The task is called with the job as its
+    first argument and reports progress through update(), which is also
+    where a requested cancellation takes effect. status moves from 'pending'
+    to 'running' and ends as 'done' (see result), 'failed' (see error) or
+    'cancelled'. Only the task writes to the job, so readers need no lock.
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.status = 'pending'
+        self.fraction = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+    
+    def update(self, fraction=None, message=None):
+        """Report progress (fraction in [0, 1]); raises JobCancelled if the job was cancelled"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+        if fraction is not None:
+            self.fraction = fraction
+        if message is not None:
+            self.message = message
+    
+    def cancel(self):
+        """Ask the task to stop at its next update(); a job that has not started yet never runs"""
+        self._cancel.set()
+    
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+    
+    @property
+    def active(self):
+        return self.status in ('pending', 'running')
+    
+    @property
+    def elapsed(self):
+        """Seconds the task has been running (or ran), None before it starts"""
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+    
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns False on timeout"""
+        return self._done.wait(timeout)
+    
+    def _run(self, task, args, kwargs):
+        if self._cancel.is_set():
+            self.status = 'cancelled'
+            self._done.set()
+            return
+        self.status = 'running'
+        self.started = time.monotonic()
+        try:
+            self.result = task(self, *args, **kwargs)
+            self.fraction = 1.0
+            self.status = 'done'
+        except JobCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = e
+            self.status = 'failed'
+        finally:
+            self.finished = time.monotonic()
+            self._done.set()
+
+class JobRunner:
+    """
+    Runs jobs on a shared thread pool, so results stay in-process without
+    pickling; CSV parsing and the pandas/numpy kernels behind the metric
+    builds release the GIL for most of their work.
+    """
+    
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='roi-job')
+    
+    def submit(self, name, task, *args, **kwargs):
+        """Queue task(job, *args, **kwargs) and return its Job"""
+        job = Job(name)
+        self._executor.submit(job._run, task, args, kwargs)
+        return job
+    
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,168 @@
+"""ROAS, incremental ROAS and their incremental-update helpers"""
+import numpy as np
+import pandas as pd
+
+from .attribution import ATTRIBUTION_WINDOW_DAYS, allocate_payouts, attribute_tracking_to_posts
+
+def attributed_sums(posts_df, tracking_df, window_days=ATTRIBUTION_WINDOW_DAYS):
+    """Revenue and orders of the tracking rows attributed to each post, aligned with posts_df"""
+    post_position = attribute_tracking_to_posts(posts_df, tracking_df, window_days)
+    attributed = post_position >= 0
+    revenue = np.bincount(post_position[attributed], weights=tracking_df['revenue'].to_numpy(float)[attributed],
+                          minlength=len(posts_df))
+    orders = np.bincount(post_position[attributed], weights=tracking_df['orders'].to_numpy(float)[attributed],
+                         minlength=len(posts_df))
+    return revenue, orders
+
+def post_level_metrics(posts_df, revenue, orders, payouts_df):
+    """Attach attributed revenue/orders, allocated payouts and the derived ratios to posts_df"""
+    performance_df = posts_df.copy(deep=False)
+    performance_df['revenue'] = revenue
+    performance_df['orders'] = orders
+    performance_df['total_payout'] = allocate_payouts(posts_df, orders, payouts_df)
+    
+    # Calculate metrics
+    performance_df['roas'] = np.where(performance_df['total_payout'] > 0, 
+                                    performance_df['revenue'] / performance_df['total_payout'], 0)
+    performance_df['cpo'] = np.where(performance_df['orders'] > 0,
+                                   performance_df['total_payout'] / performance_df['orders'], 0)
+    engagement_cols = [col for col in ['likes', 'comments', 'shares'] if col in performance_df.columns]
+    performance_df['engagement_rate'] = performance_df[engagement_cols].sum(axis=1) / performance_df['reach']
+    
+    return performance_df
+
+def calculate_roas_metrics(posts_df, tracking_df, payouts_df, attribution_window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    Calculate ROAS and other key metrics per post. Revenue and orders come from
+    the tracking rows attributed to each post and payouts are allocated per post
+    or per order, so summing any set of posts never double counts.
+    """
+    revenue, orders = attributed_sums(posts_df, tracking_df, attribution_window_days)
+    return post_level_metrics(posts_df, revenue, orders, payouts_df)
+
+def unattributed_totals(performance_df, tracking_df, payouts_df):
+    """
+    Revenue and orders of the tracking rows no post was attributed, and the spend
+    of influencers without posts: what the post-level totals leave out
+    """
+    # Rounded to cents so float noise in the sums does not read as a gap
+    totals = {
+        'revenue': tracking_df['revenue'].sum() - performance_df['revenue'].sum(),
+        'orders': tracking_df['orders'].sum() - performance_df['orders'].sum(),
+        'total_payout': payouts_df['total_payout'].sum() - performance_df['total_payout'].sum()
+    }
+    return {name: max(round(float(value), 2), 0.0) for name, value in totals.items()}
+
+def summarize_tracking(tracking_df):
+    """Per (influencer, campaign_type) revenue, order and row totals of the tracking data"""
+    return tracking_df.groupby(['influencer_id', 'campaign_type'], observed=True).agg(
+        revenue=('revenue', 'sum'),
+        orders=('orders', 'sum'),
+        rows=('revenue', 'size')
+    )
+
+def incremental_roas_from_summary(tracking_summary, payouts_df):
+    """
+    Incremental ROAS and lift from a summarize_tracking() frame. Both compare
+    per-influencer mean revenue, so Test and Control groups of different sizes
+    are comparable; significance.py bootstraps the same estimator.
+    """
+    campaign_type = tracking_summary.index.get_level_values('campaign_type').astype(str)
+    influencer_ids = tracking_summary.index.get_level_values('influencer_id')
+    test_revenue = tracking_summary['revenue'][campaign_type == 'Test'].sum()
+    control_revenue = tracking_summary['revenue'][campaign_type == 'Control'].sum()
+    
+    test_influencers = influencer_ids[campaign_type == 'Test'].unique()
+    n_control = influencer_ids[campaign_type == 'Control'].nunique()
+    test_spend = payouts_df.loc[payouts_df['influencer_id'].isin(test_influencers), 'total_payout'].sum()
+    # Revenue as many Control influencers as there are Test ones would have earned
+    baseline_revenue = control_revenue / n_control * len(test_influencers) if n_control else 0
+    
+    if baseline_revenue > 0:
+        incremental_lift = (test_revenue / baseline_revenue) - 1
+    else:
+        incremental_lift = 0
+    
+    if test_spend > 0:
+        incremental_roas = (test_revenue - baseline_revenue) / test_spend
+    else:
+        incremental_roas = 0
+    
+    return incremental_roas, incremental_lift
+
+def calculate_incremental_roas(tracking_df, payouts_df):
+    """
+    Calculates incremental ROAS based on Test vs. Control groups.
+    Assumes campaigns are properly tagged in tracking_df.
+    """
+    return incremental_roas_from_summary(summarize_tracking(tracking_df), payouts_df)
+
+# --- Incremental Tracking Updates ---
+class TrackingIdIndex:
+    """Sorted 64-bit hashes of the stored tracking_ids, for O(batch log n) duplicate checks"""
+    
+    def __init__(self, ids, hashes=None, order=None):
+        self.ids = np.asarray(ids)
+        if hashes is None:
+            hashes = pd.util.hash_array(self.ids)
+            order = np.argsort(hashes, kind='stable')
+            hashes = hashes[order]
+        self.hashes = hashes
+        self.order = order
+    
+    def contains(self, ids):
+        """Boolean mask of the ids that are already indexed"""
+        ids = np.asarray(ids)
+        if not len(self.hashes):
+            return np.zeros(len(ids), dtype=bool)
+        hashes = pd.util.hash_array(ids)
+        position = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        found = self.hashes[position] == hashes
+        # Confirm hash hits against the stored values so a collision never drops a new row
+        found[found] = self.ids[self.order[position[found]]] == ids[found]
+        return found
+    
+    def extended(self, new_ids):
+        """A new index that also covers new_ids, merged without re-sorting the existing hashes"""
+        new_ids = np.asarray(new_ids)
+        new_hashes = pd.util.hash_array(new_ids)
+        new_order = np.argsort(new_hashes, kind='stable')
+        insert_at = np.searchsorted(self.hashes, new_hashes[new_order])
+        return TrackingIdIndex(
+            np.concatenate([self.ids, new_ids]),
+            np.insert(self.hashes, insert_at, new_hashes[new_order]),
+            np.insert(self.order, insert_at, new_order + len(self.ids))
+        )
+
+def apply_order_payouts(payouts_df, new_orders):
+    """
+    Add rate x new orders to the total_payout of per-order contracts.
+    new_orders is indexed by influencer_id; returns a new payouts frame.
+    """
+    payouts = payouts_df.copy(deep=False)
+    added = payouts['influencer_id'].map(new_orders).astype(float).fillna(0).to_numpy()
+    if 'basis' in payouts.columns:
+        per_order = payouts['basis'].astype(str).eq('order').to_numpy()
+    else:
+        per_order = np.zeros(len(payouts), dtype=bool)
+    
+    payouts['total_payout'] = payouts['total_payout'].to_numpy(float) + np.where(
+        per_order, payouts['rate'].to_numpy(float) * added, 0
+    )
+    if 'orders' in payouts.columns:
+        payouts['orders'] = (payouts['orders'].to_numpy() + added).astype(payouts['orders'].dtype)
+    return payouts
+
+def extend_roas_metrics(performance_df, posts_df, new_tracking_df, payouts_df,
+                        attribution_window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    calculate_roas_metrics for the tracking history plus new_tracking_df, computed
+    from the previous result by attributing only the new rows.
+    """
+    revenue, orders = attributed_sums(posts_df, new_tracking_df, attribution_window_days)
+    return post_level_metrics(
+        posts_df,
+        performance_df['revenue'].to_numpy() + revenue,
+        performance_df['orders'].to_numpy() + orders,
+        payouts_df
+    )
@@ -0,0 +1,220 @@
+"""Budget reallocation across influencers by greedy marginal ROAS"""
+import numpy as np
+import pandas as pd
+
+# Revenue of each further post relative to the previous one in a planning period
+DEFAULT_SATURATION = 0.9
+
+# Most posts a plan may buy from a creator/brand pair, as a multiple of its current posts
+DEFAULT_MAX_SCALE = 2.0
+
+def response_curves(performance_df, payouts_df, influencers_df=None, saturation=DEFAULT_SATURATION):
+    """
+    Revenue curve of every (influencer, brand) pair from post-level results
+    (calculate_roas_metrics) and payout contracts. Spend buys posts: one more
+    post costs rate on a per-post contract, or rate x the pair's orders per
+    post on a per-order one. The k-th post of a period returns
+    first_post_revenue * saturation**(k - 1), scaled so the pair's current
+    posts reproduce its attributed revenue.
+    """
+    if not 0 < saturation <= 1:
+        raise ValueError(f"saturation must be in (0, 1], got {saturation}")
+    pairs = performance_df.groupby(['influencer_id', 'brand'], observed=True).agg(
+        posts=('revenue', 'size'), revenue=('revenue', 'sum'), orders=('orders', 'sum')
+    ).reset_index()
+
+    ids = pairs['influencer_id'].astype(object)
+    contracts = payouts_df.drop_duplicates('influencer_id')
+    contracts.index = contracts['influencer_id'].astype(object)
+    rate = ids.map(contracts['rate']).astype(float).fillna(0).to_numpy()
+    if 'basis' in contracts.columns:
+        per_order = ids.map(contracts['basis'].astype(str)).eq('order').to_numpy()
+    else:
+        per_order = np.zeros(len(pairs), dtype=bool)
+
+    posts = pairs['posts'].to_numpy(float)
+    revenue = pairs['revenue'].to_numpy(float)
+    pairs['unit_cost'] = np.where(per_order, rate * pairs['orders'].to_numpy(float) / posts, rate)
+    pairs['current_spend'] = pairs['unit_cost'] * posts
+    # Mean of first * s**k over the current posts equals the observed revenue per post
+    pairs['first_post_revenue'] = (
+        revenue * (1 - saturation) / (1 - saturation ** posts) if saturation < 1 else revenue / posts
+    )
+    if influencers_df is not None:
+        creators = influencers_df.drop_duplicates('influencer_id')
+        tiers = pd.Series(creators['tier'].astype(object).to_numpy(), index=creators['influencer_id'].astype(object))
+        pairs['tier'] = ids.map(tiers)
+    else:
+        pairs['tier'] = np.nan
+    pairs.attrs['saturation'] = saturation
+    return pairs
+
+def _fill(available, budget, groups):
+    """
+    Spend per unit when units (in marginal-ROAS order) are funded in turn up
+    to budget and the group caps, given as (unit positions, cap) pairs. The
+    unit that crosses a cap is funded in part and its group takes no further
+    units. Each pass settles the earliest crossing over all groups, so at
+    most one pass per group is needed.
+    """
+    taken = available.copy()
+    groups = [(np.arange(len(taken)), budget)] + [(positions, cap) for positions, cap in groups if np.isfinite(cap)]
+    while True:
+        crossings = []
+        for positions, cap in groups:
+            spent = np.cumsum(taken[positions])
+            k = np.searchsorted(spent, cap + 1e-9 * max(cap, 1.0), side='right')
+            if k < len(positions):
+                crossings.append((positions[k], cap - (spent[k - 1] if k else 0.0), positions[k + 1:]))
+        if not crossings:
+            return taken
+        # A unit can cross several caps at once; the tightest one sets its spend and only binding groups close
+        position = min(crossing[0] for crossing in crossings)
+        crossings = [crossing for crossing in crossings if crossing[0] == position]
+        left = max(min(crossing[1] for crossing in crossings), 0.0)
+        taken[position] = left
+        for _, group_left, after in crossings:
+            if group_left <= left + 1e-9 * max(left, 1.0):
+                taken[after] = 0
+
+def _group_positions(codes, names, caps):
+    """(unit positions, cap) per named group; codes index names"""
+    return [(np.flatnonzero(codes == names.get_loc(name)), cap) for name, cap in caps.items() if name in names]
+
+def optimize_budget(curves, budget, brand_caps=None, tier_mix=None, min_marginal_roas=1.0,
+                    max_scale=DEFAULT_MAX_SCALE):
+    """
+    Allocate budget over the posts of response_curves() by greedy marginal
+    ROAS. Every post a pair could buy (up to max_scale x its current posts,
+    while its marginal ROAS stays at or above min_marginal_roas) is one unit;
+    the marginal values are known in closed form, so one sort of all units
+    replaces a heap. brand_caps maps brand to the most it may receive;
+    tier_mix maps tier to (min_share, max_share) of budget, either may be
+    None. Minimum shares are funded first from their own tiers' best units.
+    Returns curves with the planned_spend, planned_posts, expected_revenue
+    and marginal_roas (of the last funded post) of each pair. plan.attrs
+    records the constraints that shaped it (see _constraint_report).
+    """
+    if budget < 0:
+        raise ValueError(f"budget must not be negative, got {budget}")
+    brand_caps = dict(brand_caps or {})
+    tier_mix = dict(tier_mix or {})
+    if any(cap < 0 for cap in brand_caps.values()):
+        raise ValueError("brand caps must not be negative")
+    for tier, (low, high) in tier_mix.items():
+        if not 0 <= (low or 0) <= (1 if high is None else high) <= 1:
+            raise ValueError(f"tier_mix for {tier} must satisfy 0 <= min_share <= max_share <= 1")
+    if sum(low or 0 for low, _ in tier_mix.values()) > 1:
+        raise ValueError("tier_mix minimum shares add up to more than the budget")
+
+    saturation = curves.attrs.get('saturation', DEFAULT_SATURATION)
+    first = curves['first_post_revenue'].to_numpy(float)
+    cost = curves['unit_cost'].to_numpy(float)
+    valid = (cost > 0) & (first > 0)
+
+    # Posts per pair: the max_scale limit, cut where marginal ROAS falls below the floor
+    units = np.where(valid, np.ceil(curves['posts'].to_numpy(float) * max_scale), 0)
+    if saturation < 1 and min_marginal_roas > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            above_floor = np.floor(1 + np.log(min_marginal_roas * cost / first) / np.log(saturation))
+        units = np.minimum(units, np.where(valid, above_floor, 0))
+    elif min_marginal_roas > 0:
+        units = np.where(first / np.where(valid, cost, 1) >= min_marginal_roas, units, 0)
+    units = np.maximum(units, 0).astype(np.int64)
+
+    pair = np.repeat(np.arange(len(curves)), units)
+    step = np.arange(len(pair)) - np.repeat(np.cumsum(units) - units, units)
+    roas = first[pair] * saturation ** step / cost[pair]
+    order = np.argsort(-roas, kind='stable')
+    pair, roas, unit_cost = pair[order], roas[order], cost[pair[order]]
+
+    brands = pd.Index(curves['brand'].astype(object).unique())
+    tiers = pd.Index(curves['tier'].astype(object).dropna().unique())
+    brand_codes = brands.get_indexer(curves['brand'].astype(object))[pair]
+    tier_codes = tiers.get_indexer(curves['tier'].astype(object))[pair]
+
+    spend = np.zeros(len(pair))
+    minimums = {tier: low * budget for tier, (low, _) in tier_mix.items() if low}
+    if minimums:
+        minimum_codes = tiers.get_indexer(list(minimums))
+        in_minimum_tiers = np.isin(tier_codes, minimum_codes[minimum_codes >= 0])
+        spend += _fill(
+            np.where(in_minimum_tiers, unit_cost, 0), sum(minimums.values()),
+            _group_positions(brand_codes, brands, brand_caps) + _group_positions(tier_codes, tiers, minimums)
+        )
+
+    # The rest of the budget goes to the best remaining units, within what the caps have left
+    brand_spent = np.bincount(brand_codes, weights=spend, minlength=len(brands))
+    # Shift by one so units without a tier (code -1) land in a discarded bin
+    tier_spent = np.bincount(tier_codes + 1, weights=spend, minlength=len(tiers) + 1)[1:]
+    brand_left = {
+        brand: max(cap - brand_spent[brands.get_loc(brand)], 0.0)
+        for brand, cap in brand_caps.items() if brand in brands
+    }
+    tier_left = {
+        tier: max(high * budget - tier_spent[tiers.get_loc(tier)], 0.0)
+        for tier, (_, high) in tier_mix.items() if high is not None and tier in tiers
+    }
+    spend += _fill(
+        unit_cost - spend, max(budget - spend.sum(), 0.0),
+        _group_positions(brand_codes, brands, brand_left) + _group_positions(tier_codes, tiers, tier_left)
+    )
+
+    plan = curves.copy()
+    plan['planned_spend'] = np.bincount(pair, weights=spend, minlength=len(curves))
+    plan['planned_posts'] = np.bincount(pair, weights=spend / unit_cost, minlength=len(curves))
+    plan['expected_revenue'] = np.bincount(pair, weights=spend * roas, minlength=len(curves))
+    funded = spend > 0
+    marginal = np.full(len(curves), np.inf)
+    np.minimum.at(marginal, pair[funded], roas[funded])
+    plan['marginal_roas'] = np.where(np.isfinite(marginal), marginal, 0)
+    # Budget the floor, the max_scale limit or the caps left unspent is budget - planned_spend.sum()
+    plan.attrs['budget'] = budget
+    plan.attrs.update(_constraint_report(plan, budget, brand_caps, tier_mix))
+    return plan
+
+def _reached(amount, limit):
+    return amount >= limit - 1e-6 * max(limit, 1.0)
+
+def _constraint_report(plan, budget, brand_caps, tier_mix):
+    """
+    unmet_tier_minimums maps tier to (minimum, planned spend) where too few of
+    its units clear the floor and max_scale to fund the minimum share;
+    binding_brand_caps and binding_tier_caps map brand/tier to the cap (in
+    budget currency) the plan spends up to.
+    """
+    brand_spend = plan.groupby(plan['brand'].astype(object))['planned_spend'].sum()
+    tier_spend = plan.groupby(plan['tier'].astype(object))['planned_spend'].sum()
+    unmet, binding_tiers = {}, {}
+    for tier, (low, high) in tier_mix.items():
+        spent = float(tier_spend.get(tier, 0.0))
+        if low and not _reached(spent, low * budget):
+            unmet[tier] = (low * budget, spent)
+        if high is not None and tier in tier_spend.index and _reached(spent, high * budget):
+            binding_tiers[tier] = high * budget
+    binding_brands = {
+        brand: float(cap) for brand, cap in brand_caps.items()
+        if brand in brand_spend.index and _reached(float(brand_spend[brand]), cap)
+    }
+    return {'unmet_tier_minimums': unmet, 'binding_brand_caps': binding_brands, 'binding_tier_caps': binding_tiers}
+
+def plan_summary(plan, by):
+    """Current vs planned spend, revenue and ROAS of a plan summed by the given column(s)"""
+    rolled = plan.groupby(by, observed=True)[
+        ['current_spend', 'revenue', 'planned_spend', 'expected_revenue']
+    ].sum().reset_index()
+    for prefix, spend, revenue in (('current', 'current_spend', 'revenue'),
+                                   ('planned', 'planned_spend', 'expected_revenue')):
+        amount = rolled[spend].to_numpy()
+        rolled[f'{prefix}_roas'] = np.where(amount > 0, rolled[revenue].to_numpy() / np.where(amount > 0, amount, 1), 0)
+    return rolled
+
+def scenario_key(budget, brand_caps=None, tier_mix=None, min_marginal_roas=1.0, saturation=DEFAULT_SATURATION,
+                 max_scale=DEFAULT_MAX_SCALE):
+    """Hashable identity of an optimizer scenario, for caching its plan"""
+    return (
+        float(budget),
+        tuple(sorted((str(brand), float(cap)) for brand, cap in (brand_caps or {}).items())),
+        tuple(sorted((str(tier), low, high) for tier, (low, high) in (tier_mix or {}).items())),
+        float(min_marginal_roas), float(saturation), float(max_scale)
+    )
@@ -0,0 +1,147 @@
+"""Partitioned, process-parallel recompute of the post-level metrics and tracking summary"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+
+from .attribution import ATTRIBUTION_WINDOW_DAYS, _shared_codes, attribution_keys
+from .metrics import attributed_sums, incremental_roas_from_summary, post_level_metrics, summarize_tracking
+
+PARTITION_KEYS = ['month', 'brand']
+
+def default_workers():
+    """Worker processes to use when none are configured: ROI_WORKERS, else 1 (in-process)"""
+    return int(os.environ.get('ROI_WORKERS', 1))
+
+def resolve_workers(workers=None):
+    """workers, or default_workers() when None; 0 means one per core"""
+    workers = default_workers() if workers is None else workers
+    return workers or os.cpu_count() or 1
+
+def process_pool(workers):
+    """
+    ProcessPoolExecutor with spawned workers. Forking copies locks held by
+    other threads, so a pool forked from a multithreaded process (e.g. a
+    dashboard job running next to the Streamlit server) can deadlock.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+def brand_partitions(posts_df, tracking_df):
+    """
+    (post positions, tracking positions) per brand. Tracking rows only ever match
+    posts of their own brand, so the partitions are fully independent.
+    """
+    if 'brand' not in attribution_keys(posts_df, tracking_df):
+        raise ValueError("Partitioning by brand needs a brand column in both posts and tracking data")
+    
+    tracking_codes, post_codes = _shared_codes(tracking_df['brand'], posts_df['brand'])
+    tracking_order = np.argsort(tracking_codes, kind='stable')
+    post_order = np.argsort(post_codes, kind='stable')
+    brands, tracking_starts = np.unique(tracking_codes[tracking_order], return_index=True)
+    tracking_bounds = np.append(tracking_starts, len(tracking_order))
+    post_lo = np.searchsorted(post_codes[post_order], brands, side='left')
+    post_hi = np.searchsorted(post_codes[post_order], brands, side='right')
+    
+    return [
+        (post_order[post_lo[i]:post_hi[i]], tracking_order[tracking_bounds[i]:tracking_bounds[i + 1]])
+        for i in range(len(brands))
+    ]
+
+def month_partitions(posts_df, tracking_df, window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    (post positions, tracking positions) per calendar month of the tracking data.
+    Each month also carries the posts published up to window_days before it
+    starts, so orders early in the month still find the post they belong to.
+    """
+    tracking_dates = tracking_df['date'].to_numpy('datetime64[ns]')
+    tracking_months = tracking_dates.astype('datetime64[M]')
+    tracking_order = np.argsort(tracking_months, kind='stable')
+    months, tracking_starts = np.unique(tracking_months[tracking_order], return_index=True)
+    tracking_bounds = np.append(tracking_starts, len(tracking_order))
+    
+    post_dates = posts_df['date'].to_numpy('datetime64[ns]')
+    post_order = np.argsort(post_dates, kind='stable')
+    month_starts = months.astype('datetime64[ns]')
+    month_ends = (months + 1).astype('datetime64[ns]')
+    post_lo = np.searchsorted(post_dates[post_order], month_starts - np.timedelta64(window_days, 'D'), side='left')
+    post_hi = np.searchsorted(post_dates[post_order], month_ends, side='left')
+    
+    return [
+        (post_order[post_lo[i]:post_hi[i]], tracking_order[tracking_bounds[i]:tracking_bounds[i + 1]])
+        for i in range(len(months))
+    ]
+
+def partition_aggregates(posts_part, tracking_part, post_positions, n_posts, window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    Partial aggregates of one partition: attributed revenue/orders scattered onto
+    all n_posts posts, and the partition's tracking summary.
+    """
+    revenue, orders = attributed_sums(posts_part, tracking_part, window_days)
+    return {
+        'revenue': np.bincount(post_positions, weights=revenue, minlength=n_posts),
+        'orders': np.bincount(post_positions, weights=orders, minlength=n_posts),
+        'tracking_summary': summarize_tracking(tracking_part)
+    }
+
+def combine_aggregates(left, right):
+    """Associative, commutative merge of two partial aggregates"""
+    return {
+        'revenue': left['revenue'] + right['revenue'],
+        'orders': left['orders'] + right['orders'],
+        'tracking_summary': left['tracking_summary'].add(right['tracking_summary'], fill_value=0)
+    }
+
+def _run_partition(task):
+    return partition_aggregates(*task)
+
+def compute_partitioned(posts_df, tracking_df, payouts_df, partition_by='month', workers=None,
+                        attribution_window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    calculate_roas_metrics and summarize_tracking for the full dataset, split into
+    brand or month partitions that are aggregated in a pool of worker processes
+    and combined. Payouts are allocated once over the combined post totals, since
+    an influencer's contract spans partitions. workers defaults to
+    default_workers(); 1 runs in-process and 0 uses one process per core.
+    Returns (performance_df, tracking_summary).
+    """
+    if partition_by == 'brand':
+        partitions = brand_partitions(posts_df, tracking_df)
+    elif partition_by == 'month':
+        partitions = month_partitions(posts_df, tracking_df, attribution_window_days)
+    else:
+        raise ValueError(f"Unknown partition key '{partition_by}', expected one of {', '.join(PARTITION_KEYS)}")
+    
+    n_posts = len(posts_df)
+    tasks = [
+        (posts_df.take(post_positions), tracking_df.take(tracking_positions), post_positions, n_posts,
+         attribution_window_days)
+        for post_positions, tracking_positions in partitions
+    ]
+    workers = min(resolve_workers(workers), max(len(tasks), 1))
+    
+    if workers > 1:
+        with process_pool(workers) as pool:
+            partials = list(pool.map(_run_partition, tasks))
+    else:
+        partials = [_run_partition(task) for task in tasks]
+    
+    empty = {
+        'revenue': np.zeros(n_posts),
+        'orders': np.zeros(n_posts),
+        'tracking_summary': summarize_tracking(tracking_df.iloc[:0])
+    }
+    combined = reduce(combine_aggregates, partials, empty)
+    
+    tracking_summary = combined['tracking_summary'].astype({'orders': 'int64', 'rows': 'int64'})
+    performance_df = post_level_metrics(posts_df, combined['revenue'], combined['orders'], payouts_df)
+    return performance_df, tracking_summary
+
+def calculate_metrics_parallel(posts_df, tracking_df, payouts_df, partition_by='month', workers=None,
+                               attribution_window_days=ATTRIBUTION_WINDOW_DAYS):
+    """Partitioned counterpart of calculate_roas_metrics + calculate_incremental_roas"""
+    performance_df, tracking_summary = compute_partitioned(
+        posts_df, tracking_df, payouts_df, partition_by, workers, attribution_window_days
+    )
+    return performance_df, incremental_roas_from_summary(tracking_summary, payouts_df)
@@ -0,0 +1,101 @@
+"""Opt-in nested timing spans with memory deltas and a JSON-lines export"""
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from .store import DEFAULT_STORE_ROOT
+
+DEFAULT_PROFILE_LOG = os.environ.get('ROI_PROFILE_LOG', os.path.join(DEFAULT_STORE_ROOT, 'profile.jsonl'))
+
+_active_profiler = ContextVar('roi_engine_profiler', default=None)
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class Profiler:
+    """
+    Collects nested spans for one unit of work (e.g. a dashboard rerun): wall
+    time and resident-memory change of each span, with its depth and parent
+    path. A disabled profiler hands out no-op spans.
+    """
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+    
+    @contextmanager
+    def _span(self, name):
+        path = '/'.join(self._stack + [name])
+        record = {'name': name, 'path': path, 'depth': len(self._stack),
+                  'start': time.perf_counter() - self._origin, 'seconds': None, 'memory_delta_mb': None}
+        # Record on entry so spans are listed in the order they started
+        self.spans.append(record)
+        self._stack.append(name)
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            rss_after = rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                record['memory_delta_mb'] = (rss_after - rss_before) / 2**20
+            self._stack.pop()
+    
+    def span(self, name):
+        return self._span(name) if self.enabled else nullcontext()
+    
+    @contextmanager
+    def activate(self):
+        """Make this the profiler that module-level span() calls report to"""
+        token = _active_profiler.set(self if self.enabled else None)
+        try:
+            yield self
+        finally:
+            _active_profiler.reset(token)
+    
+    def total_seconds(self):
+        """Wall time covered by the top-level spans"""
+        return sum(record['seconds'] or 0 for record in self.spans if record['depth'] == 0)
+    
+    def export(self, path=DEFAULT_PROFILE_LOG, **meta):
+        """Append this profiler's spans as one JSON line (with meta fields) to path"""
+        if not self.spans:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        line = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            **meta,
+            'total_seconds': self.total_seconds(),
+            'spans': self.spans
+        }
+        with open(path, 'a') as f:
+            f.write(json.dumps(line) + '\n')
+
+def span(name):
+    """A span of the active profiler, or a no-op when profiling is off"""
+    profiler = _active_profiler.get()
+    return profiler.span(name) if profiler is not None else nullcontext()
+
+def load_profile_log(path=DEFAULT_PROFILE_LOG):
+    """
+    Flatten an exported log to one dict per span (with its line's timestamp
+    and meta fields), e.g. for pd.DataFrame(...).groupby('path')['seconds'].
+    """
+    rows = []
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            spans = entry.pop('spans')
+            rows.extend({**entry, **record} for record in spans)
+    return rows
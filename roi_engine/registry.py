@@ -0,0 +1,159 @@
+"""Process-wide registry that shares identical datasets between sessions"""
+import hashlib
+import os
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+
+from .engine import frame_fingerprint
+from .store import DEFAULT_STORE_ROOT, DatasetStore
+
+def frames_nbytes(frames):
+    """In-memory size of a dataset's frames, including object payloads"""
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames))
+
+class DatasetHandle:
+    """
+    One session's reference to a registered dataset. The reference is
+    released by close() or, failing that, when the handle is garbage
+    collected together with the session that held it.
+    """
+    
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+        self._finalizer = weakref.finalize(self, registry.release, key)
+    
+    def frames(self):
+        """The dataset's (influencers, posts, tracking, payouts) frames, reloaded if spilled"""
+        return self.registry.get(self.key)
+    
+    def clone(self):
+        """A second, independently closed reference to the same dataset"""
+        return self.registry.acquire(self.key)
+    
+    def close(self):
+        self._finalizer()
+    
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+class DatasetRegistry:
+    """
+    Holds each distinct dataset once, keyed by a hash of its frames' contents,
+    and counts the sessions referencing it. When resident datasets exceed
+    memory_budget bytes, the least recently used are evicted: unreferenced
+    ones are dropped, referenced ones are spilled to an Arrow store under
+    spill_root and memory-mapped back on their next access. Sessions must keep
+    the DatasetHandle, not the frames, or eviction cannot free anything.
+    """
+    
+    def __init__(self, memory_budget=None, spill_root=None, fingerprint=frame_fingerprint):
+        self.memory_budget = memory_budget
+        self.spill_root = spill_root or os.path.join(DEFAULT_STORE_ROOT, 'registry')
+        self.fingerprint = fingerprint
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def dataset_key(self, frames):
+        digest = hashlib.blake2b(digest_size=16)
+        for df in frames:
+            digest.update(self.fingerprint(df).encode())
+        return digest.hexdigest()
+    
+    def register(self, frames):
+        """
+        Add a dataset (or find the identical one already registered) and
+        return a new handle referencing it.
+        """
+        frames = tuple(frames)
+        key = self.dataset_key(frames)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'frames': frames, 'nbytes': frames_nbytes(frames), 'refs': 0, 'spilled': False}
+                self._entries[key] = entry
+            elif entry['frames'] is None:
+                # The caller already holds the frames; no need to reload the spill
+                entry['frames'] = frames
+            entry['refs'] += 1
+            self._entries.move_to_end(key)
+            self._enforce_budget(keep=key)
+        return DatasetHandle(self, key)
+    
+    def acquire(self, key):
+        """A new handle on a dataset that is already registered"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(f"Dataset {key} is not registered")
+            entry['refs'] += 1
+        return DatasetHandle(self, key)
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(f"Dataset {key} is not registered")
+            if entry['frames'] is None:
+                entry['frames'] = DatasetStore(self._spill_path(key)).load_dataset()
+            self._entries.move_to_end(key)
+            frames = entry['frames']
+            self._enforce_budget(keep=key)
+            return frames
+    
+    def release(self, key):
+        """Drop one reference; the dataset stays cached until memory pressure evicts it"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refs'] = max(0, entry['refs'] - 1)
+                if entry['frames'] is None and entry['refs'] == 0:
+                    self._drop(key)
+    
+    def resident_bytes(self):
+        with self._lock:
+            return sum(entry['nbytes'] for entry in self._entries.values() if entry['frames'] is not None)
+    
+    def stats(self):
+        """One row per registered dataset, least recently used first"""
+        with self._lock:
+            return [
+                {'key': key, 'refs': entry['refs'], 'nbytes': entry['nbytes'],
+                 'resident': entry['frames'] is not None, 'spilled': entry['spilled']}
+                for key, entry in self._entries.items()
+            ]
+    
+    def _spill_path(self, key):
+        return os.path.join(self.spill_root, key)
+    
+    def _enforce_budget(self, keep=None):
+        if self.memory_budget is None:
+            return
+        while self.resident_bytes() > self.memory_budget:
+            resident = [key for key, entry in self._entries.items()
+                        if entry['frames'] is not None and key != keep]
+            if not resident:
+                break
+            unreferenced = [key for key in resident if self._entries[key]['refs'] == 0]
+            victim = (unreferenced or resident)[0]
+            if self._entries[victim]['refs'] == 0:
+                self._drop(victim)
+            else:
+                self._spill(victim)
+    
+    def _spill(self, key):
+        entry = self._entries[key]
+        if not entry['spilled']:
+            store = DatasetStore(self._spill_path(key))
+            for data_type, df in zip(DatasetStore.DATA_TYPES, entry['frames']):
+                store.write(data_type, df)
+            entry['spilled'] = True
+        entry['frames'] = None
+    
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        if entry['spilled']:
+            shutil.rmtree(self._spill_path(key), ignore_errors=True)
@@ -0,0 +1,132 @@
+"""Synthetic influencer campaign data for demos and load tests"""
+import numpy as np
+import pandas as pd
+
+def generate_sample_data(n_influencers=50, n_posts=200, n_tracking=300_000, seed=42):
+    """
+    Generate comprehensive sample data for the dashboard with test/control groups.
+    Fully vectorized so production-scale sizes (e.g. 50k influencers, 5M posts,
+    50M tracking rows) build in seconds; dimension columns are categoricals and
+    post/tracking IDs are int64 surrogate keys to keep memory bounded.
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now().normalize()
+    
+    # Brands and products
+    brands = ['MuscleBlaze', 'HKVitals', 'Gritzo']
+    products = {
+        'MuscleBlaze': ['Whey Protein', 'Creatine', 'Mass Gainer', 'BCAA'],
+        'HKVitals': ['Multivitamin', 'Omega-3', 'Vitamin D', 'Calcium'],
+        'Gritzo': ['Kids Protein', 'Kids Multivitamin', 'Growth Formula']
+    }
+    product_names = [product for brand in brands for product in products[brand]]
+    product_brand = np.repeat(np.arange(len(brands)), [len(products[brand]) for brand in brands])
+    product_offset = np.concatenate([[0], np.cumsum([len(products[brand]) for brand in brands])[:-1]])
+    product_count = np.array([len(products[brand]) for brand in brands])
+    
+    platforms = ['Instagram', 'YouTube', 'Twitter', 'TikTok']
+    categories = ['Fitness', 'Nutrition', 'Lifestyle', 'Health', 'Sports']
+    genders = ['Male', 'Female', 'Other']
+    tiers = ['Micro', 'Macro', 'Mega']
+    
+    def categorical(codes, values):
+        return pd.Categorical.from_codes(codes, categories=values)
+    
+    # Generate influencers data
+    id_width = max(3, len(str(n_influencers)))
+    influencer_ids = ('INF_' + pd.Series(np.arange(1, n_influencers + 1)).astype(str).str.zfill(id_width)).tolist()
+    influencer_idx = np.arange(n_influencers)
+    follower_count = rng.integers(10000, 2000001, n_influencers)
+    tier_idx = np.searchsorted([100000, 500000], follower_count, side='right')
+    influencer_platform = rng.integers(0, len(platforms), n_influencers)
+    
+    influencers_df = pd.DataFrame({
+        'influencer_id': categorical(influencer_idx, influencer_ids),
+        'name': 'Influencer_' + pd.Series(influencer_idx + 1).astype(str),
+        'category': categorical(rng.integers(0, len(categories), n_influencers), categories),
+        'gender': categorical(rng.integers(0, len(genders), n_influencers), genders),
+        'follower_count': follower_count,
+        'platform': categorical(influencer_platform, platforms),
+        'tier': categorical(tier_idx, tiers)
+    })
+    
+    # Generate posts data
+    post_influencer = rng.integers(0, n_influencers, n_posts)
+    post_brand = rng.integers(0, len(brands), n_posts)
+    post_product = product_offset[post_brand] + (rng.random(n_posts) * product_count[post_brand]).astype(np.int64)
+    post_platform = influencer_platform[post_influencer]
+    
+    # Assign campaign type: ~80% Test, ~20% Control
+    post_campaign_type = (rng.random(n_posts) > 0.2).astype(np.int8)
+    post_date = today - pd.to_timedelta(rng.integers(1, 91, n_posts), unit='D')
+    
+    post_followers = follower_count[post_influencer]
+    base_reach = np.minimum(post_followers * rng.uniform(0.1, 0.3, n_posts), post_followers)
+    reach = base_reach.astype(np.int64)
+    
+    captions = [f'Check out this amazing {product} from {brands[b]}! #sponsored'
+                for product, b in zip(product_names, product_brand)]
+    
+    posts_df = pd.DataFrame({
+        'post_id': np.arange(1, n_posts + 1),
+        'influencer_id': categorical(post_influencer, influencer_ids),
+        'platform': categorical(post_platform, platforms),
+        'brand': categorical(post_brand, brands),
+        'product': categorical(post_product, product_names),
+        'campaign_type': categorical(post_campaign_type, ['Control', 'Test']),
+        'date': post_date,
+        'caption': categorical(post_product, captions),
+        'reach': reach,
+        'likes': (base_reach * rng.uniform(0.02, 0.08, n_posts)).astype(np.int64),
+        'comments': (base_reach * rng.uniform(0.005, 0.02, n_posts)).astype(np.int64),
+        'shares': (base_reach * rng.uniform(0.001, 0.01, n_posts)).astype(np.int64)
+    })
+    
+    # Generate tracking data (one row per order), with orders per post
+    # proportional to reach x conversion rate
+    conversion_rate = rng.uniform(0.001, 0.005, n_posts)
+    weights = np.maximum(reach * conversion_rate, 1.0)
+    orders_per_post = rng.multinomial(n_tracking, weights / weights.sum())
+    order_post = np.repeat(np.arange(n_posts), orders_per_post)
+    
+    campaigns = [f'{brands[b]}_{product}_campaign' for product, b in zip(product_names, product_brand)]
+    user_ids = [f'USER_{i}' for i in range(1000, 10000)]
+    
+    tracking_df = pd.DataFrame({
+        'tracking_id': np.arange(1, n_tracking + 1),
+        'source': categorical(np.zeros(n_tracking, dtype=np.int8), ['influencer']),
+        'campaign': categorical(post_product[order_post], campaigns),
+        'influencer_id': categorical(post_influencer[order_post], influencer_ids),
+        'user_id': categorical(rng.integers(0, len(user_ids), n_tracking), user_ids),
+        'brand': categorical(post_brand[order_post], brands),
+        'product': categorical(post_product[order_post], product_names),
+        'date': post_date.values[order_post] + pd.to_timedelta(rng.integers(0, 8, n_tracking), unit='D').values,
+        'orders': np.ones(n_tracking, dtype=np.int64),
+        'revenue': rng.uniform(500, 3000, n_tracking),
+        'platform': categorical(post_platform[order_post], platforms),
+        'campaign_type': categorical(post_campaign_type[order_post], ['Control', 'Test'])
+    })
+    
+    # Generate payouts data; post/order counts come from one groupby each
+    posts_count = posts_df.groupby('influencer_id', observed=False).size().to_numpy()
+    orders = tracking_df.groupby('influencer_id', observed=False).size().to_numpy()
+    
+    per_post = rng.random(n_influencers) < 0.5
+    post_rate_low = np.array([5000, 15000, 50000])[tier_idx]
+    post_rate_high = np.array([15000, 50000, 150000])[tier_idx]
+    rate = np.where(
+        per_post,
+        rng.uniform(post_rate_low, post_rate_high),
+        rng.uniform(100, 500, n_influencers)
+    )
+    
+    payouts_df = pd.DataFrame({
+        'influencer_id': categorical(influencer_idx, influencer_ids),
+        'basis': categorical(np.where(per_post, 0, 1), ['post', 'order']),
+        'rate': rate,
+        'orders': orders,
+        'total_payout': np.where(per_post, rate * posts_count, rate * orders),
+        'posts_count': posts_count
+    })
+    
+    return influencers_df, posts_df, tracking_df, payouts_df
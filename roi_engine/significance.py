@@ -0,0 +1,122 @@
+"""Bootstrap confidence intervals for incremental lift and ROAS"""
+import numpy as np
+import pandas as pd
+
+from .metrics import summarize_tracking
+
+# Cap on the resample x influencer cells drawn at once (~32 MB of int64 indices)
+BOOTSTRAP_CELLS_PER_CHUNK = 4_000_000
+
+def influencer_strata(tracking_df, stratify_by):
+    """Each influencer's most frequent value of a tracking column (e.g. brand or platform)"""
+    if stratify_by not in tracking_df.columns:
+        raise ValueError(f"Cannot stratify by '{stratify_by}': column not in tracking data")
+    counts = tracking_df.groupby(['influencer_id', stratify_by], observed=True).size()
+    dominant = counts.sort_values(ascending=False, kind='stable').reset_index().drop_duplicates('influencer_id')
+    return dominant.set_index('influencer_id')[stratify_by]
+
+def influencer_matrix(tracking_summary, payouts_df):
+    """
+    (influencers x 5) matrix of Test revenue, Control revenue, Test flag, Control
+    flag and Test spend from a summarize_tracking() frame, plus the influencer ids.
+    """
+    revenue = tracking_summary['revenue'].unstack('campaign_type', fill_value=0)
+    present = tracking_summary.assign(present=1.0)['present'].unstack('campaign_type', fill_value=0)
+    
+    def group_column(frame, campaign_type):
+        return frame[campaign_type].to_numpy(float) if campaign_type in frame.columns else np.zeros(len(frame))
+    
+    has_test = group_column(present, 'Test')
+    payout = payouts_df.groupby('influencer_id', observed=True)['total_payout'].sum()
+    spend = pd.Series(revenue.index).map(payout).astype(float).fillna(0).to_numpy() * has_test
+    
+    matrix = np.column_stack([
+        group_column(revenue, 'Test'), group_column(revenue, 'Control'),
+        has_test, group_column(present, 'Control'), spend
+    ])
+    return matrix, revenue.index
+
+def _estimates(totals):
+    """Group-size normalized lift and incremental ROAS from (..., 5) column totals"""
+    test_revenue, control_revenue, n_test, n_control, spend = np.moveaxis(totals, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        test_mean = test_revenue / n_test
+        control_mean = control_revenue / n_control
+        lift = test_mean / control_mean - 1
+        # Test revenue above what as many Control influencers would have earned
+        incremental_roas = (test_revenue - control_mean * n_test) / spend
+    return lift, incremental_roas
+
+def bootstrap_resamples(matrix, strata=None, n_resamples=2000, seed=0):
+    """
+    Column totals of n_resamples bootstrap resamples of the matrix rows, shape
+    (n_resamples, columns). Rows are drawn with replacement within each stratum
+    so stratum sizes stay fixed; a chunk of resamples is drawn as one index
+    matrix, turned into row weights with a single bincount and reduced with one
+    matrix product.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(matrix)
+    totals = np.full((n_resamples, matrix.shape[1]), np.nan)
+    if not n_rows:
+        return totals
+    
+    if strata is None:
+        strata = np.zeros(n_rows, dtype=np.int64)
+    stratum_members = [np.flatnonzero(strata == code) for code in np.unique(strata)]
+    chunk = max(1, min(n_resamples, BOOTSTRAP_CELLS_PER_CHUNK // n_rows))
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        drawn = np.concatenate(
+            [members[rng.integers(0, len(members), (size, len(members)))] for members in stratum_members], axis=1
+        )
+        drawn += (np.arange(size) * n_rows)[:, None]
+        weights = np.bincount(drawn.ravel(), minlength=size * n_rows).reshape(size, n_rows)
+        totals[start:start + size] = weights @ matrix
+    return totals
+
+def bootstrap_from_summary(tracking_summary, payouts_df, n_resamples=2000, confidence=0.95, strata=None, seed=0):
+    """
+    bootstrap_incremental_roas for a precomputed summarize_tracking() frame;
+    strata optionally maps influencer_id to a stratum (see influencer_strata).
+    """
+    matrix, influencer_ids = influencer_matrix(tracking_summary, payouts_df)
+    strata_codes = None
+    if strata is not None:
+        strata_codes, _ = pd.factorize(pd.Series(influencer_ids).map(strata).astype(object))
+    
+    point_lift, point_roas = _estimates(matrix.sum(axis=0))
+    lift, incremental_roas = _estimates(bootstrap_resamples(matrix, strata_codes, n_resamples, seed))
+    
+    tail = (1 - confidence) / 2 * 100
+    rows = {}
+    for name, estimate, samples in (('lift', point_lift, lift), ('incremental_roas', point_roas, incremental_roas)):
+        samples = samples[np.isfinite(samples)]
+        if len(samples):
+            low, high = np.percentile(samples, [tail, 100 - tail])
+            std_error = samples.std(ddof=1) if len(samples) > 1 else np.nan
+        else:
+            low = high = std_error = np.nan
+        rows[name] = {
+            'estimate': float(estimate),
+            'low': float(low),
+            'high': float(high),
+            'std_error': float(std_error),
+            'significant': bool(low > 0 or high < 0)
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+def bootstrap_incremental_roas(tracking_df, payouts_df, n_resamples=2000, confidence=0.95,
+                               stratify_by=None, seed=0):
+    """
+    Percentile bootstrap confidence intervals for lift and incremental ROAS.
+    Influencers are resampled with replacement, within their dominant brand or
+    platform when stratify_by names that tracking column. Both metrics compare
+    per-influencer means, so Test and Control groups of different sizes are
+    comparable. Tracking rows are aggregated once per influencer, so resampling
+    cost grows with the number of influencers rather than rows.
+    Returns a frame indexed by metric with estimate, low, high, std_error and
+    significant (the interval excludes zero).
+    """
+    strata = influencer_strata(tracking_df, stratify_by) if stratify_by else None
+    return bootstrap_from_summary(summarize_tracking(tracking_df), payouts_df, n_resamples, confidence, strata, seed)
@@ -0,0 +1,265 @@
+"""Columnar on-disk dataset store backed by memory-mapped Arrow IPC files"""
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from .ingestion import DIMENSION_COLUMNS, share_dimensions
+
+DEFAULT_STORE_ROOT = os.environ.get('ROI_DATA_DIR', '.roi_data')
+
+# Private stores of uploads that do not form a complete dataset yet, one per session
+SESSIONS_DIR = '.sessions'
+
+def _remove(path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+def storable_schema(schema):
+    """
+    Schema used on disk: dictionaries are stored decoded, since an IPC file cannot
+    change its dictionary between batches, and all-null columns become strings
+    so that later chunks with values still fit.
+    """
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+def widened_schema(schema, table_schema):
+    """
+    schema with each integer column widened to table_schema's type when that is
+    wider, e.g. once a chunk's counts overflow int32 and are cleaned as int64
+    """
+    fields = []
+    for field in schema:
+        index = table_schema.get_field_index(field.name)
+        other = table_schema.field(index).type if index >= 0 else None
+        if (other is not None and pa.types.is_integer(field.type) and pa.types.is_integer(other)
+                and other.bit_width > field.type.bit_width):
+            field = field.with_type(other)
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+def conform_table(table, schema):
+    """Reorder, fill and cast the columns of table to match schema"""
+    columns = [
+        table.column(field.name) if field.name in table.column_names else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, names=schema.names).cast(schema)
+
+class ArrowFileSink:
+    """
+    Writes cleaned chunks to staged Arrow IPC files and publishes them to the
+    store on finish. A chunk whose integer column needs a wider type than the
+    current file's starts a new part with the widened schema, since a file
+    cannot change its schema; the parts are promoted when read back.
+    """
+
+    def __init__(self, store, data_type):
+        self.store = store
+        self.data_type = data_type
+        self.staging = store.root / f'.staging-{data_type}-{uuid.uuid4().hex}'
+        self.staging.mkdir(parents=True)
+        self.schema = None
+        self._writer = None
+        self._parts = 0
+
+    def _open(self, schema):
+        if self._writer is not None:
+            self._writer.close()
+        self.schema = schema
+        self._writer = pa.ipc.new_file(str(self.staging / f'part-{self._parts:05d}.arrow'), schema)
+        self._parts += 1
+
+    def append(self, chunk):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._open(storable_schema(table.schema))
+        else:
+            schema = widened_schema(self.schema, table.schema)
+            if not schema.equals(self.schema):
+                self._open(schema)
+        self._writer.write_table(conform_table(table, self.schema))
+
+    def close(self):
+        """Finish writing without publishing; returns the staging directory, or None if nothing was written"""
+        if self._writer is None:
+            self.abort()
+            return None
+        self._writer.close()
+        return self.staging
+
+    def finish(self):
+        if self.close() is None:
+            return pd.DataFrame()
+        self.store.publish(self.data_type, self.staging)
+        return self.store.load(self.data_type)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+class DatasetStore:
+    """
+    Persists cleaned frames as uncompressed Arrow IPC files under root/<data_type>/.
+    Reads are memory-mapped, so sessions reading the same dataset share the OS
+    page cache (numeric columns are handed to pandas without a copy) and only
+    the requested columns are ever paged in.
+    """
+
+    DATA_TYPES = ['influencers', 'posts', 'tracking_data', 'payouts']
+
+    def __init__(self, root=DEFAULT_STORE_ROOT):
+        self.root = Path(root)
+        # Serializes apply() calls on this instance; hold it to order a check before an update
+        self.lock = threading.RLock()
+
+    def session(self, key):
+        """Private store under root for uploads staged by one session until its dataset is complete"""
+        return DatasetStore(self.root / SESSIONS_DIR / key)
+
+    def prune_sessions(self, max_age_seconds=86400):
+        """Remove session stores and interrupted staging files left untouched for max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        for path in [*(self.root / SESSIONS_DIR).glob('*'), *self.root.glob('.staging-*')]:
+            if path.stat().st_mtime < cutoff:
+                _remove(path)
+
+    def parts(self, data_type):
+        return sorted((self.root / data_type).glob('part-*.arrow'))
+
+    def has_dataset(self):
+        """True when every data type has been stored"""
+        return all(self.parts(data_type) for data_type in self.DATA_TYPES)
+
+    def version(self):
+        """Changes whenever any stored file is replaced; use it as a cache key"""
+        return tuple(
+            (path.parent.name, path.name, path.stat().st_mtime_ns, path.stat().st_size)
+            for data_type in self.DATA_TYPES for path in self.parts(data_type)
+        )
+
+    def writer(self, data_type):
+        """Sink for DataIngestionManager.ingest_csv that replaces the stored data_type"""
+        return ArrowFileSink(self, data_type)
+
+    def write(self, data_type, df):
+        sink = self.writer(data_type)
+        sink.append(df)
+        return sink.finish()
+
+    def append(self, data_type, df):
+        """Store df as an extra part of data_type without rewriting the existing parts"""
+        self.apply(append={data_type: df})
+
+    def apply(self, replace=None, append=None, staged=None):
+        """
+        Update the stored dataset in one step: replace maps data types to frames
+        replacing them, append maps data types to frames stored as an extra part,
+        and every data type written to staged (e.g. a session() store of streamed
+        uploads) is moved over whole. All files are written before any is swapped
+        in, so a failed write leaves the store as it was. staged is removed after.
+        """
+        replace = dict(replace or {})
+        created = []
+        with self.lock:
+            try:
+                directories = {}
+                if staged is not None:
+                    directories.update(
+                        (data_type, staged.root / data_type) for data_type in self.DATA_TYPES if staged.parts(data_type)
+                    )
+                parts = {}
+                for data_type, df in (append or {}).items():
+                    if self.parts(data_type):
+                        parts[data_type] = self._stage_part(data_type, df)
+                        created.append(parts[data_type])
+                    else:
+                        replace[data_type] = df
+                for data_type, df in replace.items():
+                    directories[data_type] = self._stage_directory(data_type, df)
+                    created.append(directories[data_type])
+            except BaseException:
+                for path in created:
+                    _remove(path)
+                raise
+
+            for data_type, path in directories.items():
+                self.publish(data_type, path)
+            for data_type, path in parts.items():
+                next_part = int(self.parts(data_type)[-1].stem.split('-')[1]) + 1
+                path.rename(self.root / data_type / f'part-{next_part:05d}.arrow')
+        if staged is not None:
+            shutil.rmtree(staged.root, ignore_errors=True)
+
+    def _stage_directory(self, data_type, df):
+        sink = self.writer(data_type)
+        try:
+            sink.append(df)
+            return sink.close()
+        except BaseException:
+            sink.abort()
+            raise
+
+    def _stage_part(self, data_type, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        stored = pa.ipc.open_file(pa.memory_map(str(self.parts(data_type)[-1]), 'r')).schema
+        schema = widened_schema(stored, table.schema)
+        table = conform_table(table, schema)
+        staging = self.root / f'.staging-{data_type}-{uuid.uuid4().hex}.arrow'
+        with pa.ipc.new_file(str(staging), schema) as writer:
+            writer.write_table(table)
+        return staging
+
+    def publish(self, data_type, staging):
+        """Swap a fully written staging directory in as the stored data_type"""
+        target = self.root / data_type
+        retired = self.root / f'.retired-{data_type}-{uuid.uuid4().hex}'
+        if target.exists():
+            target.rename(retired)
+        staging.rename(target)
+        # Open memory maps keep the retired files readable until they are released
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def read_table(self, data_type, columns=None):
+        """Memory-mapped Arrow table of the stored data_type, pruned to columns"""
+        tables = []
+        for path in self.parts(data_type):
+            table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+            if columns is not None:
+                table = table.select([col for col in columns if col in table.column_names])
+            tables.append(table)
+        if not tables:
+            raise FileNotFoundError(f"No stored data for {data_type} under {self.root}")
+        # Parts written after a column was widened to int64 promote the earlier ones
+        return pa.concat_tables(tables, promote_options='permissive') if len(tables) > 1 else tables[0]
+
+    def load(self, data_type, columns=None):
+        table = self.read_table(data_type, columns)
+        # Dimensions, plus any column that was categorical when it was written
+        written_categorical = [
+            col['name'] for col in (table.schema.pandas_metadata or {}).get('columns', [])
+            if col.get('pandas_type') == 'categorical'
+        ]
+        categories = [col for col in table.column_names if col in DIMENSION_COLUMNS or col in written_categorical]
+        return table.to_pandas(split_blocks=True, categories=categories)
+
+    def load_dataset(self, columns=None):
+        """Load all four frames; columns maps data_type to the columns to read (None reads all)"""
+        columns = columns or {}
+        frames = [self.load(data_type, columns.get(data_type)) for data_type in self.DATA_TYPES]
+        return tuple(share_dimensions(frames))
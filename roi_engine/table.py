@@ -0,0 +1,153 @@
+"""Server-side search, sort, pagination and chunked export of the post-level table"""
+import copy
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Influencer attributes joined onto each visible post row
+INFLUENCER_COLUMNS = ['name', 'tier', 'follower_count', 'category']
+
+TABLE_COLUMNS = [
+    'name', 'tier', 'brand', 'product', 'platform', 'date',
+    'reach', 'revenue', 'orders', 'total_payout', 'roas'
+]
+
+# Columns matched by the free-text search
+SEARCH_COLUMNS = ['name', 'influencer_id', 'brand', 'product', 'platform', 'campaign_type']
+
+EXPORT_CHUNK_ROWS = 100_000
+
+class CampaignTable:
+    """
+    Post-level table over a selection of performance rows. Search, sort and
+    paging work on integer positions and per-column keys, so only the rows
+    of the requested page (or export chunk) are ever joined with the
+    influencer attributes and materialized.
+    """
+    
+    def __init__(self, performance_df, influencers_df, positions=None, columns=TABLE_COLUMNS):
+        self.frame = performance_df
+        self.positions = np.arange(len(performance_df)) if positions is None else np.asarray(positions)
+        self.columns = columns
+        self.influencers = (
+            influencers_df.drop_duplicates('influencer_id')
+            .set_index('influencer_id')[[col for col in INFLUENCER_COLUMNS if col in influencers_df.columns]]
+        )
+        self._influencer_codes = None
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    def _influencer_rows(self, positions):
+        """Row of self.influencers for each performance row (-1 when unknown)"""
+        if self._influencer_codes is None:
+            self._influencer_codes = self.influencers.index.get_indexer(self.frame['influencer_id'])
+        return self._influencer_codes[positions]
+    
+    def _column(self, column, positions):
+        """Values (an array) of a table column for the given performance rows"""
+        if column in self.frame.columns:
+            return self.frame[column].array.take(positions)
+        return pd.api.extensions.take(self.influencers[column].array, self._influencer_rows(positions), allow_fill=True)
+    
+    def _with_positions(self, positions):
+        table = copy.copy(self)
+        table.positions = positions
+        return table
+    
+    def _sort_key(self, column, positions):
+        """Float sort key per row: numeric values, day stamps, or the rank of a text label"""
+        values = pd.Series(self._column(column, positions))
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            codes, _ = pd.factorize(values.astype(object), sort=True)
+            return np.where(codes >= 0, codes, np.nan)
+        if pd.api.types.is_datetime64_any_dtype(values):
+            stamps = values.to_numpy('datetime64[ns]')
+            return np.where(np.isnat(stamps), np.nan, stamps.astype(np.int64).astype(float))
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    
+    def search(self, text):
+        """A table over the rows where any search column contains text (case-insensitive)"""
+        text = (text or '').strip()
+        if not text:
+            return self
+        mask = np.zeros(len(self.positions), dtype=bool)
+        for column in SEARCH_COLUMNS:
+            if column not in self.frame.columns and column not in self.influencers.columns:
+                continue
+            values = self._column(column, self.positions)
+            # Match each distinct label once and broadcast through the codes
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.codes, values.categories
+            else:
+                codes, uniques = pd.factorize(values)
+            hits = pd.Index(uniques).astype(str).str.contains(text, case=False, regex=False)
+            mask |= np.append(np.asarray(hits, dtype=bool), False)[codes]
+        return self._with_positions(self.positions[mask])
+    
+    def sort(self, column=None, ascending=True, limit=None):
+        """
+        A table ordered by column (ties keep the current order). With limit,
+        only the first limit rows are ordered exactly: a partition finds the
+        limit-th key and only rows up to it (ties included) are sorted, so the
+        result is always a prefix of the full sort.
+        """
+        if column is None or not len(self.positions):
+            return self
+        key = self._sort_key(column, self.positions)
+        if not ascending:
+            key = -key
+        candidates = np.arange(len(key))
+        if limit is not None and 0 < limit < len(key) // 8:
+            boundary = np.partition(key, limit - 1)[limit - 1]
+            # Rows tied with the boundary key all stay in, so the position tie-break matches the full sort
+            if not np.isnan(boundary):
+                candidates = np.flatnonzero(key <= boundary)
+        order = candidates[np.lexsort((candidates, key[candidates]))]
+        if limit is not None:
+            order = order[:limit]
+        return self._with_positions(self.positions[order])
+    
+    def materialize(self, positions=None):
+        """DataFrame of the table columns for the given performance rows"""
+        positions = self.positions if positions is None else positions
+        return pd.DataFrame({column: self._column(column, positions) for column in self.columns})
+    
+    def page_count(self, page_size):
+        return max(1, -(-len(self.positions) // page_size))
+    
+    def page(self, page, page_size=50):
+        """The page-th (0-based) page of rows as a DataFrame"""
+        start = page * page_size
+        return self.materialize(self.positions[start:start + page_size])
+    
+    def iter_chunks(self, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Yield the full table as consecutive DataFrames of at most chunk_rows rows"""
+        for start in range(0, len(self.positions), chunk_rows):
+            yield self.materialize(self.positions[start:start + chunk_rows])
+    
+    def write_csv(self, buffer, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Write the full table as UTF-8 CSV to a binary buffer, one chunk at a time"""
+        header = True
+        for chunk in self.iter_chunks(chunk_rows):
+            buffer.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+            header = False
+        if header:
+            buffer.write(','.join(self.columns).encode('utf-8') + b'\n')
+    
+    def write_parquet(self, buffer, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Write the full table as Parquet to a binary buffer, one row group per chunk"""
+        writer = None
+        try:
+            for chunk in self.iter_chunks(chunk_rows):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(buffer, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            if writer is None:
+                pq.write_table(pa.Table.from_pandas(self.materialize(), preserve_index=False), buffer)
+        finally:
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,223 @@
+"""Daily and weekly ROAS, rolling windows and post-to-order lag distributions"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .attribution import ATTRIBUTION_WINDOW_DAYS, attribute_tracking_to_posts, attribution_keys
+from .filters import day_numbers
+
+ROLLING_WINDOWS = [7, 28]
+SERIES_MEASURES = ['revenue', 'total_payout', 'orders']
+LAG_DIMENSIONS = ['brand', 'platform', 'tier']
+LAG_MEASURES = ['orders', 'revenue', 'conversions']
+
+_NAT_DAY = np.iinfo(np.int64).min
+
+def _roas(revenue, spend):
+    return np.where(spend > 0, revenue / np.where(spend > 0, spend, 1), 0.0)
+
+def _columns(by):
+    """A column name or list of them as a list"""
+    return [by] if isinstance(by, str) else list(by or [])
+
+def _dates(days):
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+# --- Calendar series
+def daily_matrix(frame, by=None, measures=SERIES_MEASURES, date_column='day'):
+    """
+    Dense calendar of frame: {measure: array[n_groups, n_days]} of daily sums
+    per group of by (a column or list of columns), zero on days without rows,
+    with the first day number and a frame of group labels (one unlabelled
+    group when by is empty).
+    """
+    by = _columns(by)
+    days = day_numbers(frame[date_column])
+    if by:
+        grouped = frame.groupby(by, observed=True, sort=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(np.int64)
+        labels = grouped.size().index.to_frame(index=False)
+    else:
+        codes = np.zeros(len(frame), dtype=np.int64)
+        labels = pd.DataFrame(index=range(1))
+    keep = (codes >= 0) & (days != _NAT_DAY)
+    codes, days = codes[keep], days[keep]
+    
+    first = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - first + 1 if len(days) else 0
+    cells = codes * n_days + (days - first)
+    sums = {
+        name: np.bincount(
+            cells, weights=frame[name].to_numpy(float)[keep], minlength=len(labels) * n_days
+        ).reshape(len(labels), n_days)
+        for name in measures
+    }
+    return sums, first, labels
+
+def rolling_sums(matrix, window):
+    """Trailing window-day sums along the day axis (partial windows at the start)"""
+    totals = np.cumsum(matrix, axis=1)
+    rolled = totals.copy()
+    rolled[:, window:] -= totals[:, :-window]
+    return rolled
+
+def _long_frame(columns, first, labels, step=1):
+    """One row per (group, period) from {name: array[n_groups, n_periods]}"""
+    n_groups, n_periods = next(iter(columns.values())).shape
+    frame = labels.take(np.repeat(np.arange(n_groups), n_periods)).reset_index(drop=True)
+    frame.insert(0, 'date', _dates(first + np.tile(np.arange(n_periods) * step, n_groups)))
+    for name, values in columns.items():
+        frame[name] = values.ravel()
+    return frame
+
+def daily_roas(frame, by=None, windows=ROLLING_WINDOWS, date_column='day'):
+    """
+    Revenue, spend (total_payout), orders and ROAS per group on every calendar
+    day of frame (e.g. cube cells), plus trailing sums and ROAS over each
+    window: revenue_7d, total_payout_7d, roas_7d and so on.
+    """
+    sums, first, labels = daily_matrix(frame, by, SERIES_MEASURES, date_column)
+    columns = dict(sums, roas=_roas(sums['revenue'], sums['total_payout']))
+    for window in windows:
+        revenue = rolling_sums(sums['revenue'], window)
+        spend = rolling_sums(sums['total_payout'], window)
+        columns[f'revenue_{window}d'] = revenue
+        columns[f'total_payout_{window}d'] = spend
+        columns[f'roas_{window}d'] = _roas(revenue, spend)
+    return _long_frame(columns, first, labels)
+
+def weekly_roas(frame, by=None, date_column='day'):
+    """Revenue, spend, orders and ROAS per group in Monday-aligned calendar weeks"""
+    sums, first, labels = daily_matrix(frame, by, SERIES_MEASURES, date_column)
+    n_days = next(iter(sums.values())).shape[1]
+    # 1970-01-01 was a Thursday; pad back to the Monday before the first day
+    lead = (first + 3) % 7
+    n_weeks = -(-(lead + n_days) // 7)
+    weekly = {
+        name: np.pad(values, ((0, 0), (lead, n_weeks * 7 - lead - n_days))).reshape(len(labels), n_weeks, 7).sum(axis=2)
+        for name, values in sums.items()
+    }
+    weekly['roas'] = _roas(weekly['revenue'], weekly['total_payout'])
+    return _long_frame(weekly, first - lead, labels, step=7)
+
+# --- Post-to-order lags
+def post_dimensions(posts_df, influencers_df=None):
+    """The LAG_DIMENSIONS of each post, with tier looked up from influencers_df"""
+    columns = {dim: posts_df[dim] for dim in LAG_DIMENSIONS if dim in posts_df.columns}
+    if 'tier' not in columns and influencers_df is not None:
+        tiers = influencers_df.drop_duplicates('influencer_id').set_index('influencer_id')['tier']
+        # Positional lookup: Series.map mislabels categorical-to-categorical maps in pandas 2.0
+        creator = tiers.index.get_indexer(posts_df['influencer_id'])
+        columns['tier'] = pd.api.extensions.take(tiers.array, creator, allow_fill=True)
+    return pd.DataFrame(columns).reset_index(drop=True)
+
+def order_lag_rows(posts_df, tracking_df, dimensions=None, window_days=ATTRIBUTION_WINDOW_DAYS):
+    """
+    Attribute tracking rows to posts and sum the attributed ones by order
+    date, post date, lag (days from post to order) and the post's dimensions
+    (a frame aligned with posts_df, see post_dimensions): orders, revenue
+    and conversions (tracking rows).
+    """
+    if dimensions is None:
+        dimensions = post_dimensions(posts_df)
+    post_position = attribute_tracking_to_posts(posts_df, tracking_df, window_days)
+    matched = np.flatnonzero(post_position >= 0)
+    posts = post_position[matched]
+    order_day = day_numbers(tracking_df['date'])[matched]
+    post_day = day_numbers(posts_df['date'])[posts]
+    
+    rows = pd.DataFrame({
+        'date': _dates(order_day),
+        'post_date': _dates(post_day),
+        'lag': order_day - post_day,
+        **{dim: dimensions[dim].take(posts).to_numpy() for dim in dimensions.columns},
+        'orders': tracking_df['orders'].to_numpy()[matched],
+        'revenue': tracking_df['revenue'].to_numpy(float)[matched],
+        'conversions': 1
+    })
+    for dim in dimensions.columns:
+        # take().to_numpy() drops the categorical dtype; restore it so filters compare codes
+        if isinstance(dimensions[dim].dtype, pd.CategoricalDtype):
+            rows[dim] = pd.Categorical(rows[dim], dtype=dimensions[dim].dtype)
+    keys = ['date', 'post_date', 'lag'] + list(dimensions.columns)
+    return rows.groupby(keys, observed=True, sort=False)[LAG_MEASURES].sum().reset_index()
+
+def day_digests(frame, date_column, columns):
+    """
+    Order-insensitive digest of each calendar day's rows (wrapping sum and
+    count of their row hashes over columns). Returns (days, digests, order,
+    bounds): the rows on days[i] are frame positions order[bounds[i]:bounds[i + 1]].
+    """
+    days = day_numbers(frame[date_column])
+    order = np.argsort(days, kind='stable')
+    days = days[order]
+    bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1], True]) if len(days) else np.zeros(1, np.int64)
+    hashes = pd.util.hash_pandas_object(frame[columns], index=False).to_numpy()[order]
+    sums = np.add.reduceat(hashes, bounds[:-1]) if len(days) else hashes
+    return days[bounds[:-1]], list(zip(sums.tolist(), np.diff(bounds).tolist())), order, bounds
+
+class OrderLagPartitions:
+    """
+    order_lag_rows for one posts table, kept per order day. An order is only
+    attributed to earlier posts, so with the posts fixed each day's result
+    depends on that day's tracking rows alone: update() attributes just the
+    days whose rows are new or changed (e.g. after appending a daily export)
+    and keeps the rest. frame holds the latest result sorted by order date;
+    it is shared, so use the frame update() returns for a given tracking_df.
+    """
+    
+    def __init__(self, posts_df, influencers_df=None, window_days=ATTRIBUTION_WINDOW_DAYS):
+        self.posts_df = posts_df
+        self.dimensions = post_dimensions(posts_df, influencers_df)
+        self.window_days = window_days
+        self.frame = order_lag_rows(posts_df, posts_df.iloc[:0].assign(orders=0, revenue=0.0), self.dimensions)
+        self.days_updated = 0
+        self._digests = {}
+        self._lock = threading.Lock()
+    
+    def update(self, tracking_df):
+        """
+        Bring frame in line with tracking_df, re-attributing changed days only.
+        Returns that frame, read under the lock so a concurrent update() for
+        another tracking frame cannot swap it first.
+        """
+        columns = ['date', 'orders', 'revenue'] + attribution_keys(self.posts_df, tracking_df)
+        days, digests, order, bounds = day_digests(tracking_df, 'date', columns)
+        with self._lock:
+            changed = [i for i, day in enumerate(days.tolist()) if self._digests.get(day) != digests[i]]
+            removed = set(self._digests) - set(days.tolist())
+            self.days_updated = len(changed)
+            if not changed and not removed:
+                return self.frame
+            
+            stale = _dates(list(removed) + days[changed].tolist())
+            kept = self.frame[~self.frame['date'].isin(stale)]
+            parts = [kept]
+            if changed:
+                rows = np.concatenate([order[bounds[i]:bounds[i + 1]] for i in changed])
+                parts.append(order_lag_rows(self.posts_df, tracking_df.take(rows), self.dimensions, self.window_days))
+            self.frame = pd.concat(parts, ignore_index=True).sort_values('date', kind='stable', ignore_index=True)
+            self._digests = dict(zip(days.tolist(), digests))
+            return self.frame
+
+def lag_distribution(lags, by=None, measure='orders'):
+    """
+    Share of each group's attributed orders (or another LAG_MEASURES column)
+    by days from post to order: one row per group, one column per lag.
+    """
+    by = _columns(by)
+    totals = lags.groupby(by + ['lag'], observed=True)[measure].sum()
+    table = totals.unstack('lag', fill_value=0) if by else totals.to_frame().T
+    return table.div(table.sum(axis=1).replace(0, np.nan), axis=0).fillna(0)
+
+def cohort_decay(lags, period_days=7, measure='orders'):
+    """
+    lag_distribution per post cohort: posts published in the same
+    period_days block (Monday-aligned when a multiple of 7), indexed by the
+    cohort's first day. Shows how fast each cohort's orders tail off.
+    """
+    days = day_numbers(lags['post_date'])
+    anchor = 4 if period_days % 7 == 0 else 0
+    cohort = days - (days + anchor - 1) % period_days if anchor else days - days % period_days
+    return lag_distribution(lags.assign(cohort=_dates(cohort)), ['cohort'], measure)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from roi_engine import generate_sample_data, share_dimensions
+
+@pytest.fixture(scope='session')
+def dataset():
+    """A small sample dataset: (influencers_df, posts_df, tracking_df, payouts_df)"""
+    return generate_sample_data(n_influencers=40, n_posts=300, n_tracking=20_000, seed=7)
+
+@pytest.fixture
+def labelled_dataset():
+    """
+    Three influencers with one post and one tracking row each, every one in its
+    own tier and category, as categoricals the way ingestion encodes them.
+    Revenue (1000/2000/4000) identifies the influencer behind any rollup.
+    """
+    ids = ['INF_001', 'INF_002', 'INF_003']
+    influencers_df = pd.DataFrame({
+        'influencer_id': ids, 'name': ['John Doe', 'Jane Smith', 'Sam Lee'],
+        'category': ['Fitness', 'Nutrition', 'Wellness'], 'gender': ['Male', 'Female', 'Male'],
+        'follower_count': [50_000, 900_000, 300_000], 'platform': ['Instagram', 'YouTube', 'Instagram'],
+        'tier': ['Micro', 'Mega', 'Macro']
+    })
+    posts_df = pd.DataFrame({
+        'post_id': [1, 2, 3], 'influencer_id': ids, 'platform': ['Instagram', 'YouTube', 'Instagram'],
+        'date': pd.to_datetime(['2025-07-01'] * 3), 'reach': [10_000, 25_000, 15_000],
+        'likes': [500, 1250, 700], 'comments': [50, 125, 70], 'shares': [5, 12, 7],
+        'brand': ['MuscleBlaze'] * 3, 'product': ['Whey Protein'] * 3, 'campaign_type': ['Test'] * 3
+    })
+    tracking_df = pd.DataFrame({
+        'tracking_id': [1, 2, 3], 'influencer_id': ids, 'brand': ['MuscleBlaze'] * 3,
+        'product': ['Whey Protein'] * 3, 'date': pd.to_datetime(['2025-07-02'] * 3), 'orders': [1, 2, 4],
+        'revenue': [1000.0, 2000.0, 4000.0], 'campaign_type': ['Test'] * 3
+    })
+    payouts_df = pd.DataFrame({
+        'influencer_id': ids, 'basis': ['post'] * 3, 'rate': [100.0, 200.0, 400.0],
+        'total_payout': [1000.0, 400.0, 200.0]
+    })
+    return tuple(share_dimensions([influencers_df, posts_df, tracking_df, payouts_df]))
@@ -0,0 +1,63 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from roi_engine import ingest_bundle
+
+def raw(df):
+    """df as it arrives in an export: plain strings instead of categoricals and timestamps"""
+    raw = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return raw.assign(**{col: raw[col].dt.strftime('%Y-%m-%d') for col in raw.columns if col == 'date'})
+
+def workbook(sheets):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+@pytest.fixture
+def bundle(tmp_path, dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = (raw(df) for df in dataset)
+    path = tmp_path / 'exports.zip'
+    half = len(posts_df) // 2
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('creators.csv', influencers_df.to_csv(index=False))
+        # Monthly post exports in a folder, routed to one data type by their columns
+        archive.writestr('posts/2025-06.csv', posts_df.iloc[:half].to_csv(index=False))
+        archive.writestr('posts/2025-07.csv', posts_df.iloc[half:].to_csv(index=False))
+        archive.writestr('finance.xlsx', workbook({
+            'Orders': tracking_df.iloc[:500], 'Contracts': payouts_df, 'Notes': pd.DataFrame({'note': ['hello']})
+        }))
+        archive.writestr('readme.csv', 'text\nnot a dataset\n')
+        archive.writestr('__MACOSX/._creators.csv', 'junk')
+        archive.writestr('.hidden.csv', 'junk')
+    return path
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_members_are_routed_by_their_columns(bundle, dataset, workers):
+    frames, reports, parts = ingest_bundle(str(bundle), workers=workers)
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    
+    assert set(frames) == {'influencers', 'posts', 'tracking_data', 'payouts'}
+    assert len(frames['influencers']) == len(influencers_df)
+    assert len(frames['posts']) == len(posts_df)
+    assert len(frames['tracking_data']) == 500
+    assert frames['payouts']['total_payout'].sum() == pytest.approx(payouts_df['total_payout'].sum())
+    assert all(report.rows_kept == report.rows_read for report in reports.values())
+    
+    routed = parts.set_index(['file', 'sheet'], drop=False)
+    assert routed.loc[('exports.zip/posts/2025-07.csv', None), 'first_row'] == len(posts_df) // 2
+    assert routed.loc[('exports.zip/finance.xlsx', 'Orders'), 'data_type'] == 'tracking_data'
+    assert routed.loc[('exports.zip/finance.xlsx', 'Notes'), 'note'] == 'no matching schema'
+    assert routed.loc[('exports.zip/readme.csv', None), 'note'] == 'no matching schema'
+    assert not parts['file'].str.contains('MACOSX|hidden').any()
+
+def test_bundle_without_known_data_is_rejected(tmp_path):
+    path = tmp_path / 'notes.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('readme.csv', 'text\nnot a dataset\n')
+    with pytest.raises(ValueError):
+        ingest_bundle(str(path))
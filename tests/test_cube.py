@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from roi_engine import MetricsCube, calculate_roas_metrics, rollup_roas
+
+@pytest.fixture
+def cube(labelled_dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = labelled_dataset
+    return MetricsCube.from_performance(calculate_roas_metrics(posts_df, tracking_df, payouts_df), influencers_df)
+
+def revenue_by(frame, column):
+    return {str(label): revenue for label, revenue in frame.groupby(column, observed=True)['revenue'].sum().items()}
+
+def test_creator_dimensions_follow_their_influencer(cube):
+    # INF_001 (Micro, Fitness, Male) earned 1000, INF_002 (Mega, Nutrition, Female) 2000, INF_003 (Macro) 4000
+    assert revenue_by(cube.frame, 'tier') == {'Micro': 1000.0, 'Mega': 2000.0, 'Macro': 4000.0}
+    assert revenue_by(cube.frame, 'category') == {'Fitness': 1000.0, 'Nutrition': 2000.0, 'Wellness': 4000.0}
+    assert revenue_by(cube.frame, 'gender') == {'Male': 5000.0, 'Female': 2000.0}
+
+def test_tier_slice_and_rollup(cube):
+    assert cube.totals(cube.slice(tier='Micro'))['revenue'] == 1000.0
+    tier_roas = rollup_roas(cube.frame, 'tier').set_index('tier')['roas']
+    np.testing.assert_allclose([tier_roas['Micro'], tier_roas['Mega'], tier_roas['Macro']], [1.0, 5.0, 20.0])
+
+def test_totals_match_performance(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    cube = MetricsCube.from_performance(performance_df, influencers_df)
+    totals = cube.totals(cube.frame)
+    np.testing.assert_allclose(totals[['revenue', 'orders', 'total_payout']],
+                               performance_df[['revenue', 'orders', 'total_payout']].sum())
+    assert totals['posts'] == len(performance_df)
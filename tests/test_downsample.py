@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roi_engine import binned_density, lttb, time_buckets
+from roi_engine.charts import revenue_trend_figure, scatter_figure
+from roi_engine.downsample import bucket_width
+
+@pytest.mark.parametrize('span, budget, width', [(30, 2000, 1), (3000, 2000, 7), (3000, 200, 28), (40_000, 500, 84)])
+def test_bucket_width_fits_the_budget(span, budget, width):
+    assert bucket_width(span, budget) == width
+    assert -(-span // width) <= budget
+
+def test_time_buckets_keep_totals_and_align_weeks():
+    dates = pd.Series(pd.date_range('2024-01-03', periods=400, freq='D')).repeat(3)
+    values = np.arange(len(dates), dtype=float)
+    buckets = time_buckets(dates, {'revenue': values}, budget=100)
+    assert len(buckets) <= 100
+    assert buckets['revenue'].sum() == pytest.approx(values.sum())
+    assert (buckets['date'].dt.dayofweek == 0).all()
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    kept = lttb(x, y, budget=200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert 4321 in kept
+    assert (np.diff(kept) > 0).all()
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], budget=200), np.arange(50))
+
+def test_binned_density_counts_every_point():
+    rng = np.random.default_rng(0)
+    x, y = rng.lognormal(size=5000), rng.normal(size=5000)
+    x_centers, y_centers, counts = binned_density(x, y, budget=400, log_x=True)
+    assert counts.shape == (len(y_centers), len(x_centers)) and counts.size <= 400
+    assert counts.sum() == len(x)
+
+def test_figures_stay_within_the_point_budget():
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({'reach': rng.lognormal(10, size=5000), 'roas': rng.lognormal(size=5000)})
+    assert scatter_figure(frame.iloc[:100], 'reach', 'roas', 'Reach vs ROAS', budget=500).data[0].type == 'scatter'
+    binned = scatter_figure(frame, 'reach', 'roas', 'Reach vs ROAS', budget=500, log_x=True)
+    assert binned.data[0].type == 'heatmap'
+    
+    cells = pd.DataFrame({'day': pd.date_range('2020-01-01', periods=3000, freq='D'),
+                          'revenue': rng.random(3000), 'total_payout': rng.random(3000)})
+    figure = revenue_trend_figure(cells, budget=300)
+    assert all(len(trace.x) <= 300 for trace in figure.data)
+    assert sum(figure.data[0].y) == pytest.approx(cells['revenue'].sum())
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from roi_engine import FrameFilter, calculate_roas_metrics
+
+@pytest.fixture(scope='module')
+def performance_df(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    return calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+
+def date_mask(frame, start, end):
+    """The dashboard's original filter: compare .dt.date against the selected range"""
+    return (frame['date'].dt.date >= start) & (frame['date'].dt.date <= end)
+
+@pytest.mark.parametrize('start_offset, end_offset', [(0, 0), (0, 30), (10, 45), (60, 200)])
+def test_date_range_matches_dt_date(performance_df, start_offset, end_offset):
+    first = performance_df['date'].min().date()
+    start = first + np.timedelta64(start_offset, 'D').item()
+    end = first + np.timedelta64(end_offset, 'D').item()
+    
+    positions = FrameFilter(performance_df).positions(start, end)
+    expected = np.flatnonzero(date_mask(performance_df, start, end).to_numpy())
+    np.testing.assert_array_equal(np.sort(positions), expected)
+
+def test_dimension_filters_match_masks(dataset, performance_df):
+    influencers_df = dataset[0]
+    start, end = performance_df['date'].quantile([0.2, 0.8]).dt.date
+    brand = performance_df['brand'].iloc[0]
+    platform = performance_df['platform'].iloc[0]
+    tier_influencers = influencers_df.loc[influencers_df['tier'] == influencers_df['tier'].iloc[0], 'influencer_id']
+    
+    positions = FrameFilter(performance_df).positions(
+        start, end, brand=brand, platform=platform, influencer_id=tier_influencers
+    )
+    mask = (date_mask(performance_df, start, end) & (performance_df['brand'] == brand)
+            & (performance_df['platform'] == platform) & performance_df['influencer_id'].isin(tier_influencers))
+    np.testing.assert_array_equal(np.sort(positions), np.flatnonzero(mask.to_numpy()))
+
+def test_unfiltered_and_unknown_values(performance_df):
+    frame_filter = FrameFilter(performance_df)
+    assert len(frame_filter.positions()) == len(performance_df)
+    assert len(frame_filter.positions(brand='No such brand')) == 0
@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from roi_engine import DataIngestionManager, DatasetStore, ValidationReport
+
+def csv_source(df):
+    return io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+
+def tracking_rows(orders):
+    n = len(orders)
+    return pd.DataFrame({
+        'tracking_id': range(n), 'influencer_id': ['INF_001'] * n, 'campaign': ['MB_Whey'] * n, 'orders': orders,
+        'revenue': [1500.0] * n, 'date': ['2025-07-01'] * n, 'campaign_type': ['Test'] * n
+    })
+
+@pytest.mark.parametrize('to_store', [False, True])
+def test_counts_overflowing_a_later_chunk_widen_the_column(tmp_path, to_store):
+    orders = [1, 2, 3, 4, 3_000_000_000, 5]
+    sink = DatasetStore(tmp_path).writer('tracking_data') if to_store else None
+    df = DataIngestionManager().ingest_csv(csv_source(tracking_rows(orders)), 'tracking_data', sink=sink, chunksize=2)
+    assert df['orders'].dtype == np.int64
+    assert df['orders'].tolist() == orders
+
+def test_store_append_widens_the_stored_schema(tmp_path):
+    manager = DataIngestionManager()
+    store = DatasetStore(tmp_path)
+    store.write('tracking_data', manager.clean_data(tracking_rows(['1', '2']), 'tracking_data'))
+    store.append('tracking_data', manager.clean_data(tracking_rows(['3000000000']), 'tracking_data'))
+    assert store.load('tracking_data')['orders'].tolist() == [1, 2, 3_000_000_000]
+
+def test_fractional_counts_are_rounded_and_reported():
+    report = ValidationReport('tracking_data')
+    df = DataIngestionManager().clean_data(tracking_rows(['1.7', '2', '0.4']), 'tracking_data', report)
+    assert df['orders'].tolist() == [2, 2, 0]
+    assert df['orders'].dtype == np.int32
+    entry = report.violations[('rounded', 'orders')]
+    assert (entry['severity'], entry['count'], entry['sample_rows']) == ('flagged', 2, [0, 2])
+    assert report.rows_kept == 3
+
+def test_validation_report_counts_each_check():
+    df = pd.DataFrame({
+        'post_id': ['1', '2', '3', '4', '5', '1'],
+        'influencer_id': ['INF_001', 'INF_002', None, 'INF_009', 'INF_001', 'INF_002'],
+        'platform': ['Instagram'] * 6,
+        'date': ['2025-07-01', 'not a date', '2025-07-03', '2025-07-04', '2025-07-05', '2025-07-06'],
+        'reach': ['1000', '1000', '1000', '1000', 'many', '-5'],
+        'likes': ['10', '10', '10', '5000', '10', '10'],
+        'comments': ['1'] * 6, 'brand': ['MuscleBlaze'] * 6, 'product': ['Whey Protein'] * 6,
+        'campaign_type': ['Test'] * 6
+    })
+    report = ValidationReport('posts', influencer_ids=['INF_001', 'INF_002'])
+    # Two chunks, so counts and duplicate ids accumulate across them
+    df_clean = DataIngestionManager().ingest_csv(csv_source(df), 'posts', chunksize=3, report=report)
+    
+    counts = report.to_frame().set_index(['check', 'column'])
+    assert counts['count'].to_dict() == {
+        ('missing', 'influencer_id'): 1, ('invalid_date', 'date'): 1, ('invalid_number', 'reach'): 1,
+        ('negative', 'reach'): 1, ('exceeds_reach', 'likes'): 2, ('exceeds_reach', 'comments'): 1,
+        ('unknown', 'influencer_id'): 1, ('duplicate_id', 'post_id'): 1
+    }
+    assert counts.loc[('invalid_number', 'reach'), 'sample_rows'] == [4]
+    assert counts.loc[('duplicate_id', 'post_id'), 'sample_rows'] == [5]
+    assert counts.loc[('unknown', 'influencer_id'), 'severity'] == 'flagged'
+    assert (report.rows_read, report.rows_kept, report.rows_dropped) == (6, 3, 3)
+    assert len(df_clean) == 3
+    assert report.summary().startswith('3 of 6 posts rows kept: ')
+
+def test_schema_and_data_type_detection():
+    manager = DataIngestionManager()
+    assert manager.validate_schema(tracking_rows([1]), 'tracking_data')[0]
+    assert not manager.validate_schema(tracking_rows([1]).drop(columns='revenue'), 'tracking_data')[0]
+    assert manager.detect_data_type(tracking_rows([1]).columns) == 'tracking_data'
+    with pytest.raises(ValueError):
+        manager.ingest_csv(csv_source(tracking_rows([1]).drop(columns='revenue')), 'tracking_data')
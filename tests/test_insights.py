@@ -0,0 +1,40 @@
+import pandas as pd
+
+from roi_engine import InsightEngine, InsightRule, LRUCache, calculate_roas_metrics, generate_ai_insights
+from roi_engine.insights import NO_INSIGHTS, dimension_column
+
+def test_creator_attributes_follow_their_influencer(labelled_dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = labelled_dataset
+    tiers = dimension_column(posts_df, influencers_df, 'tier')
+    assert tiers.astype(str).tolist() == ['Micro', 'Mega', 'Macro']
+    assert dimension_column(posts_df, influencers_df, 'gender').astype(str).tolist() == ['Male', 'Female', 'Male']
+
+def test_tier_insight_names_the_right_tiers(labelled_dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = labelled_dataset
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    # ROAS: INF_001 (Micro) 1x, INF_002 (Mega) 5x, INF_003 (Macro) 20x
+    insights = generate_ai_insights(performance_df, influencers_df)
+    assert any('Macro-influencers show 20.00x ROAS vs 1.00x for Micro-influencers' in insight
+               for insight in insights)
+    assert any('**Wellness** creators return 20.00x ROAS' in insight for insight in insights)
+
+def test_rollups_of_posts_and_cube_cells_agree(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    engine = InsightEngine()
+    from_posts = engine.rollups(performance_df, influencers_df)
+    cells = performance_df.assign(tier=dimension_column(performance_df, influencers_df, 'tier'))
+    from_cells = engine.rollups(cells, influencers_df)
+    for key in (('tier',), ('platform',)):
+        pd.testing.assert_frame_equal(from_posts[key].sort_index(), from_cells[key].sort_index(), check_exact=False)
+
+def test_messages_are_memoized_per_state(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    calls = []
+    rule = InsightRule('count', ['platform'], lambda rollup: calls.append(1) or f"{len(rollup)} platforms")
+    engine = InsightEngine([rule], cache=LRUCache(16))
+    first = engine.evaluate(performance_df, influencers_df, state='all')
+    assert engine.evaluate(performance_df.iloc[:0], influencers_df, state='all') == first
+    assert len(calls) == 1
+    assert engine.evaluate(performance_df.iloc[:0], influencers_df, state='none') == [NO_INSIGHTS]
@@ -0,0 +1,50 @@
+import threading
+
+from roi_engine import JobRunner
+
+def test_job_reports_progress_and_result():
+    runner = JobRunner(max_workers=1)
+    
+    def task(job, n):
+        for i in range(n):
+            job.update(i / n, f"step {i}")
+        return n * 2
+    
+    job = runner.submit('double', task, 4)
+    assert job.wait(10)
+    assert (job.status, job.result, job.fraction, job.message) == ('done', 8, 1.0, 'step 3')
+    assert not job.active and job.elapsed >= 0
+    runner.shutdown()
+
+def test_cancel_stops_at_the_next_update():
+    runner = JobRunner(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    
+    def task(job):
+        started.set()
+        release.wait(10)
+        job.update(0.5)
+        return 'finished'
+    
+    job = runner.submit('slow', task)
+    queued = runner.submit('queued', task)
+    started.wait(10)
+    job.cancel()
+    queued.cancel()
+    release.set()
+    assert job.wait(10) and queued.wait(10)
+    assert (job.status, job.result) == ('cancelled', None)
+    # A job cancelled before it starts never runs
+    assert queued.status == 'cancelled' and queued.started is None
+    runner.shutdown()
+
+def test_failure_is_kept_on_the_job():
+    runner = JobRunner(max_workers=1)
+    
+    def task(job):
+        raise ValueError("bad upload")
+    
+    job = runner.submit('failing', task)
+    assert job.wait(10)
+    assert job.status == 'failed' and str(job.error) == 'bad upload'
+    runner.shutdown()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roi_engine import (
+    MetricsEngine, apply_order_payouts, bootstrap_incremental_roas, calculate_incremental_roas,
+    calculate_roas_metrics, extend_roas_metrics, summarize_tracking, unattributed_totals
+)
+
+def split_tracking(tracking_df, fraction=0.8):
+    """Tracking history and a later batch, as an append would see them"""
+    cut = int(len(tracking_df) * fraction)
+    return tracking_df.iloc[:cut].reset_index(drop=True), tracking_df.iloc[cut:].reset_index(drop=True)
+
+def batch_orders(new_rows):
+    return summarize_tracking(new_rows)['orders'].groupby(level='influencer_id', observed=True).sum()
+
+def test_extend_matches_recompute(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    history, batch = split_tracking(tracking_df)
+    new_payouts = apply_order_payouts(payouts_df, batch_orders(batch))
+    
+    extended = extend_roas_metrics(calculate_roas_metrics(posts_df, history, payouts_df), posts_df, batch, new_payouts)
+    pd.testing.assert_frame_equal(extended, calculate_roas_metrics(posts_df, tracking_df, new_payouts),
+                                  check_exact=False)
+
+def test_engine_append_matches_recompute(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    history, batch = split_tracking(tracking_df)
+    engine = MetricsEngine()
+    engine.warm(influencers_df, posts_df, history, payouts_df)
+    
+    new_payouts = engine.append_tracking(influencers_df, posts_df, history, payouts_df, tracking_df, batch)
+    pd.testing.assert_frame_equal(new_payouts, apply_order_payouts(payouts_df, batch_orders(batch)))
+    
+    # A fresh engine recomputes everything from the merged frames
+    frames = (influencers_df, posts_df, tracking_df, new_payouts)
+    fresh = MetricsEngine()
+    pd.testing.assert_frame_equal(engine.roas_metrics(*frames), fresh.roas_metrics(*frames), check_exact=False)
+    pd.testing.assert_frame_equal(engine.cube(*frames).frame, fresh.cube(*frames).frame, check_exact=False)
+    np.testing.assert_allclose(engine.incremental_roas(*frames), fresh.incremental_roas(*frames))
+    assert engine.tracking_id_index(tracking_df).contains(tracking_df['tracking_id']).all()
+
+def test_incremental_roas_matches_interval_estimate(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    incremental_roas, lift = calculate_incremental_roas(tracking_df, payouts_df)
+    intervals = bootstrap_incremental_roas(tracking_df, payouts_df, n_resamples=100)
+    np.testing.assert_allclose(intervals.loc[['incremental_roas', 'lift'], 'estimate'], [incremental_roas, lift])
+
+def test_unattributed_totals(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    performance_df = calculate_roas_metrics(posts_df, tracking_df, payouts_df)
+    assert unattributed_totals(performance_df, tracking_df, payouts_df) == pytest.approx(
+        {'revenue': tracking_df['revenue'].sum() - performance_df['revenue'].sum(),
+         'orders': tracking_df['orders'].sum() - performance_df['orders'].sum(),
+         'total_payout': 0.0}, abs=0.01
+    )
+    
+    # Without any posts an influencer's revenue and payout are left out of the post-level totals
+    dropped = posts_df['influencer_id'].iloc[0]
+    posts_kept = posts_df[posts_df['influencer_id'] != dropped].reset_index(drop=True)
+    performance_df = calculate_roas_metrics(posts_kept, tracking_df, payouts_df)
+    unattributed = unattributed_totals(performance_df, tracking_df, payouts_df)
+    assert unattributed['total_payout'] == pytest.approx(
+        payouts_df.loc[payouts_df['influencer_id'] == dropped, 'total_payout'].sum(), abs=0.01
+    )
+    assert unattributed['revenue'] >= tracking_df.loc[tracking_df['influencer_id'] == dropped, 'revenue'].sum() - 0.01
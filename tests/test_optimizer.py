@@ -0,0 +1,32 @@
+import pytest
+
+from roi_engine import calculate_roas_metrics, optimize_budget, response_curves
+
+@pytest.fixture(scope='module')
+def curves(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    return response_curves(calculate_roas_metrics(posts_df, tracking_df, payouts_df), payouts_df, influencers_df)
+
+def test_plan_stays_within_budget_and_caps(curves):
+    budget = curves['current_spend'].sum()
+    brand = curves['brand'].iloc[0]
+    plan = optimize_budget(curves, budget, brand_caps={brand: budget * 0.05})
+    assert plan['planned_spend'].sum() <= budget * (1 + 1e-9)
+    assert plan.loc[plan['brand'] == brand, 'planned_spend'].sum() == pytest.approx(budget * 0.05)
+    assert plan.attrs['binding_brand_caps'] == {brand: budget * 0.05}
+    assert plan.attrs['unmet_tier_minimums'] == {}
+
+def test_unmet_tier_minimum_is_reported(curves):
+    budget = curves['current_spend'].sum() * 10
+    tier = curves['tier'].value_counts().index[-1]
+    plan = optimize_budget(curves, budget, tier_mix={tier: (0.6, None)}, min_marginal_roas=0)
+    minimum, spent = plan.attrs['unmet_tier_minimums'][tier]
+    assert minimum == pytest.approx(0.6 * budget)
+    assert spent == pytest.approx(plan.loc[plan['tier'] == tier, 'planned_spend'].sum())
+    assert spent < minimum
+
+def test_binding_tier_cap_is_reported(curves):
+    budget = curves['current_spend'].sum()
+    tier = curves['tier'].value_counts().index[0]
+    plan = optimize_budget(curves, budget, tier_mix={tier: (None, 0.1)})
+    assert plan.attrs['binding_tier_caps'] == {tier: pytest.approx(0.1 * budget)}
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from roi_engine import calculate_roas_metrics, compute_partitioned, summarize_tracking
+
+@pytest.mark.parametrize('partition_by', ['month', 'brand'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_partitioned_matches_serial(dataset, partition_by, workers):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    performance_df, tracking_summary = compute_partitioned(posts_df, tracking_df, payouts_df, partition_by, workers)
+    
+    # Partials are summed in a different order, so sums agree to rounding only
+    pd.testing.assert_frame_equal(performance_df, calculate_roas_metrics(posts_df, tracking_df, payouts_df),
+                                  check_exact=False)
+    pd.testing.assert_frame_equal(tracking_summary.sort_index(), summarize_tracking(tracking_df).sort_index(),
+                                  check_exact=False)
+
+def test_unknown_partition_key(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    with pytest.raises(ValueError):
+        compute_partitioned(posts_df, tracking_df, payouts_df, 'platform', 1)
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+from roi_engine import DatasetRegistry, generate_sample_data
+from roi_engine.registry import frames_nbytes
+
+@pytest.fixture
+def datasets():
+    return [generate_sample_data(n_influencers=20, n_posts=80, n_tracking=2_000, seed=seed) for seed in (1, 2)]
+
+def test_identical_datasets_are_held_once(tmp_path, datasets):
+    registry = DatasetRegistry(spill_root=str(tmp_path))
+    first = registry.register(datasets[0])
+    second = registry.register(tuple(df.copy() for df in datasets[0]))
+    assert first.key == second.key
+    assert [row['refs'] for row in registry.stats()] == [2]
+    assert second.frames()[2] is datasets[0][2]
+
+def test_spill_and_reload(tmp_path, datasets):
+    registry = DatasetRegistry(memory_budget=frames_nbytes(datasets[0]) * 1.5, spill_root=str(tmp_path))
+    first = registry.register(datasets[0])
+    second = registry.register(datasets[1])
+    
+    # Over budget: the least recently used dataset is still referenced, so it is spilled rather than dropped
+    stats = {row['key']: row for row in registry.stats()}
+    assert not stats[first.key]['resident'] and stats[first.key]['spilled']
+    assert stats[second.key]['resident']
+    assert os.path.isdir(tmp_path / first.key)
+    
+    reloaded = first.frames()
+    for stored, frame in zip(reloaded, datasets[0]):
+        pd.testing.assert_frame_equal(stored, frame, check_categorical=False, check_dtype=False)
+    stats = {row['key']: row for row in registry.stats()}
+    assert stats[first.key]['resident'] and not stats[second.key]['resident']
+
+def test_released_datasets_are_dropped(tmp_path, datasets):
+    registry = DatasetRegistry(memory_budget=frames_nbytes(datasets[0]) * 1.5, spill_root=str(tmp_path))
+    first = registry.register(datasets[0])
+    registry.register(datasets[1])
+    first.close()
+    # A spilled dataset without references is dropped together with its spill
+    assert first.key not in {row['key'] for row in registry.stats()}
+    assert not os.path.exists(tmp_path / first.key)
+    with pytest.raises(KeyError):
+        registry.get(first.key)
@@ -0,0 +1,73 @@
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from roi_engine import DataIngestionManager, DatasetStore
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(tmp_path / 'store')
+
+def assert_same_dataset(loaded, frames):
+    for stored, frame in zip(loaded, frames):
+        pd.testing.assert_frame_equal(stored, frame.reset_index(drop=True), check_categorical=False, check_dtype=False)
+
+def test_staged_session_publishes_complete_dataset(store, dataset):
+    session = store.session('abc')
+    for data_type, df in zip(DatasetStore.DATA_TYPES[:3], dataset):
+        session.write(data_type, df)
+    # Nothing reaches the shared store until the dataset is complete
+    assert not store.has_dataset()
+    assert not session.has_dataset()
+    
+    store.apply(replace={'payouts': dataset[3]}, staged=session)
+    assert store.has_dataset()
+    assert not session.root.exists()
+    assert_same_dataset(store.load_dataset(), dataset)
+
+def test_append_adds_a_part_and_keeps_stored_ones(store, dataset):
+    tracking_df = dataset[2]
+    history, batch = tracking_df.iloc[:15_000], tracking_df.iloc[15_000:]
+    store.apply(replace=dict(zip(DatasetStore.DATA_TYPES, (dataset[0], dataset[1], history, dataset[3]))))
+    first_part = store.parts('tracking_data')[0]
+    stamp = first_part.stat().st_mtime_ns
+    version = store.version()
+    
+    store.append('tracking_data', batch)
+    assert [path.name for path in store.parts('tracking_data')] == ['part-00000.arrow', 'part-00001.arrow']
+    assert first_part.stat().st_mtime_ns == stamp
+    assert store.version() != version
+    assert_same_dataset([store.load('tracking_data')], [tracking_df])
+    
+    pruned = store.load('tracking_data', columns=['influencer_id', 'revenue'])
+    assert list(pruned.columns) == ['influencer_id', 'revenue']
+
+def test_failed_apply_leaves_the_store_as_it_was(store, dataset):
+    store.apply(replace=dict(zip(DatasetStore.DATA_TYPES, dataset)))
+    version = store.version()
+    
+    with pytest.raises(Exception):
+        store.apply(replace={'posts': dataset[1], 'payouts': object()})
+    assert store.version() == version
+    assert sorted(path.name for path in store.root.iterdir()) == sorted(DatasetStore.DATA_TYPES)
+
+def test_streamed_ingest_round_trip(store, dataset):
+    manager = DataIngestionManager()
+    raw = dataset[3].astype({'influencer_id': str, 'basis': str}).to_csv(index=False).encode('utf-8')
+    df = manager.ingest_csv(io.BytesIO(raw), 'payouts', sink=store.writer('payouts'), chunksize=7)
+    pd.testing.assert_frame_equal(df, store.load('payouts'))
+    assert len(df) == len(dataset[3])
+
+def test_prune_sessions_removes_stale_stores(store, dataset):
+    session = store.session('old')
+    session.write('payouts', dataset[3])
+    past = time.time() - 2 * 86400
+    os.utime(session.root, (past, past))
+    store.session('new').write('payouts', dataset[3])
+    
+    store.prune_sessions()
+    assert not session.root.exists()
+    assert store.session('new').parts('payouts')
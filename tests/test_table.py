@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roi_engine import CampaignTable, calculate_roas_metrics
+
+@pytest.fixture(scope='module')
+def table(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    return CampaignTable(calculate_roas_metrics(posts_df, tracking_df, payouts_df), influencers_df)
+
+@pytest.mark.parametrize('column', ['date', 'tier', 'name', 'roas', 'revenue'])
+@pytest.mark.parametrize('ascending', [True, False])
+def test_limited_sort_pages_match_full_sort(table, column, ascending):
+    page_size = 10
+    full = table.sort(column, ascending)
+    for page in range(4):
+        # The dashboard orders only the rows up to the end of the requested page
+        limited = table.sort(column, ascending, limit=(page + 1) * page_size)
+        pd.testing.assert_frame_equal(limited.page(page, page_size), full.page(page, page_size))
+
+def test_full_sort_is_stable(table):
+    key = table.materialize()['tier'].astype(str).to_numpy()
+    expected = np.lexsort((np.arange(len(key)), key))
+    np.testing.assert_array_equal(table.sort('tier').positions, table.positions[expected])
+
+def test_search_then_page(table):
+    found = table.search('influencer_1')
+    assert len(found) > 0
+    assert found.materialize()['name'].str.contains('Influencer_1', case=False).all()
+    assert found.page_count(25) == -(-len(found) // 25)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roi_engine import (
+    MetricsCube, MetricsEngine, OrderLagPartitions, calculate_roas_metrics, daily_roas, order_lag_rows,
+    post_dimensions, weekly_roas
+)
+
+def sorted_lags(lags):
+    keys = ['date', 'post_date', 'lag', 'brand', 'platform', 'tier']
+    frame = lags.astype({col: str for col in ('brand', 'platform', 'tier')})
+    return frame.sort_values(keys, ignore_index=True)
+
+@pytest.fixture(scope='module')
+def cells(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    return MetricsCube.from_performance(calculate_roas_metrics(posts_df, tracking_df, payouts_df), influencers_df).frame
+
+def test_post_dimensions_follow_their_influencer(labelled_dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = labelled_dataset
+    tiers = post_dimensions(posts_df, influencers_df)['tier']
+    assert tiers.astype(str).tolist() == ['Micro', 'Mega', 'Macro']
+
+def test_series_sum_to_cube_totals(cells):
+    for series in (daily_roas(cells, 'brand'), weekly_roas(cells, 'brand')):
+        np.testing.assert_allclose(series[['revenue', 'total_payout', 'orders']].sum(),
+                                   cells[['revenue', 'total_payout', 'orders']].sum())
+    daily = daily_roas(cells, windows=[7])
+    # The first week's trailing sums cover only the days seen so far
+    np.testing.assert_allclose(daily['revenue_7d'].iloc[:7], daily['revenue'].iloc[:7].cumsum())
+    np.testing.assert_allclose(daily['revenue_7d'].iloc[-1], daily['revenue'].iloc[-7:].sum())
+
+def test_partitions_update_matches_recompute(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    dimensions = post_dimensions(posts_df, influencers_df)
+    cut = int(len(tracking_df) * 0.9)
+    partitions = OrderLagPartitions(posts_df, influencers_df)
+    
+    history = partitions.update(tracking_df.iloc[:cut])
+    assert partitions.days_updated > 0
+    merged = partitions.update(tracking_df)
+    pd.testing.assert_frame_equal(sorted_lags(merged),
+                                  sorted_lags(order_lag_rows(posts_df, tracking_df, dimensions)), check_exact=False)
+    # A frame returned earlier belongs to its own tracking frame and is never changed in place
+    pd.testing.assert_frame_equal(sorted_lags(history),
+                                  sorted_lags(order_lag_rows(posts_df, tracking_df.iloc[:cut], dimensions)),
+                                  check_exact=False)
+    
+    partitions.update(tracking_df)
+    assert partitions.days_updated == 0
+
+def test_engine_order_lags_per_tracking_frame(dataset):
+    influencers_df, posts_df, tracking_df, payouts_df = dataset
+    dimensions = post_dimensions(posts_df, influencers_df)
+    history = tracking_df.iloc[:len(tracking_df) // 2]
+    engine = MetricsEngine()
+    # Both tracking frames share one OrderLagPartitions; each keeps its own rows
+    lags = [engine.order_lags(influencers_df, posts_df, frame) for frame in (history, tracking_df)]
+    for frame, lag_filter in zip((history, tracking_df), lags):
+        pd.testing.assert_frame_equal(sorted_lags(lag_filter.frame),
+                                      sorted_lags(order_lag_rows(posts_df, frame, dimensions)), check_exact=False)